@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark the whole-crate clippy index.
+
+Builds a crate of --files source files and a fake `cargo` that sleeps
+--delay seconds (a warm incremental clippy run) before printing one warning
+per file, then times:
+- check_file on --checks different files of the unchanged crate
+- the same checks run concurrently (as daemon requests would)
+- the first check after editing one file
+with the crate index and without it (fingerprint removed from the stage).
+
+Usage: python3 benchmarks/bench_clippy_cache.py [--files N] [--checks N] [--delay S]
+"""
+
+import dataclasses
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+FAKE_CARGO = """#!/usr/bin/env python3
+import json, os, sys, time
+if sys.argv[1:2] == ["clippy"]:
+    time.sleep({delay})
+    for name in sorted(os.listdir("src")):
+        print(json.dumps({{"reason": "compiler-message", "message": {{
+            "message": "unused variable", "code": None, "level": "warning",
+            "spans": [{{"file_name": "src/" + name, "line_start": 1, "column_start": 1}}]}}}}))
+    sys.exit(1)
+"""
+
+
+def main() -> int:
+    files = int(sys.argv[sys.argv.index("--files") + 1]) if "--files" in sys.argv else 200
+    checks = int(sys.argv[sys.argv.index("--checks") + 1]) if "--checks" in sys.argv else 8
+    delay = float(sys.argv[sys.argv.index("--delay") + 1]) if "--delay" in sys.argv else 0.5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = os.path.realpath(tmp)
+        os.environ["NEXT_LEVEL_STATE"] = os.path.join(tmp, "state")
+        os.environ["NEXT_LEVEL_CONFIG"] = os.path.join(tmp, "config.json")
+        bin_dir = os.path.join(tmp, "bin")
+        crate = os.path.join(tmp, "crate")
+        os.makedirs(bin_dir)
+        os.makedirs(os.path.join(crate, "src"))
+        cargo = os.path.join(bin_dir, "cargo")
+        with open(cargo, "w", encoding="utf-8") as f:
+            f.write(FAKE_CARGO.format(delay=delay))
+        os.chmod(cargo, os.stat(cargo).st_mode | stat.S_IEXEC)
+        os.environ["PATH"] = f"{bin_dir}:{os.environ['PATH']}"
+        with open(os.path.join(crate, "Cargo.toml"), "w", encoding="utf-8") as f:
+            f.write('[package]\nname = "bench"\n')
+        sources = []
+        for i in range(files):
+            path = os.path.join(crate, "src", f"m{i}.rs")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"pub fn f{i}() {{}}\n")
+            sources.append(path)
+
+        from checkers import pipeline, rust
+
+        lint = next(stage for stage in rust.PIPELINE.stages if stage.name == "lint")
+        # The old behaviour: run clippy per check and keep only the checked file's findings
+        per_file = dataclasses.replace(lint, fingerprint=None, split=None, parse=lambda out, err, ctx: (
+            rust._index_clippy(out, err, ctx).get(os.path.realpath(ctx.filepath), [])))
+        uncached = dataclasses.replace(rust.PIPELINE, stages=(per_file,))
+        cached = dataclasses.replace(rust.PIPELINE, stages=(lint,))
+        targets = sources[:checks]
+
+        def sequential(p: pipeline.Pipeline) -> float:
+            start = time.perf_counter()
+            for path in targets:
+                pipeline.run(p, path)
+            return time.perf_counter() - start
+
+        def concurrent(p: pipeline.Pipeline) -> float:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+                list(pool.map(lambda path: pipeline.run(p, path), targets))
+            return time.perf_counter() - start
+
+        def after_edit(p: pipeline.Pipeline) -> float:
+            with open(sources[-1], "a", encoding="utf-8") as f:
+                f.write("\n")
+            start = time.perf_counter()
+            pipeline.run(p, sources[0])
+            return time.perf_counter() - start
+
+        findings = pipeline.run(cached, sources[0])["findings"]
+        assert json.dumps(findings) == json.dumps(pipeline.run(uncached, sources[0])["findings"])
+        print(f"{'':28s} {'per edit':>10s} {'indexed':>10s}")
+        for label, fn in ((f"{checks} files, sequential", sequential),
+                          (f"{checks} files, concurrent", concurrent),
+                          ("first check after an edit", after_edit)):
+            before = fn(uncached)
+            after = fn(cached)
+            print(f"{label:28s} {before * 1000:8.0f}ms {after * 1000:8.0f}ms  ({before / after:5.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
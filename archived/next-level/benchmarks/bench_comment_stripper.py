@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark the comment stripper on large generated sources.
+
+C family: one source per dialect (~--size-mb each) mixing code, line and block
+comments, strings containing `//`, template literals, raw strings and long
+lines; reports best-of-N wall time and throughput of strip_source.
+
+Python: --python-lines-line modules (a commented module and a comment-free
+generated stub that takes the no-`#` fast path); reports best-of-N wall time
+and tracemalloc peak memory.
+
+Usage: python3 benchmarks/bench_comment_stripper.py [--size-mb N] [--python-lines N] [--runs N]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+from comment_stripper import strip_source  # noqa: E402
+
+CHUNKS = {
+    "typescript": '''/** Fetches a user. */
+export async function fetchUser{n}(id: string): Promise<User> {{
+    // build the url
+    const url = `https://api.example.com/users/${{id}}?q=${{"a//b"}}`; // inline note
+    const re = /\\/\\/[a-z"']+/g;
+    /* temporary
+       block comment */
+    return request(url, {{ headers: {{ "x-trace": "//" + id }} }}); // TODO retry
+}}
+const long{n} = [{long}];
+''',
+    "go": '''// Handler{n} serves requests.
+func Handler{n}(w http.ResponseWriter, r *http.Request) {{
+	// parse the body
+	s := `raw // string {n}`
+	c := '"' // rune
+	/* single */ x := "http://example.com" // trailing
+	_ = []int{{{long}}}
+}}
+''',
+    "rust": '''/// Parses item {n}.
+fn parse_{n}<'a>(input: &'a str) -> Option<&'a str> {{
+    // skip whitespace
+    let raw = r#"raw " // not a comment"#;
+    let c = '"'; // quote char
+    /* outer /* nested */ still comment */
+    let v = vec![{long}];
+    input.get(0..1) // SAFETY: bounds checked
+}}
+''',
+    "swift": '''/// Renders view {n}.
+func render{n}(name: String) -> String {{
+    // greet
+    let s = "hello \\(name.replacingOccurrences(of: "//", with: "")) // not a comment"
+    let m = """
+    // inside a multi-line string
+    """
+    /* a /* nested */ b */
+    return s + m + "{long}" // trailing
+}}
+''',
+}
+
+
+PYTHON_CHUNKS = {
+    "commented": '''# Field {n} descriptor
+FIELD_{n} = _descriptor.FieldDescriptor(name="field_{n}", number={n})  # wire number
+''',
+    "no-comments": '''FIELD_{n} = _descriptor.FieldDescriptor(name="field_{n}", number={n}, label=1)
+TABLE_{n} = ({n}, "row_{n}", 0x{n:x})
+''',
+}
+
+
+def generate(language: str, size: int) -> str:
+    """Repeat the dialect's chunk until the source reaches `size` characters."""
+    long = ", ".join(str(i) for i in range(200))
+    parts, total, n = [], 0, 0
+    while total < size:
+        chunk = CHUNKS[language].format(n=n, long=long)
+        parts.append(chunk)
+        total += len(chunk)
+        n += 1
+    return "".join(parts)
+
+
+def generate_python(kind: str, lines: int) -> str:
+    """A Python module of roughly `lines` lines."""
+    return '"""Generated module."""\n' + "".join(PYTHON_CHUNKS[kind].format(n=n) for n in range(lines // 2))
+
+
+def bench_python(lines: int, runs: int) -> None:
+    """Time strip_source on generated Python modules and report peak memory."""
+    for kind in PYTHON_CHUNKS:
+        source = generate_python(kind, lines)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = strip_source(source, "python")
+            timings.append(time.perf_counter() - start)
+        del result
+        tracemalloc.start()
+        result = strip_source(source, "python")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"python/{kind:11s} {source.count(chr(10)):6d} lines  {min(timings) * 1000:8.1f} ms  "
+              f"peak={peak / (1024 * 1024):6.1f} MB (source {len(source) / (1024 * 1024):.1f} MB)  "
+              f"stripped={result['stripped']}")
+
+
+def main() -> int:
+    size_mb = float(sys.argv[sys.argv.index("--size-mb") + 1]) if "--size-mb" in sys.argv else 4
+    python_lines = int(sys.argv[sys.argv.index("--python-lines") + 1]) if "--python-lines" in sys.argv else 50000
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 3
+
+    for language in CHUNKS:
+        source = generate(language, int(size_mb * 1024 * 1024))
+        megabytes = len(source.encode()) / (1024 * 1024)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = strip_source(source, language)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{language:10s} {megabytes:5.1f} MB  {best * 1000:8.1f} ms  "
+              f"{megabytes / best:6.1f} MB/s  stripped={result['stripped']}")
+    bench_python(python_lines, runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
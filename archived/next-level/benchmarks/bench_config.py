@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark config accessors.
+
+Writes a realistic config.json to a temp dir and times each accessor against
+the uncached equivalent (open + json.load per call, as every accessor did
+before the snapshot cache). Reports mean microseconds per call.
+
+Usage: python3 benchmarks/bench_config.py [--calls N]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+CONFIG = {
+    "setup_complete": True,
+    "last_updated": "2026-01-01T00:00:00+00:00",
+    "project_root": "/work/monorepo",
+    "languages_detected": ["go", "python", "rust", "typescript"],
+    "features_enabled": {"file_checker": True, "comment_stripping": True, "tdd_enforcement": True,
+                         "checker_daemon": True, "edit_coalescing": False, "diff_scoped_checks": True},
+    "plugins_available": {"omega_memory": False, "coderabbit": True},
+    "linters": {
+        "python": {"formatter": "ruff", "linter": "ruff", "type_checker": "basedpyright"},
+        "typescript": {"formatter": "prettier", "linter": "eslint"},
+        "go": {"formatter": "gofmt", "linter": "golangci-lint"},
+        "rust": {"formatter": "rustfmt", "linter": "clippy"},
+    },
+    "trust_level": "balanced",
+    "checkpoint_depth": "medium",
+}
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> int:
+    calls = int(sys.argv[sys.argv.index("--calls") + 1]) if "--calls" in sys.argv else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(CONFIG, f, indent=2)
+        os.environ["NEXT_LEVEL_CONFIG"] = path
+        os.environ["NEXT_LEVEL_STATE"] = os.path.join(tmp, "state")
+        import config
+
+        def uncached() -> dict:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+
+        cases = [
+            ("feature_enabled", lambda: config.feature_enabled("diff_scoped_checks"),
+             lambda: uncached().get("features_enabled", {}).get("diff_scoped_checks", False)),
+            ("trust_level", config.trust_level, lambda: uncached().get("trust_level", "balanced")),
+            ("linters_for", lambda: config.linters_for("python"),
+             lambda: uncached().get("linters", {}).get("python", {})),
+            ("checkpoint_depth_for_task", lambda: config.checkpoint_depth_for_task(4, 10),
+             lambda: uncached().get("trust_level", "balanced")),
+            ("read", config.read, uncached),
+        ]
+        print(f"{'accessor':28s} {'file read':>10s} {'cached':>10s}")
+        for name, cached, baseline in cases:
+            before = per_call_us(baseline, calls)
+            after = per_call_us(cached, calls)
+            print(f"{name:28s} {before:8.2f}us {after:8.2f}us  ({before / after:5.1f}x)")
+        snap = config.snapshot()
+        print(f"{'snapshot attribute':28s} {'':10s} {per_call_us(lambda: snap.trust_level, calls):8.2f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark config.sh lookups with and without the shell snapshot.
+
+Writes a config through lib/config.py (which also writes config.json.env),
+then times, best of --runs:
+- lookups: one bash process sourcing config.sh and doing a typical hook's
+  lookups (setup_complete, project_root, three features, a plugin, two
+  languages) --rounds times
+- startup-check.sh: the whole SessionStart hook
+each with the snapshot and with it removed (every lookup spawns jq).
+
+Usage: python3 benchmarks/bench_config_snapshot.py [--rounds N] [--runs N]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(PLUGIN_ROOT, "hooks", "scripts")
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+LOOKUPS = """
+source "{scripts}/config.sh"
+for _ in $(seq {rounds}); do
+  config_setup_complete
+  config_get project_root > /dev/null
+  config_feature_enabled file_checker
+  config_feature_enabled tdd_enforcement
+  config_feature_enabled comment_stripping
+  config_plugin_available coderabbit || true
+  config_has_language python
+  config_has_language go || true
+done
+"""
+
+
+def best_ms(argv: list[str], env: dict[str, str], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, cwd=PLUGIN_ROOT, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> int:
+    rounds = int(sys.argv[sys.argv.index("--rounds") + 1]) if "--rounds" in sys.argv else 10
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 5
+    if not shutil.which("jq"):
+        print("jq is not installed; nothing to compare against")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        os.environ["NEXT_LEVEL_CONFIG"] = path
+        import config
+        config.write({
+            "setup_complete": True,
+            "project_root": PLUGIN_ROOT,
+            "languages_detected": ["python", "typescript"],
+            "features_enabled": {"file_checker": True, "comment_stripping": True, "tdd_enforcement": True},
+            "plugins_available": {"omega_memory": False, "coderabbit": True},
+        })
+        env = dict(os.environ)
+        snapshot = config.shell_snapshot_path()
+        cases = [
+            (f"lookups x{rounds}", ["bash", "-c", LOOKUPS.format(scripts=SCRIPTS, rounds=rounds)]),
+            ("startup-check.sh", ["bash", os.path.join(SCRIPTS, "startup-check.sh")]),
+        ]
+        print(f"{'':18s} {'jq':>10s} {'snapshot':>10s}")
+        for label, argv in cases:
+            with_snapshot = best_ms(argv, env, runs)
+            saved = snapshot.read_text()
+            snapshot.unlink()
+            without = best_ms(argv, env, runs)
+            snapshot.write_text(saved)
+            os.utime(snapshot)
+            print(f"{label:18s} {without:8.1f}ms {with_snapshot:8.1f}ms  ({without / with_snapshot:5.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
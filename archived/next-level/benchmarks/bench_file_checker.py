@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark PostToolUse hook latency: in-process checks vs the checker daemon.
+
+Runs hooks/scripts/file_checker.py end to end (interpreter startup included)
+against a scratch workspace and reports p50/p99 wall time for each mode.
+
+Usage: python3 benchmarks/bench_file_checker.py [--runs N]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOOK = os.path.join(PLUGIN_ROOT, "hooks", "scripts", "file_checker.py")
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+SAMPLE = '''"""Sample module."""
+
+
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+'''
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    idx = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def run_hook(workspace: str, filepath: str, env: dict[str, str]) -> float:
+    """Run the hook once and return wall time in milliseconds."""
+    payload = json.dumps({"tool_name": "Edit", "tool_input": {"file_path": filepath}})
+    start = time.perf_counter()
+    subprocess.run([sys.executable, HOOK], input=payload, text=True, capture_output=True,
+                   cwd=workspace, env=env, check=False)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(label: str, workspace: str, filepath: str, env: dict[str, str], runs: int) -> None:
+    """Time `runs` hook invocations after one warm-up and print percentiles."""
+    run_hook(workspace, filepath, env)
+    samples = [run_hook(workspace, filepath, env) for _ in range(runs)]
+    print(f"{label:12s} p50={percentile(samples, 50):7.1f} ms  p99={percentile(samples, 99):7.1f} ms  (n={runs})")
+
+
+def main() -> int:
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = os.path.realpath(os.path.join(tmp, "ws"))
+        os.makedirs(workspace)
+        filepath = os.path.join(workspace, "sample.py")
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(SAMPLE)
+
+        config_path = os.path.join(tmp, "config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({"features_enabled": {"checker_daemon": False}}, f)
+
+        env = {**os.environ, "CLAUDE_PLUGIN_ROOT": PLUGIN_ROOT,
+               "NEXT_LEVEL_STATE": os.path.join(tmp, "state"), "NEXT_LEVEL_CONFIG": config_path}
+        os.environ["NEXT_LEVEL_STATE"] = env["NEXT_LEVEL_STATE"]
+
+        bench("in-process", workspace, filepath, env, runs)
+
+        import checker_daemon
+
+        daemon = subprocess.Popen([sys.executable, checker_daemon.__file__, "--workspace", workspace],
+                                  cwd=workspace, env=env)
+        try:
+            deadline = time.monotonic() + 10
+            while not os.path.exists(checker_daemon.socket_path(workspace)):
+                if time.monotonic() > deadline:
+                    print("daemon failed to start", file=sys.stderr)
+                    return 1
+                time.sleep(0.05)
+            bench("daemon", workspace, filepath, env, runs)
+        finally:
+            checker_daemon.stop(workspace)
+            daemon.wait(timeout=10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark package-scoped go vet against module-wide go vet.
+
+Generates a module of --packages packages (each importing the previous one)
+and times, best of --runs after a warm-up that fills Go's build cache:
+- module: `go vet ./...` from the module root, as every Go edit used to run
+- scoped: check_file's vet stage on one package after editing it
+- cached: the same check with the package unchanged
+
+Usage: python3 benchmarks/bench_go_vet.py [--packages N] [--runs N]
+"""
+
+import dataclasses
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+
+def write_module(root: str, packages: int) -> list[str]:
+    with open(os.path.join(root, "go.mod"), "w", encoding="utf-8") as f:
+        f.write("module example.com/bench\n\ngo 1.21\n")
+    sources = []
+    for i in range(packages):
+        directory = os.path.join(root, f"p{i}")
+        os.makedirs(directory)
+        imports = f'import "example.com/bench/p{i - 1}"\n\n' if i else ""
+        call = f"p{i - 1}.F{i - 1}() + " if i else ""
+        path = os.path.join(directory, f"p{i}.go")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"package p{i}\n\n{imports}func F{i}() int {{\n\treturn {call}{i}\n}}\n")
+        sources.append(path)
+    return sources
+
+
+def best_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> int:
+    packages = int(sys.argv[sys.argv.index("--packages") + 1]) if "--packages" in sys.argv else 100
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 3
+    go = shutil.which("go")
+    if not go:
+        print("go is not installed; nothing to benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = os.path.realpath(tmp)
+        os.environ["NEXT_LEVEL_STATE"] = os.path.join(tmp, "state")
+        os.environ["NEXT_LEVEL_CONFIG"] = os.path.join(tmp, "config.json")
+        module = os.path.join(tmp, "module")
+        os.makedirs(module)
+        sources = write_module(module, packages)
+
+        from checkers import go as go_checker
+        from checkers import pipeline
+
+        vet = next(stage for stage in go_checker.PIPELINE.stages if stage.name == "vet")
+        vet_only = dataclasses.replace(go_checker.PIPELINE, stages=(vet,))
+        target = sources[packages // 2]
+
+        def module_wide() -> None:
+            subprocess.run([go, "vet", "./..."], cwd=module, capture_output=True, check=False)
+
+        def edited() -> None:
+            with open(target, "a", encoding="utf-8") as f:
+                f.write("\n")
+            pipeline.run(vet_only, target)
+
+        module_wide()
+        pipeline.run(vet_only, target)
+        print(f"{packages} packages")
+        print(f"{'go vet ./...':28s} {best_ms(module_wide, runs):8.0f}ms")
+        print(f"{'scoped, package edited':28s} {best_ms(edited, runs):8.0f}ms")
+        print(f"{'scoped, package unchanged':28s} {best_ms(lambda: pipeline.run(vet_only, target), runs):8.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
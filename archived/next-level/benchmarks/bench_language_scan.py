@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark deep language detection on a synthetic monorepo.
+
+Generates a --files-file tree (default 200k) in a temp dir: packages/<n>/
+with TypeScript, go.mod services, a Rust crate and Python tooling, plus a
+node_modules/ and a gitignored dist/ that must not be walked. Reports:
+- full scan, single worker vs SCAN_WORKERS
+- stop_early scan (ends once every language has been seen)
+- cached scan (after committing the tree to git; skipped with --no-git)
+
+Usage: python3 benchmarks/bench_language_scan.py [--files N] [--runs N] [--no-git]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+from dependencies import LANGUAGE_INDICATORS  # noqa: E402
+from language_scan import SCAN_WORKERS, scan_languages  # noqa: E402
+
+FILES_PER_DIR = 50
+
+
+def touch(path: str) -> None:
+    with open(path, "w") as f:
+        f.write("x\n")
+
+
+def generate(root: str, files: int) -> int:
+    """Build the synthetic monorepo; returns the number of files written."""
+    written = 0
+    touch(os.path.join(root, ".gitignore"))
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("dist/\n*.generated.ts\n")
+    layout = [
+        ("packages/web{p}", "package.json", ".ts"),
+        ("services/api{p}", "go.mod", ".go"),
+        ("crates/core{p}", "Cargo.toml", ".rs"),
+        ("tools/py{p}", "pyproject.toml", ".py"),
+    ]
+    p = 0
+    while written < files:
+        for template, marker, ext in layout:
+            package = os.path.join(root, template.format(p=p))
+            for sub in ("src/a", "src/b/c"):
+                directory = os.path.join(package, sub)
+                os.makedirs(directory, exist_ok=True)
+                for k in range(FILES_PER_DIR):
+                    touch(os.path.join(directory, f"f{k}{ext}"))
+                written += FILES_PER_DIR
+            touch(os.path.join(package, marker))
+            written += 1
+        # Walked by nothing: skipped and ignored directories
+        for skipped in ("node_modules/dep{p}", "dist/chunk{p}"):
+            directory = os.path.join(root, skipped.format(p=p))
+            os.makedirs(directory, exist_ok=True)
+            for k in range(FILES_PER_DIR):
+                touch(os.path.join(directory, f"m{k}.js"))
+            written += FILES_PER_DIR
+        p += 1
+    # The last language only appears deep in the tree
+    os.makedirs(os.path.join(root, "ios/App/Sources"), exist_ok=True)
+    touch(os.path.join(root, "ios/App/Sources/App.swift"))
+    return written + 1
+
+
+def best(fn, runs: int) -> tuple[float, object]:
+    timings, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main() -> int:
+    files = int(sys.argv[sys.argv.index("--files") + 1]) if "--files" in sys.argv else 200_000
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["NEXT_LEVEL_STATE"] = os.path.join(tmp, "state")
+        root = os.path.join(tmp, "repo")
+        os.makedirs(root)
+        start = time.perf_counter()
+        written = generate(root, files)
+        print(f"generated {written} files in {time.perf_counter() - start:.1f} s")
+
+        for label, kwargs in (
+            ("full, 1 worker", {"workers": 1}),
+            (f"full, {SCAN_WORKERS} workers", {}),
+            ("stop_early", {"stop_early": True}),
+        ):
+            elapsed, scan = best(lambda: scan_languages(root, LANGUAGE_INDICATORS, use_cache=False, **kwargs), runs)
+            total = sum(scan.counts.values())
+            print(f"{label:20s} {elapsed * 1000:9.1f} ms  files={total:7d}  "
+                  f"languages={','.join(scan.languages())}  complete={scan.complete}")
+
+        if "--no-git" not in sys.argv:
+            for args in (["init", "-q"], ["add", "-A"],
+                         ["-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-qm", "tree"]):
+                subprocess.run(["git", "-C", root, *args], check=True)
+            scan_languages(root, LANGUAGE_INDICATORS)
+            elapsed, scan = best(lambda: scan_languages(root, LANGUAGE_INDICATORS), runs)
+            print(f"{'cached (git key)':20s} {elapsed * 1000:9.1f} ms  languages={','.join(scan.languages())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark the Python type-check stage: cold basedpyright vs a warm language server.
+
+Generates a project of --modules modules imported by one app.py, then edits
+app.py --edits times and times the typecheck stage each time:
+- cli: `basedpyright --outputjson app.py`, as hook processes run it
+- lsp: basedpyright-langserver kept warm by lsp_client, as the checker
+  daemon runs it with the lsp_diagnostics feature (after one warm-up edit)
+Reports the median milliseconds per edit and checks both agree.
+
+Usage: python3 benchmarks/bench_lsp.py [--modules N] [--edits N]
+"""
+
+import dataclasses
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+
+def main() -> int:
+    modules = int(sys.argv[sys.argv.index("--modules") + 1]) if "--modules" in sys.argv else 200
+    edits = int(sys.argv[sys.argv.index("--edits") + 1]) if "--edits" in sys.argv else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = os.path.realpath(tmp)
+        os.environ["NEXT_LEVEL_STATE"] = os.path.join(tmp, "state")
+        os.environ["NEXT_LEVEL_CONFIG"] = os.path.join(tmp, "config.json")
+        import lsp_client
+        import tool_registry
+        from checkers import pipeline, python
+
+        if not tool_registry.which("basedpyright") or not lsp_client.server_command("basedpyright"):
+            print("basedpyright is not installed; nothing to benchmark")
+            return 1
+
+        project = os.path.join(tmp, "project")
+        os.makedirs(os.path.join(project, "pkg"))
+        open(os.path.join(project, "pkg", "__init__.py"), "w").close()
+        for i in range(modules):
+            with open(os.path.join(project, "pkg", f"m{i}.py"), "w", encoding="utf-8") as f:
+                f.write(f"from pkg.m{max(i - 1, 0)} import *  # noqa\n\n\ndef f{i}(x: int) -> int:\n    return x + {i}\n")
+        app = os.path.join(project, "app.py")
+        imports = "".join(f"from pkg.m{i} import f{i}\n" for i in range(modules))
+        os.chdir(project)
+
+        stage = next(s for s in python.PIPELINE.stages if s.name == "typecheck")
+        typecheck = dataclasses.replace(python.PIPELINE, stages=(stage,))
+
+        def edit(n: int) -> list[dict]:
+            with open(app, "w", encoding="utf-8") as f:
+                f.write(f"{imports}\nvalue: str = f{n % modules}({n})\n")
+            start = time.perf_counter()
+            findings = pipeline.run(typecheck, app)["findings"]
+            timings.append(time.perf_counter() - start)
+            return findings
+
+        timings: list[float] = []
+        cli_findings = [edit(n) for n in range(edits)]
+        cli = statistics.median(timings)
+
+        lsp_client.enable()
+        client = lsp_client.client_for("basedpyright", project)
+        if client is None or not client.ready.wait(lsp_client.INITIALIZE_TIMEOUT):
+            print("basedpyright-langserver did not start")
+            return 1
+        edit(edits)
+        timings = []
+        lsp_findings = [edit(n) for n in range(edits)]
+        lsp = statistics.median(timings)
+        lsp_client.shutdown_all()
+
+        print(f"{modules} modules, {edits} edits")
+        print(f"{'basedpyright (cold CLI)':26s} {cli * 1000:8.0f}ms")
+        print(f"{'language server (warm)':26s} {lsp * 1000:8.0f}ms  ({cli / lsp:4.1f}x)")
+        print(f"{'same findings':26s} {cli_findings == lsp_findings!s:>10s}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark the TypeScript checker: one-shot prettier/eslint vs warm Node workers.
+
+Generates a tsconfig project of --modules modules imported by one app.ts, with
+a .prettierrc and an eslint.config.mjs (typed linting through
+typescript-eslint when it is installed), then edits app.ts --edits times and
+times the format and lint stages each time:
+- cli: `prettier --stdin-filepath` and `eslint --format json`, as hook
+  processes run them
+- worker: node_worker.js kept warm per project root, as the checker daemon
+  runs them with the node_workers feature (after one warm-up edit)
+Reports the median milliseconds per edit and stage, and checks both agree.
+
+The tools come from --node-modules DIR (a node_modules with prettier, eslint
+and optionally typescript-eslint and typescript, linked into the project),
+else from the global installs on PATH.
+
+Usage: python3 benchmarks/bench_node_worker.py [--modules N] [--edits N] [--node-modules DIR]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+TYPED_CONFIG = """import tseslint from "typescript-eslint";
+
+export default tseslint.config(...tseslint.configs.recommendedTypeChecked, {
+  languageOptions: { parserOptions: { projectService: true, tsconfigRootDir: import.meta.dirname } },
+});
+"""
+PLAIN_CONFIG = """export default [{ rules: { "no-var": "error", "prefer-const": "error", eqeqeq: "error" } }];
+"""
+
+
+def write_project(root: str, modules: int, typed: bool) -> None:
+    os.makedirs(os.path.join(root, "src", "lib"))
+    files = {
+        "package.json": '{"name": "bench", "private": true, "type": "module"}\n',
+        "tsconfig.json": '{"compilerOptions": {"strict": true, "target": "es2022", "module": "nodenext",'
+                         ' "noEmit": true}, "include": ["src"]}\n',
+        ".prettierrc": '{"printWidth": 100, "singleQuote": true}\n',
+        "eslint.config.mjs": TYPED_CONFIG if typed else PLAIN_CONFIG,
+    }
+    for name, text in files.items():
+        with open(os.path.join(root, name), "w", encoding="utf-8") as f:
+            f.write(text)
+    for i in range(modules):
+        previous = f"import {{ f{i - 1} }} from './m{i - 1}.js';\n\n" if i else ""
+        body = f"f{i - 1}(x) + {i}" if i else f"x + {i}"
+        with open(os.path.join(root, "src", "lib", f"m{i}.ts"), "w", encoding="utf-8") as f:
+            f.write(f"{previous}export function f{i}(x: number): number {{\n  return {body};\n}}\n")
+
+
+def main() -> int:
+    modules = int(sys.argv[sys.argv.index("--modules") + 1]) if "--modules" in sys.argv else 300
+    edits = int(sys.argv[sys.argv.index("--edits") + 1]) if "--edits" in sys.argv else 5
+    node_modules = sys.argv[sys.argv.index("--node-modules") + 1] if "--node-modules" in sys.argv else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = os.path.realpath(tmp)
+        os.environ["NEXT_LEVEL_STATE"] = os.path.join(tmp, "state")
+        os.environ["NEXT_LEVEL_CONFIG"] = os.path.join(tmp, "config.json")
+        if node_modules:
+            os.environ["PATH"] = os.path.join(os.path.abspath(node_modules), ".bin") + os.pathsep + os.environ["PATH"]
+        import node_worker
+        import tool_registry
+        from checkers import pipeline, typescript
+
+        missing = [tool for tool in ("node", "prettier", "eslint") if not tool_registry.which(tool)]
+        if missing:
+            print(f"{', '.join(missing)} not installed; nothing to benchmark")
+            return 1
+
+        project = os.path.join(tmp, "project")
+        typed = bool(node_modules) and os.path.isdir(os.path.join(node_modules, "typescript-eslint"))
+        write_project(project, modules, typed)
+        if node_modules:
+            os.symlink(os.path.abspath(node_modules), os.path.join(project, "node_modules"))
+        app = os.path.join(project, "src", "app.ts")
+        imports = "".join(f"import {{ f{i} }} from './lib/m{i}.js';\n" for i in range(modules))
+        os.chdir(project)
+
+        def edit(n: int) -> list[dict]:
+            with open(app, "w", encoding="utf-8") as f:
+                f.write(f"{imports}\nvar value  =  f{n % modules}({n}) ;\nexport default value;\n")
+            result = pipeline.run(typescript.PIPELINE, app)
+            stages = {t["stage"]: t.get("run_ms", 0.0) for t in result["timings"]["stages"]}
+            timings.append((result["timings"]["total_ms"], stages.get("format", 0.0), stages.get("lint", 0.0)))
+            return result["findings"]
+
+        def medians() -> tuple[float, float, float]:
+            return tuple(statistics.median(column) for column in zip(*timings))
+
+        timings: list[tuple[float, float, float]] = []
+        cli_findings = [edit(n) for n in range(edits)]
+        cli = medians()
+
+        node_worker.enable()
+        edit(edits)
+        timings = []
+        worker_findings = [edit(n) for n in range(edits)]
+        worker = medians()
+        node_worker.shutdown_all()
+
+        print(f"{modules} modules, {edits} edits, {'typed' if typed else 'untyped'} eslint config")
+        print(f"{'':24s} {'total':>9s} {'format':>9s} {'lint':>9s}")
+        print(f"{'one-shot CLI':24s} {cli[0]:8.0f}ms {cli[1]:8.0f}ms {cli[2]:8.0f}ms")
+        print(f"{'warm Node workers':24s} {worker[0]:8.0f}ms {worker[1]:8.0f}ms {worker[2]:8.0f}ms"
+              f"  ({cli[0] / max(worker[0], 0.001):4.1f}x)")
+        print(f"{'same findings':24s} {cli_findings == worker_findings!s:>9s}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
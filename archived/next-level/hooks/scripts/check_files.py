@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Batch file checker — checks many files with one tool run per language.
+
+Usage:
+    check_files.py <file> [<file> ...]
+    git diff --name-only | check_files.py -
+    check_files.py --all [DIR] [--workers N] [--summary FILE]
+
+Prints a JSON object mapping each resolved path to its findings dict.
+With --all, checks every source file under DIR (default: the current
+directory) on a process pool (lib/bulk_check.py), streaming one JSON line per
+file and a final summary line; --summary also writes the summary to FILE.
+Exits 1 if any file has findings, 0 otherwise.
+"""
+
+import json
+import os
+import sys
+
+# Add lib to path
+PLUGIN_ROOT = os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
+
+from checkers import check_files
+
+
+ALL_USAGE = "usage: check_files.py --all [DIR] [--workers N] [--summary FILE]"
+
+
+def _option(argv: list[str], name: str) -> str | None:
+    """The value following an option, or None if it is absent. Raises ValueError if it has none."""
+    if name not in argv:
+        return None
+    position = argv.index(name) + 1
+    if position >= len(argv) or argv[position].startswith("--"):
+        raise ValueError(f"{name} needs a value")
+    return argv[position]
+
+
+def check_all(argv: list[str]) -> int:
+    """Check a whole tree: `--all [DIR] [--workers N] [--summary FILE]`."""
+    from bulk_check import scan
+
+    try:
+        workers_arg = _option(argv, "--workers")
+        summary_file = _option(argv, "--summary")
+        workers = None
+        if workers_arg is not None:
+            if not workers_arg.isdigit() or int(workers_arg) < 1:
+                raise ValueError(f"--workers must be a positive integer, not {workers_arg!r}")
+            workers = int(workers_arg)
+    except ValueError as exc:
+        print(f"{exc}\n{ALL_USAGE}", file=sys.stderr)
+        return 2
+    position = argv.index("--all") + 1
+    root = argv[position] if position < len(argv) and not argv[position].startswith("--") else os.getcwd()
+    if not os.path.isdir(root):
+        print(f"Not a directory: {root}", file=sys.stderr)
+        return 2
+
+    summary = scan(root, sys.stdout, workers)
+    if summary_file:
+        with open(summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["findings"] else 0
+
+
+def main(argv: list[str]) -> int:
+    """Check the given files (or newline-separated paths on stdin with `-`)."""
+    if "--all" in argv:
+        return check_all(argv)
+    paths = [line.strip() for line in sys.stdin] if argv == ["-"] else argv
+    files = sorted({os.path.realpath(p) for p in paths if p and os.path.isfile(p)})
+    if not files:
+        return 0
+
+    results = check_files(files)
+    print(json.dumps(results, indent=2))
+    return 1 if any(r.get("findings") for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,9 +1,25 @@
 #!/usr/bin/env bash
 # Configuration reader for next-level hooks
-# Reads ~/.next-level/config.json using jq
+# Reads ~/.next-level/config.json from the snapshot lib/config.py writes
+# alongside it (config.json.env), falling back to jq
 set -euo pipefail
 
 NEXT_LEVEL_CONFIG="${NEXT_LEVEL_CONFIG:-${HOME}/.next-level/config.json}"
+NEXT_LEVEL_CONFIG_SNAPSHOT="${NEXT_LEVEL_CONFIG}.env"
+
+# Source the flattened snapshot once, unless config.json is newer than it
+# (edited by hand or by config_write) — then every lookup goes through jq
+NL_CONFIG_SNAPSHOT=0
+if [[ -f "$NEXT_LEVEL_CONFIG_SNAPSHOT" && -f "$NEXT_LEVEL_CONFIG" \
+      && ! "$NEXT_LEVEL_CONFIG" -nt "$NEXT_LEVEL_CONFIG_SNAPSHOT" ]]; then
+  # shellcheck source=/dev/null
+  source "$NEXT_LEVEL_CONFIG_SNAPSHOT" || NL_CONFIG_SNAPSHOT=0
+fi
+
+# Whether a name can be answered from the snapshot (valid shell identifier)
+_config_snapshot_has() {
+  [[ "$NL_CONFIG_SNAPSHOT" == 1 && "$1" =~ ^[A-Za-z_][A-Za-z0-9_]*$ ]]
+}
 
 # Check if config exists
 config_exists() {
@@ -16,6 +32,13 @@ config_get() {
   if ! config_exists; then
     return 1
   fi
+  if _config_snapshot_has "$field"; then
+    local var="NL_CFG_$field"
+    if [[ -n "${!var-}" ]]; then
+      printf '%s\n' "${!var}"
+    fi
+    return 0
+  fi
   jq -r --arg f "$field" '.[$f] // empty' "$NEXT_LEVEL_CONFIG"
 }
 
@@ -31,15 +54,39 @@ config_languages() {
   if ! config_exists; then
     return 1
   fi
+  if [[ "$NL_CONFIG_SNAPSHOT" == 1 ]]; then
+    if [[ -n "${NL_LANGUAGES-}" ]]; then
+      printf '%s\n' "$NL_LANGUAGES"
+    fi
+    return 0
+  fi
   jq -r '.languages_detected // [] | .[]' "$NEXT_LEVEL_CONFIG"
 }
 
+# Check if a language was detected at setup
+config_has_language() {
+  local language="$1"
+  if ! config_exists; then
+    return 1
+  fi
+  if [[ "$NL_CONFIG_SNAPSHOT" == 1 ]]; then
+    [[ $'\n'"${NL_LANGUAGES-}"$'\n' == *$'\n'"$language"$'\n'* ]]
+    return
+  fi
+  jq -e --arg l "$language" '(.languages_detected // []) | index($l)' "$NEXT_LEVEL_CONFIG" > /dev/null 2>&1
+}
+
 # Check if a feature is enabled
 config_feature_enabled() {
   local feature="$1"
   if ! config_exists; then
     return 1
   fi
+  if _config_snapshot_has "$feature"; then
+    local var="NL_FEATURE_$feature"
+    [[ "${!var-}" == "true" ]]
+    return
+  fi
   local val
   val=$(jq -r --arg f "$feature" '.features_enabled[$f] // false' "$NEXT_LEVEL_CONFIG")
   [[ "$val" == "true" ]]
@@ -51,6 +98,11 @@ config_plugin_available() {
   if ! config_exists; then
     return 1
   fi
+  if _config_snapshot_has "$plugin"; then
+    local var="NL_PLUGIN_$plugin"
+    [[ "${!var-}" == "true" ]]
+    return
+  fi
   local val
   val=$(jq -r --arg p "$plugin" '.plugins_available[$p] // false' "$NEXT_LEVEL_CONFIG")
   [[ "$val" == "true" ]]
@@ -79,4 +131,7 @@ config_write() {
   chmod 600 "$tmp"
   mv "$tmp" "$NEXT_LEVEL_CONFIG"
   trap - EXIT INT TERM
+  # The snapshot no longer matches; lib/config.py regenerates it on its next write
+  rm -f "$NEXT_LEVEL_CONFIG_SNAPSHOT"
+  NL_CONFIG_SNAPSHOT=0
 }
@@ -1,8 +1,16 @@
 #!/usr/bin/env bash
 # Diagnostic Report — analyzes hook-events.jsonl to show hook propagation behavior
 # Run after a /batch session to see what fired where
+#
+# `diagnostic-report.sh timings [--session ID]` instead reports checker stage
+# timings (p50/p95/p99 per language, stage and tool) logged by the timing_log feature.
 set -euo pipefail
 
+if [[ "${1:-}" == "timings" ]]; then
+  shift
+  exec python3 "$(cd "$(dirname "$0")/../../lib" && pwd)/timing_log.py" report "$@"
+fi
+
 LOG_FILE="${HOME}/.next-level/diagnostic/hook-events.jsonl"
 
 if [[ ! -f "$LOG_FILE" ]]; then
@@ -3,6 +3,21 @@
 
 Reads hook input JSON, extracts file path, detects language, routes to
 language-specific checker. Exits 2 with findings for non-blocking feedback.
+
+Checks are served by the per-workspace checker daemon when it is running
+(see lib/checker_daemon.py). Otherwise they run in-process and a daemon is
+spawned in the background for subsequent edits. A daemon that times out is
+not retried in-process: the hook's own timeout would kill that run.
+
+With the edit_coalescing feature, edits are queued per path (lib/edit_queue.py)
+and only checked once the path has been quiet for edit_debounce_ms, or when
+the Stop hook runs `file_checker.py --flush`.
+
+With the diff_scoped_checks feature, an Edit's comment stripping and findings
+are limited to the lines it touched (lib/edit_scope.py).
+
+With the timing_log feature, each result's stage timings are appended to the
+session's timings.jsonl (lib/timing_log.py).
 """
 
 import json
@@ -13,45 +28,63 @@ import sys
 PLUGIN_ROOT = os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.join(os.path.dirname(__file__), "..", ".."))
 sys.path.insert(0, os.path.join(PLUGIN_ROOT, "lib"))
 
-from checkers import check_file
+import checker_daemon
 
 
-def main() -> int:
-    """Dispatch file checks for PostToolUse hook events."""
-    # Read hook input from stdin
-    try:
-        raw = sys.stdin.read()
-        hook_input = json.loads(raw)
-    except (json.JSONDecodeError, ValueError):
-        return 0  # Can't parse input, skip silently
+def run_checks(real_path: str, workspace: str, session_id: str, scope: dict | None = None) -> dict:
+    """Check a file via the warm daemon, falling back to an in-process run."""
+    result = checker_daemon.request(real_path, workspace, session_id, scope=scope)
+    if result is not None:
+        return result
 
-    tool_name = hook_input.get("tool_name", "")
+    from checkers import check_file
+    from config import feature_enabled
+    from edit_scope import EditScope
+    from result_cache import ResultCache
 
-    # Only check Edit and Write tools
-    if tool_name not in ("Edit", "Write"):
-        return 0
+    if feature_enabled("checker_daemon"):
+        checker_daemon.spawn(workspace)
+    return check_file(real_path, cache=ResultCache.for_session(session_id),
+                      scope=EditScope.from_payload(scope))
 
-    tool_input = hook_input.get("tool_input", {})
-    file_path = tool_input.get("file_path", "")
 
-    if not file_path:
-        return 0
+def edit_scope(tool_name: str, tool_input: dict) -> dict | None:
+    """The diff scope payload for this edit, or None to check the whole file."""
+    from config import diff_scope_margin, feature_enabled
+    from edit_scope import EditScope
 
-    # Skip non-existent files (file might have been deleted)
-    if not os.path.isfile(file_path):
-        return 0
+    if not feature_enabled("diff_scoped_checks"):
+        return None
+    scope = EditScope.from_tool_input(tool_name, tool_input, diff_scope_margin())
+    return scope.to_payload() if scope else None
 
-    # Guard against out-of-workspace paths (including symlinks)
-    real_path = os.path.realpath(file_path)
-    workspace = os.path.realpath(os.getcwd())
-    if not real_path.startswith(workspace + os.sep) and real_path != workspace:
-        return 0
 
-    # Run checks using the resolved path for consistency with the guard
-    result = check_file(real_path)
+def run_batch_checks(real_paths: list[str], workspace: str, session_id: str) -> dict[str, dict]:
+    """Batch-check files via the warm daemon, falling back to an in-process run."""
+    results = checker_daemon.request_many(real_paths, workspace, session_id)
+    if results is None:
+        from checkers import check_files
+        from result_cache import ResultCache
+
+        results = check_files(real_paths, cache=ResultCache.for_session(session_id))
+    log_timings(session_id, results)
+    return results
+
 
+def log_timings(session_id: str, results: dict[str, dict]) -> None:
+    """Append the results' stage timings to the session log when timing_log is on."""
+    from config import feature_enabled
+
+    if feature_enabled("timing_log"):
+        import timing_log
+
+        timing_log.record(session_id, results)
+
+
+def feedback_parts(real_path: str, result: dict) -> list[str]:
+    """Describe one file's check result as feedback lines (empty if nothing to report)."""
     if result.get("skipped"):
-        return 0
+        return []
 
     # Collect findings
     findings = result.get("findings", [])
@@ -61,7 +94,7 @@ def main() -> int:
     length_warning = result.get("length_warning")
 
     if not findings and not formatted and not stripped and not length_warning:
-        return 0
+        return []
 
     # Build feedback message
     parts = []
@@ -86,10 +119,135 @@ def main() -> int:
     if length_warning:
         parts.append(length_warning)
 
-    message = " | ".join(parts) if len(parts) <= 2 else "\n".join(parts)
+    return parts
+
+
+def batch_feedback_parts(results: dict[str, dict]) -> list[str]:
+    """Feedback lines for several files, each file's first line tagged with its name."""
+    parts = []
+    for real_path, result in sorted(results.items()):
+        file_parts = feedback_parts(real_path, result)
+        if file_parts:
+            parts.append(f"[{os.path.basename(real_path)}] {file_parts[0]}")
+            parts.extend(file_parts[1:])
+    return parts
+
 
+def emit(parts: list[str]) -> int:
+    """Print feedback for Claude. Exit 2 = non-blocking feedback."""
+    if not parts:
+        return 0
+    message = " | ".join(parts) if len(parts) <= 2 else "\n".join(parts)
     print(json.dumps({"result": message}))
-    return 2  # Non-blocking feedback
+    return 2
+
+
+def stop_verdict(results: dict[str, dict]) -> int:
+    """Stop hook outcome: block (exit 2, reason on stderr) only when a file has findings.
+
+    Exit 2 from a Stop hook keeps the session going, so formatting and comment
+    stripping alone, which need no follow-up, let it stop.
+    """
+    if not any(result.get("findings") for result in results.values()):
+        return 0
+    print("Unresolved findings in edited files:\n" + "\n".join(batch_feedback_parts(results)), file=sys.stderr)
+    return 2
+
+
+def coalesced_parts(real_path: str, workspace: str, session_id: str) -> list[str] | None:
+    """Queue this edit and check the paths that have gone quiet.
+
+    Returns None when edit coalescing is off (check immediately as usual).
+    """
+    import time
+
+    from checkers import peek_file
+    from config import edit_debounce_ms, feature_enabled
+    from edit_queue import EditQueue
+    from result_cache import ResultCache
+
+    if not feature_enabled("edit_coalescing"):
+        return None
+    queue = EditQueue.for_session(session_id)
+    if queue is None:
+        return None
+
+    queue.record(real_path)
+    parts = feedback_parts(real_path, peek_file(real_path, ResultCache.for_session(session_id)))
+
+    due = [p for p in queue.quiet(edit_debounce_ms(), exclude=real_path) if os.path.isfile(p)]
+    if due:
+        checked_at = time.time()
+        parts.extend(batch_feedback_parts(run_batch_checks(due, workspace, session_id)))
+        queue.done(due, checked_at)
+    return parts
+
+
+def flush(hook_input: dict) -> int:
+    """Stop hook: check every path still waiting in the edit queue, blocking only on findings."""
+    import time
+
+    from config import feature_enabled
+    from edit_queue import EditQueue
+
+    if not feature_enabled("edit_coalescing"):
+        return 0
+    session_id = hook_input.get("session_id") or "unknown"
+    queue = EditQueue.for_session(session_id)
+    if queue is None:
+        return 0
+    workspace = os.path.realpath(os.getcwd())
+    pending = queue.pending()
+    due = [p for p in pending if os.path.isfile(p)]
+    checked_at = time.time()
+    results = run_batch_checks(due, workspace, session_id) if due else {}
+    queue.done(pending, checked_at)
+    return stop_verdict(results)
+
+
+def main() -> int:
+    """Dispatch file checks for PostToolUse hook events."""
+    # Read hook input from stdin
+    try:
+        raw = sys.stdin.read()
+        hook_input = json.loads(raw)
+    except (json.JSONDecodeError, ValueError):
+        return 0  # Can't parse input, skip silently
+
+    if "--flush" in sys.argv[1:]:
+        return flush(hook_input)
+
+    tool_name = hook_input.get("tool_name", "")
+
+    # Only check Edit and Write tools
+    if tool_name not in ("Edit", "Write"):
+        return 0
+
+    tool_input = hook_input.get("tool_input", {})
+    file_path = tool_input.get("file_path", "")
+
+    if not file_path:
+        return 0
+
+    # Skip non-existent files (file might have been deleted)
+    if not os.path.isfile(file_path):
+        return 0
+
+    # Guard against out-of-workspace paths (including symlinks)
+    real_path = os.path.realpath(file_path)
+    workspace = os.path.realpath(os.getcwd())
+    if not real_path.startswith(workspace + os.sep) and real_path != workspace:
+        return 0
+
+    session_id = hook_input.get("session_id") or "unknown"
+    parts = coalesced_parts(real_path, workspace, session_id)
+    if parts is not None:
+        return emit(parts)
+
+    # Run checks using the resolved path for consistency with the guard
+    result = run_checks(real_path, workspace, session_id, edit_scope(tool_name, tool_input))
+    log_timings(session_id, {real_path: result})
+    return emit(feedback_parts(real_path, result))
 
 
 if __name__ == "__main__":
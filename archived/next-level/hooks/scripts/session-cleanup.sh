@@ -21,6 +21,8 @@ SESSION_DIR="${SESSIONS_DIR}/${SESSION_ID}"
 if [[ -d "$SESSION_DIR" ]]; then
   # Remove transient tracking files (edit counts, transcript offsets)
   rm -f "$SESSION_DIR/edits_since_test" "$SESSION_DIR/transcript_offset" 2>/dev/null || true
+  # Drop the check_file result cache and any unflushed edit events
+  rm -rf "$SESSION_DIR/check-cache" "$SESSION_DIR/edit-queue" 2>/dev/null || true
   # Remove empty session dirs
   rmdir "$SESSION_DIR" 2>/dev/null || true
 fi
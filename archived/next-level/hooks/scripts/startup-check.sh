@@ -41,7 +41,6 @@ fi
 
 # Check 3: Quick staleness check — look for new language config files
 # that weren't present at setup time (always scan from config root)
-config_langs=$(config_get "languages_detected" 2>/dev/null || echo "[]")
 scan_dir="${real_config_root:-$real_current_dir}"
 
 stale=false
@@ -50,27 +49,27 @@ for indicator in package.json tsconfig.json Cargo.toml Package.swift pyproject.t
   if [[ -f "$scan_dir/$indicator" ]]; then
     case "$indicator" in
       package.json|tsconfig.json)
-        if ! echo "$config_langs" | jq -e 'index("typescript") or index("javascript")' > /dev/null 2>&1; then
+        if ! config_has_language typescript && ! config_has_language javascript; then
           stale=true
         fi
         ;;
       Cargo.toml)
-        if ! echo "$config_langs" | jq -e 'index("rust")' > /dev/null 2>&1; then
+        if ! config_has_language rust; then
           stale=true
         fi
         ;;
       Package.swift)
-        if ! echo "$config_langs" | jq -e 'index("swift")' > /dev/null 2>&1; then
+        if ! config_has_language swift; then
           stale=true
         fi
         ;;
       pyproject.toml)
-        if ! echo "$config_langs" | jq -e 'index("python")' > /dev/null 2>&1; then
+        if ! config_has_language python; then
           stale=true
         fi
         ;;
       go.mod)
-        if ! echo "$config_langs" | jq -e 'index("go")' > /dev/null 2>&1; then
+        if ! config_has_language go; then
           stale=true
         fi
         ;;
@@ -0,0 +1,572 @@
+#!/usr/bin/env bash
+# Golden tests for the language checkers
+# Fake tool binaries replay recorded outputs; check_file results must match exactly.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+BIN="$TMPDIR/bin"
+WORK="$TMPDIR/work"
+mkdir -p "$BIN" "$WORK"
+# Keep config and the tool registry (tools/ beside it) out of ~/.next-level
+export NEXT_LEVEL_CONFIG="$TMPDIR/config.json"
+
+# fake_tool <name> [stdout-file] [stderr-file]
+# Without recordings the tool is a formatter that succeeds without changes;
+# otherwise it replays the recorded output for any non-formatting invocation.
+fake_tool() {
+  local name="$1" out="${2:-}" err="${3:-}"
+  cat > "$BIN/$name" <<EOF
+#!/usr/bin/env bash
+echo "\$*" >> "$TMPDIR/$name.calls"
+[[ -z "$out$err" ]] && exit 0
+case "\${1:-}" in
+  format|-w|--write) exit 0 ;;
+esac
+[[ -n "$out" ]] && cat "$out"
+[[ -n "$err" ]] && cat "$err" >&2
+exit 1
+EOF
+  chmod +x "$BIN/$name"
+}
+
+run_test() {
+  local name="$1" file="$2" expected="$3"
+  local actual
+  actual=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$file" <<EOF
+import json, sys
+sys.path.insert(0, "$LIB_DIR")
+from checkers import check_file
+result = check_file(sys.argv[1])
+# Durations vary run to run; only their shape is checked
+timings = result.pop("timings")
+assert isinstance(timings["total_ms"], float) and timings["stages"], timings
+assert all({"stage", "tool"} <= set(stage) and ("run_ms" in stage or stage.get("skipped")) for stage in timings["stages"]), timings
+print(json.dumps(result, sort_keys=True))
+EOF
+)
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- Recorded tool outputs ---
+
+cat > "$TMPDIR/ruff.json" <<'JSON'
+[{"cell":null,"code":"F401","end_location":{"column":10,"row":1},"filename":"WORK/app.py","fix":null,"location":{"column":8,"row":1},"message":"`os` imported but unused","noqa_row":1,"url":"https://docs.astral.sh/ruff/rules/unused-import"},
+ {"cell":null,"code":"B006","end_location":{"column":20,"row":4},"filename":"WORK/app.py","fix":null,"location":{"column":18,"row":4},"message":"Do not use mutable data structures for argument defaults","noqa_row":4,"url":""}]
+JSON
+
+cat > "$TMPDIR/basedpyright.json" <<'JSON'
+{"version":"1.21.0","time":"0","generalDiagnostics":[
+ {"file":"WORK/app.py","severity":"error","message":"\"undefined_name\" is not defined","range":{"start":{"line":5,"character":11},"end":{"line":5,"character":25}},"rule":"reportUndefinedVariable"},
+ {"file":"WORK/app.py","severity":"information","message":"Import cycles","range":{"start":{"line":0,"character":0},"end":{"line":0,"character":1}},"rule":""},
+ {"file":"WORK/app.py","severity":"warning","message":"Type of \"x\" is partially unknown","range":{"start":{"line":3,"character":4},"end":{"line":3,"character":5}},"rule":"reportUnknownVariableType"}],
+ "summary":{"filesAnalyzed":1,"errorCount":1,"warningCount":1,"informationCount":1,"timeInSec":0.4}}
+JSON
+
+cat > "$TMPDIR/eslint.json" <<'JSON'
+[{"filePath":"WORK/app.ts","messages":[
+ {"ruleId":"no-unused-vars","severity":2,"message":"'x' is assigned a value but never used.","line":1,"column":7,"nodeType":"Identifier","endLine":1,"endColumn":8},
+ {"ruleId":"prefer-const","severity":1,"message":"'y' is never reassigned. Use 'const' instead.","line":2,"column":5,"nodeType":"Identifier"}],
+ "errorCount":1,"warningCount":1,"source":"const x = 1;\nlet y = 2;\n"}]
+JSON
+
+cat > "$TMPDIR/govet.txt" <<'TXT'
+# example.com/app
+./main.go:6:2: fmt.Printf format %d has arg "x" of wrong type string
+other/util.go:3:1: unreachable code
+TXT
+
+cat > "$TMPDIR/golangci.json" <<'JSON'
+{"Issues":[{"FromLinter":"errcheck","Text":"Error return value of `f.Close` is not checked","Severity":"","SourceLines":["\tf.Close()"],"Pos":{"Filename":"main.go","Offset":80,"Line":9,"Column":9}}],"Report":{"Linters":[]}}
+JSON
+
+cat > "$TMPDIR/clippy.jsonl" <<'JSON'
+{"reason":"compiler-artifact","package_id":"app 0.1.0","target":{"name":"app"}}
+{"reason":"compiler-message","package_id":"app 0.1.0","message":{"message":"this looks like you are swapping `a` and `b` manually","code":{"code":"clippy::manual_swap","explanation":null},"level":"warning","spans":[{"file_name":"src/main.rs","line_start":4,"line_end":6,"column_start":5,"column_end":14,"is_primary":true}]}}
+{"reason":"compiler-message","package_id":"app 0.1.0","message":{"message":"unused variable: `z`","code":null,"level":"warning","spans":[{"file_name":"src/lib.rs","line_start":2,"line_end":2,"column_start":9,"column_end":10,"is_primary":true}]}}
+{"reason":"build-finished","success":true}
+JSON
+
+cat > "$TMPDIR/swiftlint.txt" <<'TXT'
+WORK/App.swift:3:5: warning: Identifier Name Violation: Variable name 'x' should be between 3 and 40 characters long (identifier_name)
+WORK/App.swift:7:1: error: Force Cast Violation: Force casts should be avoided (force_cast)
+TXT
+
+# --- Python: ruff + basedpyright, merged in declaration order ---
+fake_tool ruff "$TMPDIR/ruff.json"
+fake_tool basedpyright "$TMPDIR/basedpyright.json"
+printf 'import os\n\n\ndef f(x=[]):\n    y = x\n    return undefined_name\n' > "$WORK/app.py"
+run_test "python ruff + basedpyright" "$WORK/app.py" \
+  '{"comments_stripped": 0, "findings": [{"column": 8, "line": 1, "message": "`os` imported but unused", "rule": "F401", "severity": "error"}, {"column": 18, "line": 4, "message": "Do not use mutable data structures for argument defaults", "rule": "B006", "severity": "warning"}, {"line": 6, "message": "\"undefined_name\" is not defined", "rule": "reportUndefinedVariable", "severity": "error"}, {"line": 4, "message": "Type of \"x\" is partially unknown", "rule": "reportUnknownVariableType", "severity": "warning"}], "formatted": true}'
+
+# --- TypeScript: prettier + eslint, comment stripped before lint ---
+fake_tool prettier
+fake_tool eslint "$TMPDIR/eslint.json"
+printf 'const x = 1; // counter\nlet y = 2;\n' > "$WORK/app.ts"
+run_test "typescript prettier + eslint" "$WORK/app.ts" \
+  '{"comments_stripped": 1, "findings": [{"column": 7, "line": 1, "message": "'"'"'x'"'"' is assigned a value but never used.", "rule": "no-unused-vars", "severity": "error"}, {"column": 5, "line": 2, "message": "'"'"'y'"'"' is never reassigned. Use '"'"'const'"'"' instead.", "rule": "prefer-const", "severity": "warning"}], "formatted": true}'
+
+# --- Go: gofmt + go vet (the file's package, from the module root) + golangci-lint ---
+fake_tool gofmt
+fake_tool go "" "$TMPDIR/govet.txt"
+fake_tool golangci-lint "$TMPDIR/golangci.json"
+mkdir -p "$WORK/gomod"
+printf 'module example.com/app\n\ngo 1.21\n' > "$WORK/gomod/go.mod"
+printf 'package main\n\nfunc main() {\n}\n' > "$WORK/gomod/main.go"
+run_test "go vet + golangci-lint" "$WORK/gomod/main.go" \
+  '{"comments_stripped": 0, "findings": [{"column": 2, "line": 6, "message": "fmt.Printf format %d has arg \"x\" of wrong type string", "rule": "go-vet", "severity": "warning"}, {"column": 9, "line": 9, "message": "Error return value of `f.Close` is not checked", "rule": "errcheck", "severity": ""}], "formatted": true}'
+
+if grep -qx 'vet \.' "$TMPDIR/go.calls" && ! grep -q 'vet \./\.\.\.' "$TMPDIR/go.calls"; then
+  echo "PASS: go vet is scoped to the file's package"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: go vet is scoped to the file's package"
+  echo "  calls: $(tr '\n' ';' < "$TMPDIR/go.calls")"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Go without a module: go vet is skipped ---
+mkdir -p "$WORK/nomod"
+printf 'package main\n' > "$WORK/nomod/main.go"
+run_test "go without go.mod skips vet" "$WORK/nomod/main.go" \
+  '{"comments_stripped": 0, "findings": [{"column": 9, "line": 9, "message": "Error return value of `f.Close` is not checked", "rule": "errcheck", "severity": ""}], "formatted": true}'
+
+# --- Rust: rustfmt + clippy spans filtered to the edited file ---
+fake_tool rustfmt
+fake_tool cargo "$TMPDIR/clippy.jsonl"
+mkdir -p "$WORK/crate/src"
+printf '[package]\nname = "app"\n' > "$WORK/crate/Cargo.toml"
+printf 'fn main() {}\n' > "$WORK/crate/src/main.rs"
+printf 'pub fn f() {\n    let z = 1;\n}\n' > "$WORK/crate/src/lib.rs"
+run_test "rust clippy" "$WORK/crate/src/main.rs" \
+  '{"comments_stripped": 0, "findings": [{"column": 5, "line": 4, "message": "this looks like you are swapping `a` and `b` manually", "rule": "clippy::manual_swap", "severity": "warning"}], "formatted": true}'
+
+# --- Rust: another file of the unchanged crate is answered from the crate index ---
+run_test "rust clippy crate index reused" "$WORK/crate/src/lib.rs" \
+  '{"comments_stripped": 0, "findings": [{"column": 9, "line": 2, "message": "unused variable: `z`", "rule": "", "severity": "warning"}], "formatted": true}'
+printf 'pub fn f() {\n    let z = 2;\n}\n' > "$WORK/crate/src/lib.rs"
+run_test "rust clippy reruns after a crate edit" "$WORK/crate/src/main.rs" \
+  '{"comments_stripped": 0, "findings": [{"column": 5, "line": 4, "message": "this looks like you are swapping `a` and `b` manually", "rule": "clippy::manual_swap", "severity": "warning"}], "formatted": true}'
+clippy_runs=$(grep -c '^clippy' "$TMPDIR/cargo.calls" || true)
+if [[ "$clippy_runs" == "2" ]]; then
+  echo "PASS: clippy runs once per crate state"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: clippy runs once per crate state"
+  echo "  expected 2 clippy runs, got $clippy_runs"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Swift: swiftlint text fallback ---
+fake_tool swiftformat
+fake_tool swiftlint "$TMPDIR/swiftlint.txt"
+printf 'let value = 1\n' > "$WORK/App.swift"
+run_test "swift swiftlint text fallback" "$WORK/App.swift" \
+  '{"comments_stripped": 0, "findings": [{"column": 5, "line": 3, "message": "Identifier Name Violation: Variable name '"'"'x'"'"' should be between 3 and 40 characters long", "rule": "identifier_name", "severity": "warning"}, {"column": 1, "line": 7, "message": "Force Cast Violation: Force casts should be avoided", "rule": "force_cast", "severity": "error"}], "formatted": true}'
+
+# --- Diff scope: only the edited line is stripped and reported ---
+fake_tool prettier
+fake_tool eslint "$TMPDIR/eslint.json"
+printf 'const x = 1; // counter\nlet y = 2; // other\n' > "$WORK/scoped.ts"
+actual=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$WORK/scoped.ts" <<EOF
+import json, sys
+sys.path.insert(0, "$LIB_DIR")
+from checkers import check_file
+from edit_scope import EditScope
+result = check_file(sys.argv[1], scope=EditScope(("let y = 2; // other",), margin=0))
+print(result["comments_stripped"], [f["line"] for f in result["findings"]], open(sys.argv[1]).read().splitlines())
+EOF
+)
+if [[ "$actual" == "1 [2] ['const x = 1; // counter', 'let y = 2;']" ]]; then
+  echo "PASS: diff scope limits stripping and findings to the edit"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: diff scope limits stripping and findings to the edit"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Batch: one ruff/basedpyright run per language, output split per file ---
+mkdir -p "$WORK/batch"
+printf 'import os\n' > "$WORK/batch/one.py"
+printf 'x = 1\n' > "$WORK/batch/two.py"
+BATCH_DIR="$(cd "$WORK/batch" && pwd -P)"
+sed "s#WORK/app.py#$BATCH_DIR/one.py#; 2s#$BATCH_DIR/one.py#$BATCH_DIR/two.py#" "$TMPDIR/ruff.json" > "$TMPDIR/ruff-batch.json"
+fake_tool ruff "$TMPDIR/ruff-batch.json"
+fake_tool basedpyright "$TMPDIR/empty.json"
+echo '{"generalDiagnostics": []}' > "$TMPDIR/empty.json"
+rm -f "$TMPDIR"/ruff.calls "$TMPDIR"/basedpyright.calls
+PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" "$SCRIPT_DIR/check_files.py" \
+  "$BATCH_DIR/one.py" "$BATCH_DIR/two.py" > "$TMPDIR/batch.json" || true
+actual=$("$PYTHON" - "$TMPDIR/batch.json" <<'EOF'
+import json, os, sys
+results = json.load(open(sys.argv[1]))
+print(" ".join("%s:%s" % (os.path.basename(name), [f["rule"] for f in r["findings"]])
+               for name, r in sorted(results.items())))
+EOF
+)
+calls="$(wc -l < "$TMPDIR/ruff.calls" | tr -d ' ')/$(wc -l < "$TMPDIR/basedpyright.calls" | tr -d ' ')"
+if [[ "$actual" == "one.py:['F401'] two.py:['B006']" && "$calls" == "2/1" ]]; then
+  echo "PASS: batch splits per file with one run per tool"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: batch splits per file with one run per tool"
+  echo "  actual: $actual (ruff/basedpyright calls: $calls)"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Batch: relative and symlinked paths keep their findings, keyed as passed ---
+ln -s "$BATCH_DIR" "$WORK/linked"
+rm -f "$TMPDIR"/ruff.calls
+actual=$(cd "$BATCH_DIR" && PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$WORK/linked/two.py" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from checkers import check_files
+results = check_files(["one.py", sys.argv[1]])
+print(" ".join("%s:%s" % (name.replace("$WORK/", ""), [f["rule"] for f in r["findings"]])
+               for name, r in sorted(results.items())))
+EOF
+)
+if [[ "$actual" == "linked/two.py:['B006'] one.py:['F401']" && "$(wc -l < "$TMPDIR/ruff.calls" | tr -d ' ')" == "2" ]]; then
+  echo "PASS: batch maps relative and symlinked paths back to the caller's keys"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: batch maps relative and symlinked paths back to the caller's keys"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Batch: golangci-lint runs once per package directory ---
+mkdir -p "$WORK/multi/a" "$WORK/multi/b"
+MULTI_DIR="$(cd "$WORK/multi" && pwd -P)"
+printf 'module example.com/multi\n\ngo 1.21\n' > "$MULTI_DIR/go.mod"
+printf 'package a\n' > "$MULTI_DIR/a/x.go"
+printf 'package b\n' > "$MULTI_DIR/b/y.go"
+fake_tool go
+# Like the real tool, refuses named files from more than one directory
+cat > "$BIN/golangci-lint" <<EOF
+#!/usr/bin/env bash
+echo "\$*" >> "$TMPDIR/golangci-lint.calls"
+files=(); for arg in "\$@"; do [[ "\$arg" == *.go ]] && files+=("\$arg"); done
+if [[ \$(for f in "\${files[@]}"; do dirname "\$f"; done | sort -u | wc -l) -gt 1 ]]; then
+  echo "named files must all be in one directory" >&2
+  exit 3
+fi
+out='{"Issues": ['; sep=""
+for f in "\${files[@]}"; do
+  out+="\$sep{\"FromLinter\": \"errcheck\", \"Text\": \"unchecked\", \"Pos\": {\"Filename\": \"\$f\", \"Line\": 1, \"Column\": 1}}"
+  sep=","
+done
+echo "\$out]}"
+exit 1
+EOF
+chmod +x "$BIN/golangci-lint"
+rm -f "$TMPDIR/golangci-lint.calls"
+actual=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$MULTI_DIR/a/x.go" "$MULTI_DIR/b/y.go" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from checkers import check_files
+results = check_files(sys.argv[1:])
+print(" ".join("%s:%s" % (path.rsplit("/", 1)[-1], [f["rule"] for f in results[path]["findings"]]) for path in sys.argv[1:]))
+EOF
+)
+calls=$(wc -l < "$TMPDIR/golangci-lint.calls" | tr -d ' ')
+if [[ "$actual" == "x.go:['errcheck'] y.go:['errcheck']" && "$calls" == "2" ]]; then
+  echo "PASS: golangci-lint batches split per package directory"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: golangci-lint batches split per package directory"
+  echo "  actual: $actual (golangci-lint calls: $calls)"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Bulk: --all walks the tree on a process pool and re-runs from the cache ---
+mkdir -p "$WORK/bulk/svc" "$WORK/bulk/generated" "$WORK/bulk/node_modules/dep"
+BULK_DIR="$(cd "$WORK/bulk" && pwd -P)"
+echo 'generated/' > "$BULK_DIR/.gitignore"
+printf 'x = 1\n' > "$BULK_DIR/top.py"
+printf 'x = 1\n' > "$BULK_DIR/test_top.py"
+printf 'x = 1\n' > "$BULK_DIR/generated/gen.py"
+printf 'x = 1\n' > "$BULK_DIR/node_modules/dep/dep.py"
+printf '[project]\nname = "svc"\n' > "$BULK_DIR/svc/pyproject.toml"
+printf 'import os\n' > "$BULK_DIR/svc/one.py"
+printf 'y = 2\n' > "$BULK_DIR/svc/two.py"
+# Reports F401 for every checked file that imports os
+cat > "$BIN/ruff" <<EOF
+#!/usr/bin/env bash
+echo "\$*" >> "$TMPDIR/ruff.calls"
+[[ "\$1" == format ]] && exit 0
+out="["; sep=""
+for f in "\$@"; do
+  if [[ "\$f" == *.py ]] && grep -q "import os" "\$f"; then
+    out+="\$sep{\"code\": \"F401\", \"filename\": \"\$f\", \"location\": {\"row\": 1, \"column\": 8}, \"message\": \"unused\"}"
+    sep=","
+  fi
+done
+echo "\$out]"
+exit 1
+EOF
+rm -f "$TMPDIR"/ruff.calls
+bulk() {
+  (cd "$BULK_DIR" && PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" "$SCRIPT_DIR/check_files.py" \
+    --all --workers 2 --summary "$TMPDIR/summary.json") > "$TMPDIR/bulk.jsonl" || true
+  "$PYTHON" - "$TMPDIR/bulk.jsonl" "$BULK_DIR" <<'EOF'
+import json, os, sys
+lines = [json.loads(line) for line in open(sys.argv[1])]
+summary = lines.pop()["summary"]
+files = sorted("%s@%s:%s" % (os.path.relpath(r["file"], sys.argv[2]), os.path.relpath(r["root"], sys.argv[2]),
+                             [f["rule"] for f in r["result"]["findings"]]) for r in lines)
+print(" ".join(files), summary["files"], summary["cached"], summary["excluded"], summary["findings"])
+EOF
+}
+first=$(bulk)
+first_calls=$(grep -c check "$TMPDIR/ruff.calls")
+second=$(bulk)
+second_calls=$(grep -c check "$TMPDIR/ruff.calls")
+summary_checked=$("$PYTHON" -c 'import json, sys; print(json.load(open(sys.argv[1]))["checked"])' "$TMPDIR/summary.json")
+# Two workers split svc into one-file chunks: three ruff runs, none on the re-run
+expected="svc/one.py@svc:['F401'] svc/two.py@svc:[] top.py@.:[] 3"
+if [[ "$first" == "$expected 0 1 1" && "$second" == "$expected 3 1 1" && "$first_calls/$second_calls" == "3/3" \
+      && "$summary_checked" == "3" ]]; then
+  echo "PASS: bulk scan groups by project root and re-runs from the cache"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: bulk scan groups by project root and re-runs from the cache"
+  echo "  first:  $first"
+  echo "  second: $second (ruff check calls: $first_calls/$second_calls, summary checked: $summary_checked)"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Bulk: bad --workers/--summary arguments print usage and exit 2 ---
+actual=""
+for args in "--workers x" "--workers 0" "--workers" "--summary"; do
+  status=0
+  # shellcheck disable=SC2086
+  (cd "$BULK_DIR" && "$PYTHON" "$SCRIPT_DIR/check_files.py" --all $args) > /dev/null 2> "$TMPDIR/usage.err" || status=$?
+  usage=$(grep -c '^usage: check_files.py --all' "$TMPDIR/usage.err" || true)
+  traceback=$(grep -c Traceback "$TMPDIR/usage.err" || true)
+  actual+="$status:$usage:$traceback "
+done
+if [[ "$actual" == "2:1:0 2:1:0 2:1:0 2:1:0 " ]]; then
+  echo "PASS: bulk scan rejects bad arguments with usage"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: bulk scan rejects bad arguments with usage"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Cache: tool config edits invalidate entries; concurrent counters add up ---
+printf '[project]\nname = "svc"\n\n[tool.ruff]\nline-length = 100\n' > "$BULK_DIR/svc/pyproject.toml"
+third=$(bulk)
+third_calls=$(grep -c check "$TMPDIR/ruff.calls")
+counted=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$BULK_DIR/top.py" <<EOF
+import sys
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, "$LIB_DIR")
+from result_cache import ResultCache
+def lookups(_):
+    cache = ResultCache("$TMPDIR/counted")
+    for _ in range(50):
+        cache.get(cache.key(sys.argv[1], "python"))
+        cache.flush()
+with ProcessPoolExecutor(4) as pool:
+    list(pool.map(lookups, range(4)))
+print(ResultCache("$TMPDIR/counted").stats()["misses"])
+EOF
+)
+# Only top.py (outside svc) is answered from the cache
+if [[ "$third" == "$expected 1 1 1" && "$third_calls" == "5" && "$counted" == "200" ]]; then
+  echo "PASS: cache keys cover tool config files and counters survive concurrency"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: cache keys cover tool config files and counters survive concurrency"
+  echo "  third:  $third (ruff check calls: $third_calls, counted misses: $counted)"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Tool registry: sessions under different PATHs keep separate entries ---
+registry() {
+  PATH="$1" "$PYTHON" - <<EOF
+import json, sys
+sys.path.insert(0, "$LIB_DIR")
+import tool_registry
+found = tool_registry.which("ruff")
+entry = json.load(open(tool_registry.registry_path()))["tools"]["ruff"]
+print(found == "$BIN/ruff" if found else None, entry["path"] == found, entry["checked"])
+EOF
+}
+with_bin=$(registry "$BIN:$PATH")
+without_bin=$(registry "$PATH")
+again=$(registry "$BIN:$PATH")
+registries=$(ls "$TMPDIR/tools" 2>/dev/null | wc -l) || true
+# The first PATH's entry survives the second session untouched (same resolution time)
+if [[ "${with_bin% *} ${without_bin% *}" == "True True None True" && "$again" == "$with_bin" \
+      && "$registries" -ge 2 ]]; then
+  echo "PASS: tool registry keeps one file per PATH"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: tool registry keeps one file per PATH"
+  echo "  actual: $with_bin / $without_bin / $again ($registries registries)"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Writes keep CRLF line endings and hard links ---
+mkdir -p "$WORK/crlf"
+CRLF_DIR="$(cd "$WORK/crlf" && pwd -P)"
+printf 'x = 1  # set x\r\ny = 2\r\n' > "$CRLF_DIR/single.py"
+printf 'z = 3  # set z\r\n' > "$CRLF_DIR/batched.py"
+printf 'w = 4\r\n' > "$CRLF_DIR/other.py"
+ln "$CRLF_DIR/single.py" "$CRLF_DIR/single-link.py"
+# Formats on stdin by echoing the buffer, as ruff does for an already formatted file
+cat > "$BIN/ruff" <<EOF
+#!/usr/bin/env bash
+[[ "\$1" == format && "\${*: -1}" == - ]] && exec cat
+[[ "\$1" == format ]] && exit 0
+echo "[]"
+EOF
+chmod +x "$BIN/ruff"
+actual=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$CRLF_DIR" <<EOF
+import os, sys
+sys.path.insert(0, "$LIB_DIR")
+from checkers import check_file, check_files
+d = sys.argv[1]
+single = check_file(os.path.join(d, "single.py"))
+check_files([os.path.join(d, "batched.py"), os.path.join(d, "other.py")])
+print(single["comments_stripped"], [open(os.path.join(d, name), "rb").read() for name in ("single.py", "batched.py")],
+      os.path.samefile(os.path.join(d, "single.py"), os.path.join(d, "single-link.py")))
+EOF
+)
+if [[ "$actual" == "1 [b'x = 1\\r\\ny = 2\\r\\n', b'z = 3\\r\\n'] True" ]]; then
+  echo "PASS: formatting and stripping keep CRLF line endings and hard links"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: formatting and stripping keep CRLF line endings and hard links"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Daemon: a check that times out is not re-run in-process ---
+printf 'x = 1\n' > "$WORK/slow.py"
+actual=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$WORK/slow.py" <<EOF
+import os, socket, sys, time
+sys.path.insert(0, "$SCRIPT_DIR")
+sys.path.insert(0, "$LIB_DIR")
+import checker_daemon, file_checker
+# A daemon that accepts requests and never answers
+path = checker_daemon.socket_path("$WORK")
+os.makedirs(os.path.dirname(path), exist_ok=True)
+server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+server.bind(path)
+server.listen()
+request = checker_daemon.request
+checker_daemon.request = lambda *args, **kwargs: request(*args, **kwargs, timeout=0.3)
+start = time.monotonic()
+result = file_checker.run_checks(sys.argv[1], "$WORK", "timeout-test")
+print(result, time.monotonic() - start < 2)
+EOF
+)
+if [[ "$actual" == "{'skipped': True, 'reason': 'checker daemon timed out'} True" ]]; then
+  echo "PASS: daemon timeout skips the in-process retry"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: daemon timeout skips the in-process retry"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Daemon: batches take every file's lock; malformed scopes do not kill a request ---
+printf 'x = 1\n' > "$WORK/locked.py"
+actual=$(PATH="$BIN:$PATH" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$WORK" <<EOF
+import json, os, socket, sys, threading
+sys.path.insert(0, "$LIB_DIR")
+import checker_daemon
+from edit_scope import EditScope
+workspace = os.path.realpath(sys.argv[1])
+target = os.path.join(workspace, "locked.py")
+server = checker_daemon._Server(workspace)
+
+def ask(payload):
+    client, conn = socket.socketpair()
+    client.sendall(json.dumps(payload).encode() + b"\n")
+    thread = threading.Thread(target=checker_daemon._handle, args=(conn, workspace, server))
+    thread.start()
+    return client, thread
+
+def answer(client):
+    client.settimeout(20)
+    return json.loads(client.makefile().readline() or "null")
+
+lock = server.lock_for(target)
+lock.acquire()
+client, thread = ask({"files": [target], "session_id": "locks"})
+thread.join(0.5)
+waited = thread.is_alive()
+lock.release()
+batch = answer(client)
+thread.join()
+client, thread = ask({"file": target, "session_id": "locks", "scope": {"snippets": ["x"], "margin": None}})
+single = answer(client)
+thread.join()
+scopes = [EditScope.from_payload({"snippets": ["x"], "margin": m}) for m in (None, "3", -1, True, 3)]
+print(waited, sorted(batch["results"]) == [target], "result" in single, [s and s.margin for s in scopes])
+EOF
+)
+if [[ "$actual" == "True True True [None, None, None, None, 3]" ]]; then
+  echo "PASS: daemon batch waits for per-file locks and tolerates a bad margin"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: daemon batch waits for per-file locks and tolerates a bad margin"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+# --- Formatter whose stdin mode echoes nothing: its file command runs instead ---
+SILENT_BIN="$TMPDIR/silent-bin"
+SILENT_DIR="$TMPDIR/silent"
+mkdir -p "$SILENT_BIN" "$SILENT_DIR"
+cat > "$SILENT_BIN/ruff" <<'EOF'
+#!/usr/bin/env bash
+if [[ "$1" == format ]]; then
+  [[ "${*: -1}" == - ]] && { cat > /dev/null; exit 0; }
+  for f in "${@:2}"; do [[ "$f" == *.py ]] && sed -i 's/[ \t]*$//' "$f"; done
+  exit 0
+fi
+echo "[]"
+EOF
+chmod +x "$SILENT_BIN/ruff"
+printf 'x = 1   \ny = 2  # drop\n' > "$SILENT_DIR/a.py"
+actual=$(PATH="$SILENT_BIN:/usr/bin:/bin" NEXT_LEVEL_STATE="$TMPDIR/state" "$PYTHON" - "$SILENT_DIR/a.py" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from checkers import check_file
+result = check_file(sys.argv[1])
+print(result["formatted"], result["comments_stripped"], repr(open(sys.argv[1]).read()))
+EOF
+)
+if [[ "$actual" == "True 1 'x = 1\\ny = 2\\n'" ]]; then
+  echo "PASS: empty stdin-mode output falls back to the file command"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: empty stdin-mode output falls back to the file command"
+  echo "  actual: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
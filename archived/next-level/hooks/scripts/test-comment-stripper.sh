@@ -0,0 +1,131 @@
+#!/usr/bin/env bash
+# Tests for lib/comment_stripper.py: the C-family lexer (_CScanner), the
+# streaming Python stripper and the line-scoped mode used by diff-scoped checks
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+# run_test <name> <language> <source> <expected> [lines as "first-last,..."]
+run_test() {
+  local name="$1" language="$2" source="$3" expected="$4" lines="${5:-}"
+  local actual
+  actual=$("$PYTHON" - "$language" "$source" "$expected" "$lines" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from comment_stripper import strip_source
+language, source, expected, spec = sys.argv[1:]
+lines = [tuple(map(int, r.split("-"))) for r in spec.split(",")] if spec else None
+result = strip_source(source, language, lines)
+content = result["content"]
+consistent = result["modified"] == (content != source) and (result["stripped"] > 0) == result["modified"]
+print("ok" if content == expected and consistent else f"got {content!r} (stripped {result['stripped']})")
+EOF
+)
+  if [[ "$actual" != "ok" ]]; then
+    echo "FAIL: $name"
+    echo "  $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- C family: literals are never mistaken for comments ---
+run_test "// inside strings and URLs" typescript \
+  $'const u = "http://example.com"; // drop\nconst p = \'a//b\';\nfetch(`https://x.io//y`);\n' \
+  $'const u = "http://example.com";\nconst p = \'a//b\';\nfetch(`https://x.io//y`);\n'
+
+run_test "template literal with \${} holding strings and comments" typescript \
+  $'const t = `a // b ${f("`//`", /* drop */ 1)} c /* d */`;\n// drop\nnext();\n' \
+  $'const t = `a // b ${f("`//`", 1)} c /* d */`;\nnext();\n'
+
+run_test "regex literal containing //" typescript \
+  $'const re = /https?:\\/\\/[a-z]+/g; // drop\nconst half = a / b / c;\n' \
+  $'const re = /https?:\\/\\/[a-z]+/g;\nconst half = a / b / c;\n'
+
+run_test "nested Rust block comment" rust \
+  $'let x = 1; /* outer /* inner */ still outer */ let y = 2;\nfn f() {}\n' \
+  $'let x = 1; let y = 2;\nfn f() {}\n'
+
+run_test "code after */ on the same line is kept" typescript \
+  $'call(); /* drop */ other(); /* drop */ last();\n/* whole\n   line */\nend();\n' \
+  $'call(); other(); last();\nend();\n'
+
+run_test "Rust raw strings and lifetimes" rust \
+  $'let s = r#"// not "a" comment"#; // drop\nfn f<\'a>(x: &\'a str) -> char { \'/\' }\n' \
+  $'let s = r#"// not "a" comment"#;\nfn f<\'a>(x: &\'a str) -> char { \'/\' }\n'
+
+run_test "Go raw string" go \
+  $'package main\n\nvar s = `// not a comment\n/* nor this */`\n\nfunc main() {\n\tx := 1 // drop\n}\n' \
+  $'package main\n\nvar s = `// not a comment\n/* nor this */`\n\nfunc main() {\n\tx := 1\n}\n'
+
+run_test "Swift raw string and interpolation" swift \
+  $'let s = #"// not "q" "#; // drop\nlet t = "v: \\(f("//")) // still string"\n' \
+  $'let s = #"// not "q" "#;\nlet t = "v: \\(f("//")) // still string"\n'
+
+# --- C family: directive comments survive ---
+run_test "eslint and @ts- directives" typescript \
+  $'// eslint-disable-next-line no-console\nconsole.log(1); // eslint-disable-line\n// @ts-expect-error\nbad();\n// plain\n' \
+  $'// eslint-disable-next-line no-console\nconsole.log(1); // eslint-disable-line\n// @ts-expect-error\nbad();\n'
+
+run_test "swiftlint directives" swift \
+  $'// swiftlint:disable force_cast\nlet x = y as! Int\n// plain\nlet z = 1\n' \
+  $'// swiftlint:disable force_cast\nlet x = y as! Int\nlet z = 1\n'
+
+run_test "//go: directives and godoc" go \
+  $'//go:build linux\n\npackage main\n\n//go:generate stringer -type=Kind\n// Kind is documented.\ntype Kind int\n\nfunc f() {\n\t// plain\n\treturn\n}\n' \
+  $'//go:build linux\n\npackage main\n\n//go:generate stringer -type=Kind\n// Kind is documented.\ntype Kind int\n\nfunc f() {\n\treturn\n}\n'
+
+run_test "CRLF input keeps CRLF" typescript \
+  $'a();\r\n// drop\r\nb(); // drop\r\n/* drop */\r\nc();\r\n' \
+  $'a();\r\nb();\r\nc();\r\n'
+
+# --- Python: the preserve rules of the list-based stripper ---
+run_test "Python preserve rules" python \
+  $'#!/usr/bin/env python3\n# -*- coding: utf-8 -*-\nimport os  # noqa: F401\nx = []  # type: list[int]\nif x:  # pragma: no cover\n    pass  # pylint: disable=unnecessary-pass\n# TODO: keep\n# plain\ny = 1  # inline\n' \
+  $'#!/usr/bin/env python3\nimport os  # noqa: F401\nx = []  # type: list[int]\nif x:  # pragma: no cover\n    pass  # pylint: disable=unnecessary-pass\n# TODO: keep\ny = 1\n'
+
+run_test "Python license header kept in the first lines only" python \
+  $'# Copyright 2024 Example\n# SPDX-License-Identifier: MIT\nx = 1\n' \
+  $'# Copyright 2024 Example\n# SPDX-License-Identifier: MIT\nx = 1\n'
+
+run_test "# inside strings and f-strings" python \
+  $'s = "# not"\nf = f"{s}#{d[\'#\']}"  # drop\nt = \'\'\'\n# inside a docstring\n\'\'\'\n' \
+  $'s = "# not"\nf = f"{s}#{d[\'#\']}"\nt = \'\'\'\n# inside a docstring\n\'\'\'\n'
+
+run_test "Python CRLF input keeps CRLF" python \
+  $'x = 1  # drop\r\n# drop\r\ny = 2\r\n' \
+  $'x = 1\r\ny = 2\r\n'
+
+run_test "Python source that does not tokenize is left alone" python \
+  $'x = (1,  # open\n' \
+  $'x = (1,  # open\n'
+
+long_source=$("$PYTHON" -c 'print("".join(f"x{i} = {i}  # c{i}\n# line {i}\n" for i in range(1500)), end="")')
+long_expected=$("$PYTHON" -c 'print("".join(f"x{i} = {i}\n" for i in range(1500)), end="")')
+run_test "Python comments across the streaming window" python "$long_source"$'\n' "$long_expected"$'\n'
+
+# --- Scoped stripping (lines=) for diff-scoped checks ---
+run_test "Python lines= strips only the given lines" python \
+  $'a = 1  # one\nb = 2  # two\n# three\nc = 3  # four\nd = 4  # five\n' \
+  $'a = 1  # one\nb = 2\nc = 3  # four\nd = 4\n' \
+  "2-3,5-5"
+
+run_test "C-family lines= strips only the given lines" typescript \
+  $'a(); // one\nb(); // two\n/* three\n   four */\nc(); // five\n' \
+  $'a(); // one\nb();\n/* three\n   four */\nc(); // five\n' \
+  "2-2"
+
+run_test "C-family lines= sees a block comment opened before the range" typescript \
+  $'/* x\n// not a line comment\n*/\nd(); // drop\n' \
+  $'/* x\n// not a line comment\n*/\nd();\n' \
+  "2-4"
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
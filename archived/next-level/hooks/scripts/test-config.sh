@@ -0,0 +1,165 @@
+#!/usr/bin/env bash
+# Tests for lib/config.py: update() transactions and the layered snapshot()
+# (global config.json < nearest .next-level.json < NEXT_LEVEL_* variables)
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+export NEXT_LEVEL_CONFIG="$TMPDIR/global/config.json"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+
+run_test() {
+  local name="$1" expected="$2" actual="$3"
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- update(): concurrent writers to different keys both persist ---
+rm -rf "$TMPDIR/global"
+actual=$("$PYTHON" - <<EOF
+import json, multiprocessing, sys, time
+sys.path.insert(0, "$LIB_DIR")
+import config
+
+def writer(key, rounds):
+    for i in range(rounds):
+        def bump(current):
+            time.sleep(0.002)  # widen the read-modify-write window
+            current[key] = current.get(key, 0) + 1
+        config.update(bump)
+
+procs = [multiprocessing.Process(target=writer, args=(key, 20)) for key in ("a", "b", "c")]
+for proc in procs:
+    proc.start()
+for proc in procs:
+    proc.join()
+with open(config.config_path(), encoding="utf-8") as f:
+    written = json.load(f)
+print([written.get(key) for key in ("a", "b", "c")], config.read().get("a"))
+EOF
+)
+run_test "concurrent update() callers changing different keys all persist" "[20, 20, 20] 20" "$actual"
+
+# --- update(): a failing mutator leaves config.json untouched ---
+actual=$("$PYTHON" - <<EOF
+import os, sys
+sys.path.insert(0, "$LIB_DIR")
+import config
+path = config.config_path()
+config.update(lambda current: {**current, "trust_level": "cautious"})
+before = (open(path, "rb").read(), os.stat(path).st_mtime_ns)
+
+def broken(current):
+    current["trust_level"] = "autonomous"
+    raise RuntimeError("boom")
+
+try:
+    config.update(broken)
+    raised = False
+except RuntimeError:
+    raised = True
+after = (open(path, "rb").read(), os.stat(path).st_mtime_ns)
+leftovers = [name for name in os.listdir(path.parent) if name.startswith(".config.")]
+print(raised, before == after, config.trust_level(), leftovers)
+EOF
+)
+run_test "an exception in the mutator leaves config.json untouched" "True True cautious []" "$actual"
+
+# --- Layering: global < nearest .next-level.json < NEXT_LEVEL_* ---
+P="$TMPDIR/layers"
+mkdir -p "$P/app/sub/deep" "$P/other"
+"$PYTHON" - <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+import config
+config.write({**config.read(), "trust_level": "cautious", "checkpoint_depth": "full", "edit_debounce_ms": 100,
+              "features_enabled": {"timing_log": True, "node_workers": True}})
+EOF
+printf '{"checkpoint_depth": "light", "edit_debounce_ms": 200, "features_enabled": {"node_workers": false}}\n' > "$P/.next-level.json"
+printf '{"edit_debounce_ms": 300}\n' > "$P/app/sub/.next-level.json"
+
+layered() {
+  "$PYTHON" - "$@" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+import config
+for project in sys.argv[1:]:
+    s = config.snapshot(project)
+    print(s.trust_level, s.checkpoint_depth, s.edit_debounce_ms,
+          s.feature_enabled("timing_log"), s.feature_enabled("node_workers"), end="; ")
+EOF
+}
+
+run_test "project layer overrides global; objects merge key by key" \
+  "cautious light 200 True False; " "$(layered "$P/app")"
+run_test "only the nearest .next-level.json above the project applies" \
+  "cautious full 300 True True; cautious full 300 True True; " "$(layered "$P/app/sub" "$P/app/sub/deep")"
+run_test "environment overrides every file layer" \
+  "autonomous light 400 False True; " \
+  "$(NEXT_LEVEL_TRUST_LEVEL=autonomous NEXT_LEVEL_EDIT_DEBOUNCE_MS=400 NEXT_LEVEL_FEATURE_TIMING_LOG=0 \
+     NEXT_LEVEL_FEATURE_NODE_WORKERS=yes layered "$P/app")"
+run_test "unparseable environment values are ignored" \
+  "cautious light 200 True False; " \
+  "$(NEXT_LEVEL_EDIT_DEBOUNCE_MS=soon NEXT_LEVEL_FEATURE_TIMING_LOG=maybe layered "$P/app")"
+
+# --- Layering: edits and deletion of the project file, in one process ---
+actual=$("$PYTHON" - "$P" <<EOF
+import os, sys
+sys.path.insert(0, "$LIB_DIR")
+import config
+layer = os.path.join(sys.argv[1], ".next-level.json")
+project = os.path.join(sys.argv[1], "app")
+seen = [config.snapshot(project).checkpoint_depth]
+with open(layer, "w") as f:
+    f.write('{"checkpoint_depth": "medium", "features_enabled": {"node_workers": false}}\n')
+seen.append(config.snapshot(project).checkpoint_depth)
+os.unlink(layer)
+seen.append(config.snapshot(project).checkpoint_depth)
+print(" ".join(seen))
+EOF
+)
+run_test "edits and deletion of .next-level.json are picked up" "light medium full" "$actual"
+
+# --- Every feature default has an environment override ---
+actual=$("$PYTHON" - <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+import config
+names = {key.partition(".")[2]: name for name, key, _ in config._ENV_NAMES if key.startswith("features_enabled.")}
+print(sorted(names) == sorted(config.DEFAULT_CONFIG["features_enabled"]), names.get("edit_coalescing"))
+EOF
+)
+run_test "feature overrides follow DEFAULT_CONFIG" "True NEXT_LEVEL_FEATURE_EDIT_COALESCING" "$actual"
+
+# --- The per-project memo evicts the least recently used project ---
+actual=$("$PYTHON" - "$P" <<EOF
+import os, sys
+sys.path.insert(0, "$LIB_DIR")
+import config
+config.MAX_PROJECTS = 2
+a, b, c = (os.path.join(sys.argv[1], name) for name in ("app", "other", "app/sub"))
+config.snapshot(a)
+config.snapshot(b)
+config.snapshot(a)
+config.snapshot(c)
+print(sorted(os.path.relpath(p, sys.argv[1]) for p in config._merged))
+EOF
+)
+run_test "memo overflow evicts the least recently used project only" "['app', 'app/sub']" "$actual"
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
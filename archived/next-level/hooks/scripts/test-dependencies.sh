@@ -0,0 +1,89 @@
+#!/usr/bin/env bash
+# Tests for lib/dependencies.py: concurrent tool probes under one deadline
+# Stub tools print a version; one of them hangs on --version.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+BIN="$TMPDIR/bin"
+mkdir -p "$BIN"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+
+for tool in ruff basedpyright prettier eslint gofmt gopls; do
+  printf '#!/usr/bin/env bash\nsleep 0.5\necho "%s 1.0"\n' "$tool" > "$BIN/$tool"
+done
+printf '#!/usr/bin/env bash\nexec sleep 30\n' > "$BIN/golangci-lint"
+chmod +x "$BIN"/*
+
+# probe <config dir> <mode> <deadline seconds> — JSON {"status": ..., "seconds": ...}
+# mode "parallel" calls _probe_tools; "sequential" probes one tool at a time.
+# Each config dir has its own tool registry, so no run sees another's versions.
+probe() {
+  NEXT_LEVEL_CONFIG="$TMPDIR/$1/config.json" PATH="$BIN:/usr/bin:/bin" "$PYTHON" - "$2" "$3" <<EOF
+import json, sys, time
+sys.path.insert(0, "$LIB_DIR")
+import dependencies
+mode, budget = sys.argv[1], float(sys.argv[2])
+languages = ["python", "typescript", "go", "rust"]
+start = time.monotonic()
+if mode == "parallel":
+    status, _ = dependencies._probe_tools(languages, start + budget)
+else:
+    status = {}
+    for lang in languages:
+        status[lang] = {}
+        for name, info in dependencies.LANGUAGE_TOOLS[lang].items():
+            available = dependencies.check_binary(info["binary"])
+            version = dependencies.check_binary_version(info["binary"], timeout=budget) if available else None
+            status[lang][name] = {**info, "available": available, "version": version}
+print(json.dumps({"status": status, "seconds": time.monotonic() - start}, sort_keys=True))
+EOF
+}
+
+run_test() {
+  local name="$1" expected="$2" actual="$3"
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- Parallel probes report exactly what sequential probes do ---
+sequential=$(probe seq sequential 1)
+parallel=$(probe par parallel 1)
+actual=$("$PYTHON" - "$sequential" "$parallel" <<'EOF'
+import json, sys
+seq, par = (json.loads(arg) for arg in sys.argv[1:])
+go = par["status"]["go"]
+print(seq["status"] == par["status"], go["gofmt"]["version"], go["golangci-lint"]["version"],
+      par["status"]["rust"]["rustfmt"]["available"], par["seconds"] < seq["seconds"] / 2)
+EOF
+)
+run_test "parallel probes equal sequential probes, in a fraction of the time" \
+  "True gofmt 1.0 installed False True" "$actual"
+
+# --- A hanging probe is cut off at the overall deadline ---
+actual=$("$PYTHON" - "$(probe deadline parallel 1)" <<'EOF'
+import json, sys
+result = json.loads(sys.argv[1])
+versions = {name: tool["version"] for tools in result["status"].values() for name, tool in tools.items()}
+print(versions["golangci-lint"], versions["ruff"], versions["gopls"], versions["rustfmt"], result["seconds"] < 2.5)
+EOF
+)
+run_test "a hanging probe reports installed once the deadline passes" \
+  "installed ruff 1.0 gopls 1.0 None True" "$actual"
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
@@ -0,0 +1,164 @@
+#!/usr/bin/env bash
+# Tests for edit coalescing: lib/edit_queue.py and file_checker.py's deferred
+# checks, peek_file and the --flush Stop hook
+# A stub ruff formats by trimming trailing whitespace and reports F401 for
+# every file that imports os; every invocation is logged to ruff.calls.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+BIN="$TMPDIR/bin"
+WORK="$(mkdir -p "$TMPDIR/work" && cd "$TMPDIR/work" && pwd -P)"
+mkdir -p "$BIN"
+export NEXT_LEVEL_CONFIG="$TMPDIR/config.json"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+export NEXT_LEVEL_FEATURE_CHECKER_DAEMON=0
+export NEXT_LEVEL_FEATURE_EDIT_COALESCING=1
+echo '{"edit_debounce_ms": 300}' > "$NEXT_LEVEL_CONFIG"
+
+cat > "$BIN/ruff" <<EOF
+#!/usr/bin/env bash
+echo "\$*" >> "$TMPDIR/ruff.calls"
+if [[ "\$1" == format ]]; then
+  if [[ "\${*: -1}" == - ]]; then
+    sed 's/[ \t]*\$//'
+  else
+    for f in "\${@:2}"; do [[ "\$f" == *.py ]] && sed -i 's/[ \t]*\$//' "\$f"; done
+  fi
+  exit 0
+fi
+out="["; sep=""
+for f in "\$@"; do
+  if [[ "\$f" == *.py ]] && grep -q "import os" "\$f"; then
+    out+="\$sep{\"code\": \"F401\", \"filename\": \"\$f\", \"location\": {\"row\": 1, \"column\": 8}, \"message\": \"unused\"}"
+    sep=","
+  fi
+done
+echo "\$out]"
+EOF
+chmod +x "$BIN/ruff"
+
+# hook <session> [--flush] [file] — runs file_checker.py from the workspace,
+# printing "<exit>|<stdout>|<stderr>"
+hook() {
+  local session="$1" mode="${2:-}" file="${3:-}"
+  local input status=0
+  input="{\"session_id\": \"$session\", \"tool_name\": \"Edit\", \"tool_input\": {\"file_path\": \"$file\"}}"
+  (cd "$WORK" && echo "$input" | PATH="$BIN:/usr/bin:/bin" "$PYTHON" "$SCRIPT_DIR/file_checker.py" $mode \
+    > "$TMPDIR/out" 2> "$TMPDIR/err") || status=$?
+  echo "$status|$(cat "$TMPDIR/out")|$(cat "$TMPDIR/err")"
+}
+
+edit() {
+  hook "$1" "" "$2"
+}
+
+queued() {
+  "$PYTHON" - "$1" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from edit_queue import EditQueue
+print([p.rsplit("/", 1)[-1] for p in EditQueue.for_session(sys.argv[1]).pending()])
+EOF
+}
+
+ruff_checks() {
+  [[ -f "$TMPDIR/ruff.calls" ]] || { echo 0; return; }
+  grep -c '^check' "$TMPDIR/ruff.calls" || true
+}
+
+check() {
+  local name="$1" expected="$2" actual="$3"
+  if [[ "$actual" == "$expected" ]]; then
+    echo "PASS: $name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+reset() {
+  rm -f "$TMPDIR/ruff.calls" "$WORK"/*.py
+}
+
+# --- An edit is deferred, then checked once the path is quiet ---
+reset
+printf 'import os\n' > "$WORK/a.py"
+printf 'x = 1\n' > "$WORK/b.py"
+first=$(edit s1 "$WORK/a.py")
+first_checks=$(ruff_checks)
+sleep 0.4
+second=$(edit s1 "$WORK/b.py")
+check "edit is deferred, then checked once quiet" \
+  "0|| 0 2 1 ['b.py']" \
+  "$first $first_checks ${second%%|*} $(ruff_checks) $(queued s1)"
+check "quiet path's findings are reported on the next edit" \
+  "yes" "$([[ "$second" == *'[a.py] '*'1 issue(s) found'*'unused'* ]] && echo yes || echo "no: $second")"
+
+# --- A re-edit within the debounce window keeps the path waiting ---
+reset
+printf 'import os\n' > "$WORK/a.py"
+printf 'x = 1\n' > "$WORK/b.py"
+edit s2 "$WORK/a.py" > /dev/null
+edit s2 "$WORK/b.py" > /dev/null
+edit s2 "$WORK/a.py" > /dev/null
+check "edits within the debounce window coalesce" "0 ['a.py', 'b.py']" "$(ruff_checks) $(queued s2)"
+
+# --- A cached result answers the edit without deferring its findings ---
+reset
+printf 'import os\n' > "$WORK/a.py"
+edit s3 "$WORK/a.py" > /dev/null
+hook s3 --flush > /dev/null
+peeked=$(edit s3 "$WORK/a.py")
+check "peek_file answers an already-checked edit from the cache" \
+  "2 1" "${peeked%%|*} $(ruff_checks)"
+
+# --- --flush drains the queue and blocks Stop on findings ---
+reset
+printf 'import os\n' > "$WORK/a.py"
+printf 'x = 1\n' > "$WORK/b.py"
+edit s4 "$WORK/a.py" > /dev/null
+edit s4 "$WORK/b.py" > /dev/null
+flushed=$(hook s4 --flush)
+status=${flushed%%|*}
+stdout=${flushed#*|}; stdout=${stdout%%|*}
+check "--flush drains the queue in one batch" "1 []" "$(ruff_checks) $(queued s4)"
+check "--flush blocks Stop with the findings on stderr" \
+  "2 empty-stdout yes" \
+  "$status $([[ -z "$stdout" ]] && echo empty-stdout || echo "stdout: $stdout") $([[ "${flushed##*|}" == *'a.py'*'unused'* ]] && echo yes || echo no)"
+
+# --- Formatting alone does not block Stop ---
+reset
+printf 'x = 1   \n' > "$WORK/a.py"
+edit s5 "$WORK/a.py" > /dev/null
+check "--flush with only formatting lets Stop through" \
+  "0|| x = 1 []" "$(hook s5 --flush) $(cat "$WORK/a.py") $(queued s5)"
+
+# --- A path deleted before the flush is dropped ---
+reset
+printf 'import os\n' > "$WORK/gone.py"
+edit s6 "$WORK/gone.py" > /dev/null
+rm "$WORK/gone.py"
+check "a path deleted before the flush is dropped" "0|| 0 []" "$(hook s6 --flush) $(ruff_checks) $(queued s6)"
+
+# --- With the flag off, edits are checked immediately as before ---
+reset
+printf 'import os\n' > "$WORK/a.py"
+immediate=$(NEXT_LEVEL_FEATURE_EDIT_COALESCING=0 edit s7 "$WORK/a.py")
+check "flag off checks the edit immediately" \
+  "2 1 yes" "${immediate%%|*} $(ruff_checks) $([[ "$immediate" == *'{"result": '*'1 issue(s) found'* ]] && echo yes || echo no)"
+check "flag off queues nothing and --flush is a no-op" \
+  "0|| [] 1" "$(NEXT_LEVEL_FEATURE_EDIT_COALESCING=0 hook s7 --flush) $(queued s7) $(ruff_checks)"
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
@@ -0,0 +1,138 @@
+#!/usr/bin/env bash
+# Tests for lib/language_scan.py: the .gitignore matcher that decides which
+# files `check_files.py --all` checks (and rewrites), and the scan cache keyed
+# on the git tree hash and index
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+export NEXT_LEVEL_CONFIG="$TMPDIR/config.json"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+
+# tree <dir> <file>... — creates empty files (and their directories)
+tree() {
+  local dir="$1"
+  shift
+  for f in "$@"; do
+    mkdir -p "$dir/$(dirname "$f")"
+    : > "$dir/$f"
+  done
+}
+
+# listed <dir> — the source files source_files() keeps, relative and sorted
+listed() {
+  "$PYTHON" - "$1" <<EOF
+import os, sys
+sys.path.insert(0, "$LIB_DIR")
+from language_scan import source_files
+print(" ".join(sorted(os.path.relpath(f, sys.argv[1]) for f in source_files(sys.argv[1]))))
+EOF
+}
+
+# git_listed <dir> — the same files as git sees them (untracked, not ignored)
+git_listed() {
+  git init -q "$1" && git -C "$1" ls-files --others --exclude-standard -- '*.py' '*.go' | sort | tr '\n' ' ' | sed 's/ $//'
+}
+
+# run_test <name> <expected> <actual> [dir] — with a dir, git must agree too
+run_test() {
+  local name="$1" expected="$2" actual="$3" dir="${4:-}"
+  if [[ -n "$dir" ]] && command -v git >/dev/null 2>&1; then
+    actual+=" (git: $(git_listed "$dir"))"
+    expected+=" (git: $expected)"
+  fi
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- Negation ---
+D="$TMPDIR/negation"
+tree "$D" keep.py drop.py sub/keep.py sub/drop.py
+printf '*.py\n!keep.py\n' > "$D/.gitignore"
+run_test "! re-includes a file ignored by an earlier pattern" "keep.py sub/keep.py" "$(listed "$D")" "$D"
+
+# --- Anchored vs unanchored ---
+D="$TMPDIR/anchored"
+tree "$D" build.py sub/build.py gen.py sub/deep/gen.py sub/only.py other/sub/only.py main.py
+printf '/build.py\ngen.py\nsub/only.py\n' > "$D/.gitignore"
+run_test "leading or middle / anchors to the .gitignore's directory; bare names match anywhere" \
+  "main.py other/sub/only.py sub/build.py" "$(listed "$D")" "$D"
+
+# --- Directory-only patterns ---
+D="$TMPDIR/dironly"
+tree "$D" vendor.py/x.go lib/vendor.py out/a.py lib/out/b.py
+printf 'vendor.py/\nout/\n' > "$D/.gitignore"
+run_test "dir/ ignores directories of that name, not files" "lib/vendor.py" "$(listed "$D")" "$D"
+
+# --- ** patterns ---
+D="$TMPDIR/doublestar"
+tree "$D" a/b/gen/x.py gen/y.py docs/conf.py docs/api/more.py pkg/z.py pkg/b/c/z.py pkg/keep.py top.py
+printf '**/gen/*.py\ndocs/**\npkg/**/z.py\n' > "$D/.gitignore"
+run_test "**/ matches any depth, /** everything inside, /**/ zero or more directories" \
+  "pkg/keep.py top.py" "$(listed "$D")" "$D"
+
+# --- Character classes and escapes ---
+D="$TMPDIR/classes"
+tree "$D" v1.py v2.py v9.py 'x#y.py' ok.py
+printf 'v[12].py\n\\#*.py\nx\\#y.py\n' > "$D/.gitignore"
+run_test "[...] classes and backslash escapes" "ok.py v9.py" "$(listed "$D")" "$D"
+
+# --- Nested .gitignore files ---
+D="$TMPDIR/nested"
+tree "$D" local.py keep.gen.py drop.gen.py sub/local.py sub/keep.gen.py sub/drop.gen.py sub/inner/local.py
+printf '*.gen.py\n' > "$D/.gitignore"
+printf 'local.py\n!keep.gen.py\n' > "$D/sub/.gitignore"
+run_test "nested .gitignore applies below its directory and overrides its parent" \
+  "local.py sub/keep.gen.py" "$(listed "$D")" "$D"
+
+# --- Cache: keyed on HEAD's tree and the index ---
+if command -v git >/dev/null 2>&1; then
+  G="$TMPDIR/repo"
+  mkdir -p "$G"
+  git_() { git -C "$G" -c user.name=t -c user.email=t@example.com -c init.defaultBranch=main "$@" >/dev/null 2>&1; }
+  scan() {
+    "$PYTHON" - "$G" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from language_scan import scan_languages
+print(scan_languages(sys.argv[1], {}).counts.get("python", 0))
+EOF
+  }
+  git_ init
+  tree "$G" a.py
+  git_ add a.py
+  git_ commit -m one
+  first=$(scan)
+  tree "$G" b.py
+  untracked=$(scan)
+  git_ add b.py
+  staged=$(scan)
+  git_ checkout -b extra
+  tree "$G" c.py
+  git_ add c.py
+  git_ commit -m extra
+  committed=$(scan)
+  git_ checkout main
+  switched=$(scan)
+  run_test "scan cache reused until the index or HEAD's tree changes" \
+    "1 1 2 3 1" "$first $untracked $staged $committed $switched"
+else
+  echo "SKIP: git is not installed"
+fi
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
@@ -0,0 +1,241 @@
+#!/usr/bin/env bash
+# Tests for lib/lsp_client.py against a local stub language server
+# The stub reports an error on every line containing BAD and a hint on every
+# line containing NOTE; STUB_MODE changes how it misbehaves.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+BIN="$TMPDIR/bin"
+WORK="$(mkdir -p "$TMPDIR/work" && cd "$TMPDIR/work" && pwd -P)"
+mkdir -p "$BIN"
+export NEXT_LEVEL_CONFIG="$TMPDIR/config.json"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+
+# STUB_MODE: normal | silent (never publishes) | unversioned (omits version) | crash (exits on first change)
+cat > "$BIN/basedpyright-langserver" <<EOF
+#!$PYTHON
+import json, os, sys
+
+MODE = os.environ.get("STUB_MODE", "normal")
+LOG = "$TMPDIR/stub.log"
+
+
+def read():
+    length = None
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            sys.exit(0)
+        if not line.strip():
+            break
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    return json.loads(sys.stdin.buffer.read(length))
+
+
+def send(message):
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+    sys.stdout.buffer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    sys.stdout.buffer.flush()
+
+
+def publish(uri, version, text):
+    diagnostics = []
+    for number, line in enumerate(text.splitlines()):
+        for marker, severity, code in (("BAD", 1, "stub-error"), ("NOTE", 4, "stub-hint")):
+            if marker in line:
+                diagnostics.append({"range": {"start": {"line": number, "character": 0},
+                                              "end": {"line": number, "character": len(line)}},
+                                    "severity": severity, "code": code, "message": f"{marker} on line {number + 1}"})
+    params = {"uri": uri, "diagnostics": diagnostics}
+    if MODE != "unversioned":
+        params["version"] = version
+    send({"method": "textDocument/publishDiagnostics", "params": params})
+
+
+configured = False
+held = []
+while True:
+    message = read()
+    method = message.get("method")
+    with open(LOG, "a") as log:
+        log.write(f"{method or 'response'}\n")
+    if method == "initialize":
+        send({"id": message["id"], "result": {"capabilities": {"textDocumentSync": 1}}})
+    elif method == "initialized":
+        # Like real servers, ask for settings and hold diagnostics until answered
+        send({"id": "config-1", "method": "workspace/configuration", "params": {"items": [{"section": "python"}]}})
+    elif method is None and message.get("id") == "config-1":
+        configured = message.get("result") == [None]
+        for doc, text in held:
+            publish(doc["uri"], doc["version"], text)
+    elif method == "shutdown":
+        send({"id": message["id"], "result": None})
+    elif method == "exit":
+        sys.exit(0)
+    elif method in ("textDocument/didOpen", "textDocument/didChange") and MODE != "silent":
+        if method == "textDocument/didChange" and MODE == "crash":
+            sys.exit(1)
+        doc = message["params"]["textDocument"]
+        text = doc["text"] if method == "textDocument/didOpen" else message["params"]["contentChanges"][-1]["text"]
+        if configured:
+            publish(doc["uri"], doc["version"], text)
+        else:
+            held.append((doc, text))
+EOF
+chmod +x "$BIN/basedpyright-langserver"
+
+# The command-line type checker the stage falls back to
+cat > "$BIN/basedpyright" <<EOF
+#!/usr/bin/env bash
+echo "\$*" >> "$TMPDIR/basedpyright.calls"
+echo '{"generalDiagnostics": [{"file": "x", "severity": "error", "message": "from the CLI", "range": {"start": {"line": 0, "character": 0}}, "rule": "cli"}]}'
+exit 1
+EOF
+chmod +x "$BIN/basedpyright"
+
+# run_test <name> <STUB_MODE> <expected> — runs the Python on stdin, compares its last line
+run_test() {
+  local name="$1" mode="$2" expected="$3"
+  local actual
+  rm -f "$TMPDIR/stub.log" "$TMPDIR/basedpyright.calls"
+  actual=$(cd "$WORK" && PATH="$BIN:$PATH" STUB_MODE="$mode" "$PYTHON" - 2>&1 | tail -1) || true
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+PRELUDE="import sys, time
+sys.path.insert(0, '$LIB_DIR')
+import lsp_client
+lsp_client.enable()
+path = '$WORK/app.py'
+def write(text):
+    open(path, 'w').write(text)
+def warm():
+    client = lsp_client.client_for('basedpyright', '$WORK')
+    assert client is not None and client.ready.wait(10), 'server did not initialize'
+    return client
+"
+
+run_test "diagnostics after open, hints dropped" normal \
+  "[{'line': 2, 'message': 'BAD on line 2', 'rule': 'stub-error', 'severity': 'error'}]" <<EOF
+$PRELUDE
+warm()
+write('x = 1\nBAD\n# NOTE\n')
+print(lsp_client.diagnostics('basedpyright', '$WORK', path))
+EOF
+
+run_test "didChange gets the new version's diagnostics" normal \
+  "[3, 'BAD on line 3']" <<EOF
+$PRELUDE
+warm()
+write('BAD\n')
+lsp_client.diagnostics('basedpyright', '$WORK', path)
+write('x = 1\ny = 2\nBAD\n')
+diags = lsp_client.diagnostics('basedpyright', '$WORK', path)
+print([diags[0]['line'], diags[0]['message']])
+EOF
+
+run_test "server without version support" unversioned \
+  "[2]" <<EOF
+$PRELUDE
+warm()
+write('ok\n')
+lsp_client.diagnostics('basedpyright', '$WORK', path)
+write('ok\nBAD\n')
+print([f['line'] for f in lsp_client.diagnostics('basedpyright', '$WORK', path)])
+EOF
+
+run_test "missed deadline returns None promptly" silent \
+  "None True" <<EOF
+$PRELUDE
+warm()
+write('BAD\n')
+start = time.monotonic()
+result = lsp_client.diagnostics('basedpyright', '$WORK', path, deadline=0.3)
+print(result, time.monotonic() - start < 2)
+EOF
+
+run_test "documents changed on disk are closed, unchanged ones stay open" normal \
+  "1 ['didOpen', 'didOpen', 'didClose', 'didChange', 'didChange', 'didOpen'] [2]" <<EOF
+$PRELUDE
+warm()
+other = '$WORK/other.py'
+open(other, 'w').write('x = 1\n')
+write('import other\n')
+lsp_client.diagnostics('basedpyright', '$WORK', other)
+lsp_client.diagnostics('basedpyright', '$WORK', path)
+# Changed behind the server's back, as by sed or git checkout
+open(other, 'w').write('x = 1\nBAD\n')
+lsp_client.diagnostics('basedpyright', '$WORK', path)
+lsp_client.diagnostics('basedpyright', '$WORK', path)
+reopened = [f['line'] for f in lsp_client.diagnostics('basedpyright', '$WORK', other)]
+sent = [line.split('/')[-1] for line in open('$TMPDIR/stub.log').read().split() if line.startswith('textDocument/')]
+print(sent.count('didClose'), sent, reopened)
+EOF
+
+run_test "not started before enable()" normal \
+  "None" <<EOF
+import sys
+sys.path.insert(0, '$LIB_DIR')
+import lsp_client
+print(lsp_client.client_for('basedpyright', '$WORK'))
+EOF
+
+run_test "typecheck stage uses the warm server, not the CLI" normal \
+  "[('stub-error', 1)] True no-cli" <<EOF
+$PRELUDE
+import os
+from checkers import pipeline, python
+warm()
+write('BAD = 1\n')
+stage = next(s for s in python.PIPELINE.stages if s.name == 'typecheck')
+result = pipeline.run(pipeline.Pipeline('python', (stage,)), path)
+timing = result['timings']['stages'][-1]
+print([(f['rule'], f['line']) for f in result['findings']], timing.get('lsp'),
+      'cli' if os.path.exists('$TMPDIR/basedpyright.calls') else 'no-cli')
+EOF
+
+run_test "crashed server falls back to the CLI" crash \
+  "['cli'] ['cli'] cli" <<EOF
+$PRELUDE
+import os
+from checkers import pipeline, python
+warm()
+stage = next(s for s in python.PIPELINE.stages if s.name == 'typecheck')
+p = pipeline.Pipeline('python', (stage,))
+write('BAD = 1\n')
+pipeline.run(p, path)
+write('BAD = 2\n')
+first = [f['rule'] for f in pipeline.run(p, path)['findings']]
+second = [f['rule'] for f in pipeline.run(p, path)['findings']]
+print(first, second, 'cli' if os.path.exists('$TMPDIR/basedpyright.calls') else 'no-cli')
+EOF
+
+run_test "shutdown_all stops servers politely" normal \
+  "exited True exit" <<EOF
+$PRELUDE
+client = warm()
+lsp_client.shutdown_all()
+lines = open('$TMPDIR/stub.log').read().split()
+print('exited' if client.proc.poll() is not None else 'running', 'shutdown' in lines, lines[-1])
+EOF
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
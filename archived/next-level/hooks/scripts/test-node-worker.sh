@@ -0,0 +1,232 @@
+#!/usr/bin/env bash
+# Tests for lib/node_worker.py against stub prettier and eslint packages
+# The stub prettier trims trailing whitespace (upper-casing with "upper": true
+# in .prettierrc) and rejects text containing SYNTAX; the stub eslint reports
+# every line containing the word banned by eslint.config.js. Both cache their
+# config like the real tools and log every load, so restarts are visible.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+if ! command -v node >/dev/null 2>&1; then
+  echo "SKIP: node is not installed"
+  exit 0
+fi
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+BIN="$TMPDIR/bin"
+WORK="$(mkdir -p "$TMPDIR/work" && cd "$TMPDIR/work" && pwd -P)"
+PROJECT="$WORK/project"
+mkdir -p "$BIN" "$PROJECT/node_modules/prettier" "$PROJECT/node_modules/eslint" "$PROJECT/src" "$WORK/bare"
+export NEXT_LEVEL_CONFIG="$TMPDIR/config.json"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+export LOADS="$TMPDIR/loads.log"
+
+echo '{"name": "project"}' > "$PROJECT/package.json"
+echo '{"name": "bare"}' > "$WORK/bare/package.json"
+echo '{}' > "$PROJECT/.prettierrc"
+echo 'module.exports = { banned: "var" };' > "$PROJECT/eslint.config.js"
+
+echo '{"name": "prettier", "version": "3.0.0-stub", "main": "index.js"}' > "$PROJECT/node_modules/prettier/package.json"
+cat > "$PROJECT/node_modules/prettier/index.js" <<'EOF'
+const fs = require("fs");
+const path = require("path");
+fs.appendFileSync(process.env.LOADS, "prettier\n");
+const configs = new Map();
+exports.resolveConfig = async (file) => {
+  const dir = path.dirname(file);
+  if (!configs.has(dir)) {
+    let found = null;
+    for (let d = dir; d !== path.dirname(d); d = path.dirname(d)) {
+      try { found = JSON.parse(fs.readFileSync(path.join(d, ".prettierrc"), "utf8")); break; } catch (_) {}
+    }
+    configs.set(dir, found);
+  }
+  return configs.get(dir);
+};
+exports.getFileInfo = async (file) => ({ ignored: file.includes("ignored"), inferredParser: "typescript" });
+exports.format = async (text, options) => {
+  if (text.includes("SYNTAX")) throw new SyntaxError("Unexpected token");
+  const trimmed = text.replace(/[ \t]+$/gm, "");
+  return options.upper ? trimmed.toUpperCase() : trimmed;
+};
+EOF
+
+echo '{"name": "eslint", "version": "9.0.0-stub", "main": "index.js"}' > "$PROJECT/node_modules/eslint/package.json"
+cat > "$PROJECT/node_modules/eslint/index.js" <<'EOF'
+const fs = require("fs");
+const path = require("path");
+fs.appendFileSync(process.env.LOADS, "eslint\n");
+class ESLint {
+  constructor({ cwd }) {
+    this.config = require(path.join(cwd, "eslint.config.js"));
+  }
+  async isPathIgnored(file) { return file.includes("ignored"); }
+  async lintFiles([file]) {
+    const messages = [];
+    fs.readFileSync(file, "utf8").split("\n").forEach((line, i) => {
+      if (line.split(/\W+/).includes(this.config.banned)) {
+        messages.push({ ruleId: `no-${this.config.banned}`, severity: 2, line: i + 1, column: 1, message: "banned" });
+      }
+    });
+    return [{ filePath: file, messages, errorCount: messages.length }];
+  }
+}
+module.exports = { ESLint };
+EOF
+
+# The command-line tools the stages fall back to
+cat > "$BIN/prettier" <<EOF
+#!/usr/bin/env bash
+echo "prettier \$*" >> "$TMPDIR/cli.calls"
+cat
+EOF
+cat > "$BIN/eslint" <<EOF
+#!/usr/bin/env bash
+echo "eslint \$*" >> "$TMPDIR/cli.calls"
+echo '[{"filePath": "x", "messages": [{"ruleId": "cli", "severity": 2, "line": 1, "column": 1, "message": "from the CLI"}]}]'
+exit 1
+EOF
+chmod +x "$BIN/prettier" "$BIN/eslint"
+
+# run_test <name> <expected> — runs the Python on stdin, compares its last line
+run_test() {
+  local name="$1" expected="$2"
+  local actual
+  rm -f "$TMPDIR/cli.calls" "$LOADS"
+  echo '{}' > "$PROJECT/.prettierrc"
+  echo 'module.exports = { banned: "var" };' > "$PROJECT/eslint.config.js"
+  actual=$(cd "$WORK" && PATH="$BIN:$PATH" "$PYTHON" - 2>&1 | tail -1) || true
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+PRELUDE="import os, sys, time
+sys.path.insert(0, '$LIB_DIR')
+import node_worker
+from checkers import pipeline, typescript
+node_worker.enable()
+path = '$PROJECT/src/app.ts'
+def write(text, target=path):
+    open(target, 'w').write(text)
+def check(target=path):
+    return pipeline.run(typescript.PIPELINE, target)
+def workers(result):
+    return [t['stage'] for t in result['timings']['stages'] if t.get('worker')]
+def cli():
+    return open('$TMPDIR/cli.calls').read().split('\n')[0].split()[:1] if os.path.exists('$TMPDIR/cli.calls') else []
+def loads():
+    return open('$LOADS').read().split()
+"
+
+run_test "format and lint in warm workers, not the CLI" \
+  "const y = 2; ('no-var', 2) ['format', 'lint'] []" <<EOF
+$PRELUDE
+write('const y = 2;   \nvar x = 1;\n')
+result = check()
+print(open(path).read().split('\n')[0], [(f['rule'], f['line']) for f in result['findings']][0], workers(result), cli())
+EOF
+
+run_test "workers stay warm across checks" \
+  "[2, 3, 4] ['eslint', 'prettier']" <<EOF
+$PRELUDE
+lines = []
+for n in range(3):
+    write('const a = 1;\n' * (n + 1) + 'var b = 2;\n')
+    lines.append(check()['findings'][0]['line'])
+print(lines, sorted(loads()))
+EOF
+
+run_test "config change restarts the worker" \
+  "['no-var'] ['no-let'] CONST X = 1; 2 2" <<EOF
+$PRELUDE
+write('var a = 1;\nlet b = 2;\n')
+before = [f['rule'] for f in check()['findings']]
+time.sleep(0.01)
+write('module.exports = { banned: "let" };', '$PROJECT/eslint.config.js')
+after = [f['rule'] for f in check()['findings']]
+write('{"upper": true}', '$PROJECT/.prettierrc')
+write('const x = 1;\n')
+check()
+print(before, after, open(path).read().strip(), loads().count('eslint'), loads().count('prettier'))
+EOF
+
+run_test "formatter error leaves the buffer and skips the CLI" \
+  "False True []" <<EOF
+$PRELUDE
+write('SYNTAX  \n')
+result = check()
+print(result['formatted'], open(path).read() == 'SYNTAX  \n', cli())
+EOF
+
+run_test "ignored files come back unchanged and unlinted" \
+  "True []" <<EOF
+$PRELUDE
+target = '$PROJECT/src/ignored.ts'
+write('var x = 1;   \n', target)
+result = check(target)
+print(open(target).read() == 'var x = 1;   \n', result['findings'])
+EOF
+
+run_test "tool missing from the project falls back to the CLI" \
+  "['cli'] [] ['prettier']" <<EOF
+$PRELUDE
+target = '$WORK/bare/app.ts'
+write('var x = 1;\n', target)
+result = check(target)
+print([f['rule'] for f in result['findings']], workers(result), cli())
+EOF
+
+run_test "not started before enable()" \
+  "None ['prettier']" <<EOF
+import os, sys
+sys.path.insert(0, '$LIB_DIR')
+import node_worker
+from checkers import pipeline, typescript
+open('$PROJECT/src/app.ts', 'w').write('var x = 1;\n')
+pipeline.run(typescript.PIPELINE, '$PROJECT/src/app.ts')
+print(node_worker.worker_for('eslint', '$BIN/eslint', '$PROJECT/src/app.ts'),
+      open('$TMPDIR/cli.calls').read().split()[:1])
+EOF
+
+run_test "crashed worker falls back, then restarts" \
+  "['cli'] ['no-var']" <<EOF
+$PRELUDE
+import signal
+write('var x = 1;\n')
+check()
+worker = node_worker.worker_for('eslint', '$BIN/eslint', path)
+os.kill(worker.proc.pid, signal.SIGKILL)
+worker.proc.wait()
+time.sleep(0.1)
+first = [f['rule'] for f in check()['findings']]
+node_worker._failed.clear()
+second = [f['rule'] for f in check()['findings']]
+print(first, second)
+EOF
+
+run_test "shutdown_all stops every worker" \
+  "[True, True]" <<EOF
+$PRELUDE
+write('var x = 1;\n')
+check()
+procs = [w.proc for w in node_worker._workers.values()]
+node_worker.shutdown_all()
+print([p.poll() is not None for p in procs])
+EOF
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
@@ -0,0 +1,95 @@
+#!/usr/bin/env bash
+# Tests for lib/plugin_index.py: building the persisted index, noticing
+# installs and removals, recovering from a bad index file, and symlinks
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+export NEXT_LEVEL_CONFIG="$TMPDIR/global/config.json"
+export NEXT_LEVEL_STATE="$TMPDIR/state"
+ROOT="$TMPDIR/plugins"
+INDEX="$TMPDIR/global/plugins-index.json"
+
+# plugin <dir> <name> — a plugin directory with a plugin.json naming it
+plugin() {
+  mkdir -p "$1"
+  printf '{"name": "%s"}\n' "$2" > "$1/plugin.json"
+}
+
+# index — "<manifest names> | <plugin dir names>" as load_index sees ROOT
+index() {
+  "$PYTHON" - "$ROOT" <<EOF
+import sys
+sys.path.insert(0, "$LIB_DIR")
+from plugin_index import load_index
+index = load_index(sys.argv[1])
+print(" ".join(index.manifest_names), "|", " ".join(index.dir_names))
+EOF
+}
+
+run_test() {
+  local name="$1" expected="$2" actual="$3"
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- Build ---
+plugin "$ROOT/alpha-dir" alpha
+plugin "$ROOT/marketplaces/market/plugins/beta-dir" beta
+run_test "first call walks the root and persists the index" \
+  "alpha beta | alpha-dir market marketplaces yes" \
+  "$(index) $([[ -f "$INDEX" ]] && echo yes || echo no)"
+
+# --- Installs and removals ---
+plugin "$ROOT/marketplaces/market/plugins/gamma-dir" gamma
+run_test "a plugin installed deep in a marketplace is picked up" \
+  "alpha beta gamma | alpha-dir market marketplaces" "$(index)"
+rm -rf "$ROOT/alpha-dir"
+run_test "a removed plugin is dropped" "beta gamma | market marketplaces" "$(index)"
+sleep 0.01
+printf '{"name": "beta2"}\n' > "$ROOT/marketplaces/market/plugins/beta-dir/plugin.json"
+run_test "an edited plugin.json is re-read" "beta2 gamma | market marketplaces" "$(index)"
+
+# --- Unchanged tree: the stored index is reused as is ---
+before=$(stat -c %Y.%s "$INDEX"; md5sum < "$INDEX")
+index > /dev/null
+run_test "an unchanged tree does not rewrite the index" "$before" "$(stat -c %Y.%s "$INDEX"; md5sum < "$INDEX")"
+
+# --- Corrupt or malformed index files ---
+actual=""
+for bad in '{not json' '[]' '{"root": "'"$ROOT"'", "dirs": []}' \
+    '{"root": "'"$ROOT"'", "dirs": {"": "x", "marketplaces": {"mtime_ns": 1, "subdirs": [3], "links": [], "manifest": null}}}'; do
+  printf '%s' "$bad" > "$INDEX"
+  actual+="$(index) / "
+done
+run_test "a corrupt or malformed index is rebuilt" \
+  "$(printf 'beta2 gamma | market marketplaces / %.0s' 1 2 3 4)" "$actual"
+run_test "the rebuilt index is valid JSON again" "ok" \
+  "$("$PYTHON" -c 'import json, sys; json.load(open(sys.argv[1])); print("ok")' "$INDEX")"
+
+# --- Symlinked plugin directories ---
+plugin "$TMPDIR/checkout/delta" delta
+ln -s "$TMPDIR/checkout/delta" "$ROOT/delta-link"
+ln -s "$ROOT" "$ROOT/marketplaces/market/loop"
+run_test "symlinked plugin directories are walked; a link cycle terminates" \
+  "beta2 delta gamma | delta-link market marketplaces" "$(timeout 20 bash -c "$(declare -f index); ROOT='$ROOT' LIB_DIR='$LIB_DIR' PYTHON='$PYTHON' index")"
+printf '{"name": "delta2"}\n' > "$TMPDIR/checkout/delta/plugin.json"
+run_test "changes behind a symlink are picked up" \
+  "beta2 delta2 gamma | delta-link market marketplaces" "$(index)"
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
@@ -0,0 +1,123 @@
+#!/usr/bin/env bash
+# Tests for lib/root_index.py: nearest-marker lookup, revalidation of cached
+# entries within ROOT_TTL, and batched find_roots
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+LIB_DIR="$(cd "$SCRIPT_DIR/../../lib" && pwd)"
+PYTHON="$(command -v python3)"
+PASS=0
+FAIL=0
+
+TMPDIR=$(mktemp -d)
+trap 'rm -rf "$TMPDIR"' EXIT
+D="$(cd "$TMPDIR" && pwd -P)"
+
+# resolve — runs a Python body with root_index imported, `rel` turning a root
+# into a path relative to the test directory, and `touch` creating files
+resolve() {
+  "$PYTHON" - "$D" <<EOF
+import os, sys
+sys.path.insert(0, "$LIB_DIR")
+import root_index
+from root_index import find_root, find_roots
+base = sys.argv[1]
+
+def rel(root):
+    return None if root is None else os.path.relpath(root, base)
+
+def touch(*parts):
+    path = os.path.join(base, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+    return path
+
+$1
+EOF
+}
+
+run_test() {
+  local name="$1" expected="$2" actual="$3"
+  if [[ "$actual" != "$expected" ]]; then
+    echo "FAIL: $name"
+    echo "  expected: $expected"
+    echo "  actual:   $actual"
+    FAIL=$((FAIL + 1))
+    return
+  fi
+  echo "PASS: $name"
+  PASS=$((PASS + 1))
+}
+
+# --- The deepest marker wins ---
+actual=$(resolve '
+touch("deep", "go.mod")
+touch("deep", "mod", "go.mod")
+os.makedirs(os.path.join(base, "deep", "mod", "pkg", "go.mod", "x"))  # a directory named like the marker
+f = touch("deep", "mod", "pkg", "a.go")
+print(rel(find_root(f, "go.mod")), rel(find_root(touch("deep", "b.go"), "go.mod")),
+      rel(find_root(touch("deep", "mod", "pkg", "go.mod", "x", "c.go"), "go.mod")))
+')
+run_test "nearest (deepest) regular-file marker wins" "deep/mod deep deep/mod" "$actual"
+
+# --- Revalidation within ROOT_TTL ---
+actual=$(resolve '
+touch("reval", "go.mod")
+f = touch("reval", "a", "b", "x.go")
+seen = [rel(find_root(f, "go.mod"))]
+touch("reval", "a", "b", "go.mod")            # in the file'"'"'s own (cached) directory
+seen.append(rel(find_root(f, "go.mod")))
+os.unlink(os.path.join(base, "reval", "a", "b", "go.mod"))
+seen.append(rel(find_root(f, "go.mod")))
+os.unlink(os.path.join(base, "reval", "go.mod"))  # the recorded root loses its marker
+seen.append(rel(find_root(f, "go.mod")))
+touch("reval", "go.mod")                     # back in an ancestor: only after ROOT_TTL
+seen.append(rel(find_root(f, "go.mod")))
+root_index.ROOT_TTL = 0
+seen.append(rel(find_root(f, "go.mod")))
+print(" ".join(map(str, seen)))
+')
+run_test "marker changes in the cached dir or at the root are seen at once, above it after ROOT_TTL" \
+  "reval reval/a/b reval None None reval" "$actual"
+
+actual=$(resolve '
+touch("ttl", "go.mod")
+f = touch("ttl", "a", "b", "x.go")
+seen = [rel(find_root(f, "go.mod"))]
+touch("ttl", "a", "go.mod")                   # an intermediate directory
+seen.append(rel(find_root(f, "go.mod")))
+root_index.ROOT_TTL = 0
+seen.append(rel(find_root(f, "go.mod")))
+print(" ".join(seen))
+')
+run_test "marker created in an intermediate dir is seen once the entry is ROOT_TTL old" \
+  "ttl ttl ttl/a" "$actual"
+
+actual=$(resolve '
+touch("sib", "Cargo.toml")
+a, b = touch("sib", "src", "one", "a.rs"), touch("sib", "src", "one", "b.rs")
+find_root(a, "Cargo.toml")
+root_index._walk = None                      # a cached ancestor must answer without walking
+print(rel(find_root(b, "Cargo.toml")),
+      rel(find_root(os.path.join(base, "sib", "src", "c.rs"), "Cargo.toml")))
+')
+run_test "sibling files and ancestors resolve from the cache" "sib sib" "$actual"
+
+# --- find_roots on a mixed tree ---
+actual=$(resolve '
+touch("mixed", "p1", "package.json")
+touch("mixed", "p1", "nested", "package.json")
+touch("mixed", "p2", "package.json")
+files = [touch("mixed", *parts) for parts in (
+    ("p1", "a.ts"), ("p1", "src", "b.ts"), ("p1", "nested", "c.ts"), ("p1", "src", "d.ts"),
+    ("p2", "lib", "e.ts"), ("loose", "f.ts"))]
+roots = find_roots(files, "package.json")
+print(sorted(roots) == sorted(files), " ".join(str(rel(roots[f])) for f in files),
+      [rel(find_root(f, "package.json")) for f in files] == [rel(roots[f]) for f in files])
+')
+run_test "find_roots resolves a mixed batch like find_root per file" \
+  "True mixed/p1 mixed/p1 mixed/p1/nested mixed/p1 mixed/p2 None True" "$actual"
+
+echo ""
+echo "Results: $PASS passed, $FAIL failed"
+[[ "$FAIL" -eq 0 ]] || exit 1
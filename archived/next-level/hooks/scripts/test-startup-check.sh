@@ -71,6 +71,33 @@ setup_wrong_project() {
 JSON
 }
 
+# Configs written through lib/config.py also get the config.json.env snapshot
+write_with_snapshot() {
+  local dir="$1" root="$2"
+  NEXT_LEVEL_CONFIG="$dir/config.json" python3 -c "
+import sys
+sys.path.insert(0, '$SCRIPT_DIR/../../lib')
+from config import write
+write({'setup_complete': True, 'languages_detected': [], 'project_root': sys.argv[1]})
+" "$root"
+}
+
+setup_snapshot_complete() {
+  write_with_snapshot "$1" "$(pwd)"
+}
+
+setup_snapshot_wrong_project() {
+  write_with_snapshot "$1" "/some/other/project"
+}
+
+setup_stale_snapshot() {
+  local dir="$1"
+  # Snapshot says another project; config.json was since edited by hand
+  write_with_snapshot "$dir" "/some/other/project"
+  setup_complete "$dir"
+  touch -d "2000-01-01" "$dir/config.json.env"
+}
+
 # Test 1: No config → exit 2 with setup message
 run_test "no config file" 2 "not configured" setup_no_config
 
@@ -83,6 +110,40 @@ run_test "complete setup" 0 "" setup_complete
 # Test 4: Wrong project root → exit 2
 run_test "wrong project root" 2 "different project" setup_wrong_project
 
+# Test 5: Snapshot written by lib/config.py answers the lookups
+run_test "snapshot complete setup" 0 "" setup_snapshot_complete
+
+# Test 6: Snapshot wrong project root → exit 2
+run_test "snapshot wrong project root" 2 "different project" setup_snapshot_wrong_project
+
+# Test 7: Snapshot older than config.json is ignored
+run_test "stale snapshot ignored" 0 "" setup_stale_snapshot
+
+# Test 8: Values of the wrong type fall back to the defaults instead of raising
+tmpdir=$(mktemp -d)
+cat > "$tmpdir/config.json" <<JSON
+{"setup_complete": "yes", "languages_detected": "python", "edit_debounce_ms": null, "diff_scope_margin": "7",
+ "trust_level": 3, "features_enabled": {"file_checker": "on"}, "plugins_available": [], "linters": {"python": 1}}
+JSON
+actual=$(NEXT_LEVEL_CONFIG="$tmpdir/config.json" NEXT_LEVEL_FEATURE_TIMING_LOG=1 python3 -c "
+import sys
+sys.path.insert(0, '$SCRIPT_DIR/../../lib')
+from config import snapshot
+s = snapshot('$tmpdir')
+print(s.setup_complete, s.languages, s.edit_debounce_ms, s.diff_scope_margin, s.trust_level,
+      s.feature_enabled('file_checker'), s.feature_enabled('timing_log'), s.plugin_available('coderabbit'),
+      s.linters_for('python'))
+" 2>&1)
+rm -rf "$tmpdir"
+if [[ "$actual" == "False () 2000 7 balanced True True False {}" ]]; then
+  echo "PASS: malformed config values fall back to defaults"
+  PASS=$((PASS + 1))
+else
+  echo "FAIL: malformed config values fall back to defaults"
+  echo "  output: $actual"
+  FAIL=$((FAIL + 1))
+fi
+
 echo ""
 echo "Results: $PASS passed, $FAIL failed"
 [[ "$FAIL" -eq 0 ]] || exit 1
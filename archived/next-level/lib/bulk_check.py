@@ -0,0 +1,174 @@
+"""Bulk checks of a whole project tree (`check_files.py --all`).
+
+The hook checks one edit at a time. After onboarding a repository or a big
+merge, a bulk check covers everything at once:
+
+1. list the tree's source files (language_scan.source_files: SKIP_PATTERNS
+   directories and .gitignore rules skipped), minus what checkers.should_skip
+   excludes (tests, config files)
+2. group them by language and project root (the deepest ancestor holding one
+   of the language's markers in dependencies.LANGUAGE_INDICATORS), split into
+   chunks of at most CHUNK_SIZE files so large groups spread over the pool
+3. check the chunks on a process pool sized to the machine's cores, each with
+   checkers.check_files (one tool run per stage and chunk)
+4. stream one JSON line per file as its chunk finishes, then the summary
+
+Results go through the project's result_cache.ResultCache, so a re-run only
+checks files whose content, tools or config changed. Like the hook, checks
+format files and strip comments in place.
+
+Output lines:
+    {"file": "/abs/a.py", "language": "python", "root": "/abs", "result": {...check_file dict...}}
+    {"file": "/abs/b.py", "language": "python", "root": "/abs", "error": "..."}
+    {"summary": {"root": "/abs", "files": 2, "checked": 2, "cached": 0, ...}}
+"""
+
+import json
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, TextIO
+
+import root_index
+from checkers import check_files, detect_language, should_skip
+from dependencies import LANGUAGE_INDICATORS
+from language_scan import source_files
+from result_cache import ResultCache
+
+CHUNK_SIZE = 200
+TOP_RULES = 20
+
+# (language, project root, files)
+Chunk = tuple[str, str, list[str]]
+
+
+def _project_roots(language: str, files: list[str], default: str) -> dict[str, str]:
+    """Each file's deepest ancestor holding one of the language's markers, else `default`."""
+    roots = {filepath: default for filepath in files}
+    for marker, marker_language in LANGUAGE_INDICATORS.items():
+        if marker_language != language:
+            continue
+        for filepath, root in root_index.find_roots(files, marker).items():
+            if root and len(root) > len(roots[filepath]):
+                roots[filepath] = root
+    return roots
+
+
+def plan(root: str, workers: int) -> tuple[list[Chunk], int]:
+    """The chunks to check under a project root, and how many source files were excluded."""
+    by_group: dict[tuple[str, str], list[str]] = {}
+    by_language: dict[str, list[str]] = {}
+    excluded = 0
+    for filepath in source_files(root):
+        language = None if should_skip(filepath) else detect_language(filepath)
+        if language:
+            by_language.setdefault(language, []).append(filepath)
+        else:
+            excluded += 1
+    for language, files in by_language.items():
+        for filepath, project in _project_roots(language, files, root).items():
+            by_group.setdefault((language, project), []).append(filepath)
+
+    chunks: list[Chunk] = []
+    for (language, project), files in sorted(by_group.items()):
+        size = max(1, min(CHUNK_SIZE, math.ceil(len(files) / workers)))
+        chunks.extend((language, project, files[i:i + size]) for i in range(0, len(files), size))
+    return chunks, excluded
+
+
+def _check_chunk(files: list[str], cache_root: str) -> dict[str, dict[str, Any]]:
+    """Check one chunk in a pool process."""
+    return check_files(files, cache=ResultCache.for_project(cache_root, evict_on_put=False))
+
+
+class _Summary:
+    """Running totals over the streamed records."""
+
+    def __init__(self, root: str, workers: int, excluded: int) -> None:
+        self.root = root
+        self.workers = workers
+        self.excluded = excluded
+        self.counts: Counter[str] = Counter()
+        self.languages: dict[str, Counter[str]] = {}
+        self.severities: Counter[str] = Counter()
+        self.rules: Counter[str] = Counter()
+
+    def add(self, language: str, result: dict[str, Any] | None) -> None:
+        per_language = self.languages.setdefault(language, Counter())
+        per_language["files"] += 1
+        self.counts["files"] += 1
+        if result is None:
+            self.counts["errors"] += 1
+            return
+        if result.get("skipped"):
+            self.counts["skipped"] += 1
+            return
+        findings = result.get("findings", [])
+        self.counts["checked"] += 1
+        self.counts["cached"] += bool(result.get("cache", {}).get("hit"))
+        self.counts["formatted"] += bool(result.get("formatted"))
+        self.counts["with_findings"] += bool(findings)
+        self.counts["findings"] += len(findings)
+        per_language["findings"] += len(findings)
+        for finding in findings:
+            self.severities[finding.get("severity") or "unknown"] += 1
+            if finding.get("rule"):
+                self.rules[finding["rule"]] += 1
+
+    def to_payload(self, started: float) -> dict[str, Any]:
+        keys = ("files", "checked", "cached", "skipped", "errors", "formatted", "with_findings", "findings")
+        return {
+            "root": self.root,
+            **{key: self.counts[key] for key in keys},
+            "excluded": self.excluded,
+            "languages": {language: dict(counts) for language, counts in sorted(self.languages.items())},
+            "severities": dict(self.severities.most_common()),
+            "top_rules": dict(self.rules.most_common(TOP_RULES)),
+            "workers": self.workers,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+
+
+def scan(root: str, out: TextIO, workers: int | None = None) -> dict[str, Any]:
+    """Check every source file under a root, streaming JSON lines to `out`. Returns the summary."""
+    started = time.monotonic()
+    root = os.path.realpath(root)
+    workers = max(1, workers or os.cpu_count() or 4)
+    chunks, excluded = plan(root, workers)
+    summary = _Summary(root, workers, excluded)
+
+    def emit(chunk: Chunk, results: dict[str, dict[str, Any]] | None, error: str = "") -> None:
+        language, project, files = chunk
+        for filepath in files:
+            record: dict[str, Any] = {"file": filepath, "language": language, "root": project}
+            result = results.get(filepath) if results is not None else None
+            if result is None:
+                record["error"] = error or "no result"
+            else:
+                record["result"] = result
+            summary.add(language, result)
+            out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    if len(chunks) <= 1 or workers == 1:
+        for chunk in chunks:
+            emit(chunk, _check_chunk(chunk[2], root))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures: dict[Future[dict[str, dict[str, Any]]], Chunk] = {
+                pool.submit(_check_chunk, chunk[2], root): chunk for chunk in chunks}
+            # A crashed pool process fails only its own chunk's files
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    emit(futures[future], future.result())
+                else:
+                    emit(futures[future], None, f"{type(error).__name__}: {error}")
+
+    ResultCache.for_project(root).evict()
+    payload = summary.to_payload(started)
+    out.write(json.dumps({"summary": payload}) + "\n")
+    out.flush()
+    return payload
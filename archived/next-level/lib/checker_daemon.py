@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Persistent checker daemon for next-level.
+
+Keeps `checkers.check_file` imported and warm behind a per-workspace Unix
+socket, so the PostToolUse hook no longer pays interpreter startup, checker
+imports and PATH lookups on every edit.
+
+Protocol: one JSON request per connection, newline-terminated.
+    -> {"file": "/abs/path/to/file.py", "session_id": "...", "scope": {...}}
+    <- {"result": {...check_file findings dict...}}
+    -> {"files": ["/abs/a.py", "/abs/b.ts"], "session_id": "..."}
+    <- {"results": {"/abs/a.py": {...}, "/abs/b.ts": {...}}}
+
+The client half (`request`, `spawn`) only imports the standard library so the
+hook stays cheap when the daemon is up. The daemon exits on its own after
+IDLE_TIMEOUT seconds without requests.
+
+The client waits at most CLIENT_TIMEOUT, which leaves room inside the
+PostToolUse hook's timeout (HOOK_TIMEOUT, from hooks/hooks.json) to report
+back. A request that times out comes back as a skipped result rather than
+None: the hook's budget is spent by then, so re-running the check in-process
+would only get the hook killed.
+
+With the lsp_diagnostics feature, the daemon also keeps warm language servers
+(lib/lsp_client.py) for stages that can use them, and stops them on exit;
+with node_workers, warm prettier and eslint processes (lib/node_worker.py).
+
+Usage:
+    checker_daemon.py [--workspace DIR]          run the daemon in the foreground
+    checker_daemon.py --stop [--workspace DIR]   ask a running daemon to exit
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from state import daemon_dir
+
+IDLE_TIMEOUT = 30 * 60
+HOOK_TIMEOUT = 30
+CLIENT_TIMEOUT = HOOK_TIMEOUT - 5
+TIMED_OUT = {"skipped": True, "reason": "checker daemon timed out"}
+_MAX_REQUEST = 64 * 1024
+
+
+def socket_path(workspace: str) -> str:
+    """Return the socket path for a workspace (one daemon per workspace)."""
+    digest = hashlib.sha256(os.path.realpath(workspace).encode()).hexdigest()[:16]
+    return str(daemon_dir() / f"checker-{digest}.sock")
+
+
+def _send(workspace: str, payload: dict[str, Any], timeout: float) -> dict[str, Any] | None:
+    """Send one request to the workspace daemon.
+
+    Returns None if it is unreachable, {"timed_out": True} if it did not answer in time.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path(workspace))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except TimeoutError:
+        return {"timed_out": True}
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def request(filepath: str, workspace: str, session_id: str = "unknown",
+            timeout: float = CLIENT_TIMEOUT, scope: dict[str, Any] | None = None) -> dict[str, Any] | None:
+    """Check a file through the workspace daemon.
+
+    `scope` is an EditScope payload (EditScope.to_payload) for diff-scoped checks.
+    Returns the check_file findings dict, or None when no daemon is running
+    (or it failed mid-request) so the caller can fall back to in-process checks.
+    A daemon that does not answer within `timeout` yields a TIMED_OUT result.
+    """
+    payload: dict[str, Any] = {"file": filepath, "session_id": session_id}
+    if scope:
+        payload["scope"] = scope
+    response = _send(workspace, payload, timeout)
+    if response and response.get("timed_out"):
+        return dict(TIMED_OUT)
+    if not response or not isinstance(response.get("result"), dict):
+        return None
+    return response["result"]
+
+
+def request_many(filepaths: list[str], workspace: str, session_id: str = "unknown",
+                 timeout: float = CLIENT_TIMEOUT) -> dict[str, dict[str, Any]] | None:
+    """Batch-check files through the workspace daemon. None means fall back to in-process."""
+    response = _send(workspace, {"files": filepaths, "session_id": session_id}, timeout)
+    if response and response.get("timed_out"):
+        return {filepath: dict(TIMED_OUT) for filepath in filepaths}
+    if not response or not isinstance(response.get("results"), dict):
+        return None
+    return response["results"]
+
+
+def spawn(workspace: str) -> None:
+    """Start a detached daemon for the workspace. Safe to call if one is already running."""
+    import subprocess
+
+    try:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--workspace", workspace],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=workspace,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def stop(workspace: str) -> bool:
+    """Ask the workspace daemon to exit. Returns True if one was running."""
+    return _send(workspace, {"command": "stop"}, timeout=5) is not None
+
+
+def _handle(conn: socket.socket, workspace: str, server: "_Server") -> None:
+    """Serve a single request on an accepted connection."""
+    from checkers import check_file, check_files
+    from edit_scope import EditScope
+    from result_cache import ResultCache
+
+    try:
+        conn.settimeout(5)
+        data = b""
+        while not data.endswith(b"\n") and len(data) < _MAX_REQUEST:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        payload = json.loads(data)
+        if payload.get("command") == "stop":
+            conn.sendall(b'{"stopped": true}\n')
+            server.stopping = True
+            return
+        cache = ResultCache.for_session(str(payload.get("session_id") or "unknown"))
+        if "files" in payload:
+            files = [os.path.realpath(f) for f in payload["files"]]
+            files = sorted({f for f in files if f.startswith(workspace + os.sep)})
+            with contextlib.ExitStack() as held:
+                # Sorted order so overlapping batches cannot deadlock each other
+                for filepath in files:
+                    held.enter_context(server.lock_for(filepath))
+                response: dict[str, Any] = {"results": check_files(files, cache=cache)}
+        else:
+            filepath = os.path.realpath(payload.get("file", ""))
+            if not filepath.startswith(workspace + os.sep):
+                response = {"error": "file outside workspace"}
+            else:
+                scope = EditScope.from_payload(payload.get("scope"))
+                with server.lock_for(filepath):
+                    response = {"result": check_file(filepath, cache=cache, scope=scope)}
+        conn.sendall(json.dumps(response).encode() + b"\n")
+    except (OSError, ValueError, TypeError):
+        pass
+    finally:
+        conn.close()
+
+
+class _Server:
+    """Accept loop with per-file locking and an idle shutdown timer."""
+
+    def __init__(self, workspace: str) -> None:
+        self.workspace = workspace
+        self.stopping = False
+        self.last_request = time.monotonic()
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def lock_for(self, filepath: str) -> threading.Lock:
+        """Serialize checks of the same file; different files run concurrently."""
+        with self._locks_guard:
+            return self._locks.setdefault(filepath, threading.Lock())
+
+    def serve(self, sock: socket.socket) -> None:
+        """Accept connections until stopped or idle for IDLE_TIMEOUT seconds."""
+        sock.settimeout(1.0)
+        while not self.stopping and time.monotonic() - self.last_request < IDLE_TIMEOUT:
+            try:
+                conn, _ = sock.accept()
+            except socket.timeout:
+                continue
+            self.last_request = time.monotonic()
+            threading.Thread(target=_handle, args=(conn, self.workspace, self), daemon=True).start()
+
+
+def serve(workspace: str) -> int:
+    """Run the daemon for a workspace until idle. Exits quietly if one is already running."""
+    import fcntl
+
+    workspace = os.path.realpath(workspace)
+    path = socket_path(workspace)
+    lock_file = open(path + ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return 0  # Another daemon owns this workspace
+
+    # Warm the checker package before accepting connections
+    import checkers  # noqa: F401
+    import lsp_client
+    import node_worker
+    from config import feature_enabled
+
+    if feature_enabled("lsp_diagnostics"):
+        lsp_client.enable()
+    if feature_enabled("node_workers"):
+        node_worker.enable()
+
+    os.chdir(workspace)
+    if os.path.exists(path):
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    sock.listen(16)
+    try:
+        _Server(workspace).serve(sock)
+    finally:
+        sock.close()
+        lsp_client.shutdown_all()
+        node_worker.shutdown_all()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        lock_file.close()
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    """CLI entry point."""
+    workspace = os.getcwd()
+    if "--workspace" in argv:
+        idx = argv.index("--workspace")
+        if idx + 1 < len(argv):
+            workspace = argv[idx + 1]
+    if "--stop" in argv:
+        return 0 if stop(workspace) else 1
+    return serve(workspace)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,9 +1,13 @@
 """Checker registry — routes files to language-specific checkers."""
 
 import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import root_index
+
 # Extension to language mapping
 EXTENSION_LANGUAGE: dict[str, str] = {
     ".ts": "typescript",
@@ -32,15 +36,20 @@ SKIP_PATTERNS = {"migrations/", "fixtures/", "__mocks__/", "node_modules/",
                  "vendor/", ".venv/", "venv/"}
 
 
+def check_text_length(text: str, result: dict[str, Any]) -> None:
+    """Check the length of in-memory file content and add a warning if too long."""
+    line_count = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+    if line_count > 500:
+        result["length_warning"] = f"File is {line_count} lines (>500) — consider splitting"
+    elif line_count > 300:
+        result["length_warning"] = f"File is {line_count} lines (>300) — getting long"
+
+
 def check_file_length(filepath: str, result: dict[str, Any]) -> None:
     """Check file length and add warning to result if too long."""
     try:
         with open(filepath, encoding="utf-8") as f:
-            line_count = sum(1 for _ in f)
-        if line_count > 500:
-            result["length_warning"] = f"File is {line_count} lines (>500) — consider splitting"
-        elif line_count > 300:
-            result["length_warning"] = f"File is {line_count} lines (>300) — getting long"
+            check_text_length(f.read(), result)
     except (OSError, UnicodeDecodeError):
         pass
 
@@ -58,14 +67,91 @@ def run_comment_strip(filepath: str, language: str, result: dict[str, Any]) -> N
         result["comment_strip_error"] = str(exc)
 
 
+def strip_text(text: str, language: str, result: dict[str, Any],
+               lines: list[tuple[int, int]] | None = None) -> str:
+    """Strip unnecessary comments from in-memory content, recording results. Returns the new content.
+
+    With `lines`, only comments on those (1-indexed, inclusive) lines are stripped.
+    """
+    try:
+        from comment_stripper import strip_source
+        strip_result = strip_source(text, language, lines)
+        result["comments_stripped"] = strip_result["stripped"]
+        return strip_result["content"]
+    except ImportError:
+        result["comments_stripped"] = 0
+    except ValueError as exc:
+        result["comments_stripped"] = 0
+        result["comment_strip_error"] = str(exc)
+    return text
+
+
+def write_atomic(filepath: str, content: str) -> None:
+    """Replace a file's content in one write: temp file in the same dir, then rename.
+
+    Readers never observe a partial file. Content is written verbatim (CRLF
+    line endings stay CRLF); the permission bits, and the owner and group as
+    far as this process may set them, carry over to the new inode. A file
+    with other hard links is rewritten in place instead, since the rename
+    would detach it from them; a concurrent reader may then see it half
+    written.
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        st = None
+    if st is not None and st.st_nlink > 1:
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        return
+    directory, name = os.path.split(filepath)
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        if st is not None:
+            try:
+                os.chown(tmp, st.st_uid, st.st_gid)
+            except OSError:
+                pass
+            try:
+                os.chmod(tmp, st.st_mode & 0o7777)
+            except OSError:
+                pass
+        os.replace(tmp, filepath)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def run_analyzers(result: dict[str, Any], *analyzers: Callable[[], list[dict[str, Any]]]) -> None:
+    """Run read-only analyzers concurrently and merge their findings.
+
+    Call only after the mutating stages (format, comment strip) have settled
+    the file. Findings are appended in the order the analyzers are given,
+    regardless of which finishes first.
+    """
+    if len(analyzers) <= 1:
+        for analyzer in analyzers:
+            result["findings"].extend(analyzer())
+        return
+    with ThreadPoolExecutor(max_workers=len(analyzers)) as pool:
+        futures = [pool.submit(analyzer) for analyzer in analyzers]
+        for future in futures:
+            result["findings"].extend(future.result())
+
+
 def find_project_root(filepath: str, marker: str) -> str | None:
-    """Walk up from filepath to find a marker file (e.g., go.mod, Cargo.toml)."""
-    current = os.path.dirname(os.path.abspath(filepath))
-    while current != os.path.dirname(current):
-        if os.path.isfile(os.path.join(current, marker)):
-            return current
-        current = os.path.dirname(current)
-    return None
+    """Find the nearest directory above filepath holding a marker file (e.g., go.mod, Cargo.toml)."""
+    return root_index.find_root(filepath, marker)
+
+
+def find_project_roots(filepaths: list[str], marker: str) -> dict[str, str | None]:
+    """find_project_root for many files at once."""
+    return root_index.find_roots(filepaths, marker)
 
 
 def detect_language(filepath: str) -> str | None:
@@ -125,8 +211,14 @@ def get_checker(language: str) -> Any:
     return None
 
 
-def check_file(filepath: str) -> dict[str, Any]:
-    """Run all checks on a file. Returns findings dict."""
+def check_file(filepath: str, cache: Any = None, scope: Any = None) -> dict[str, Any]:
+    """Run all checks on a file. Returns findings dict.
+
+    With a result_cache.ResultCache, a file whose bytes match a previously
+    checked state is answered from the cache without running any tools.
+    With an edit_scope.EditScope, comment stripping and findings are limited
+    to the lines the edit touched.
+    """
     if should_skip(filepath):
         return {"skipped": True, "reason": "excluded file type/pattern"}
 
@@ -138,4 +230,55 @@ def check_file(filepath: str) -> dict[str, Any]:
     if not checker:
         return {"skipped": True, "reason": f"no checker for {language}"}
 
-    return checker.check(filepath)
+    return checker.check(filepath, cache, scope)
+
+
+def peek_file(filepath: str, cache: Any = None) -> dict[str, Any]:
+    """Cheap partial check for an edit whose full check has been deferred.
+
+    Returns the cached result when the content was already checked, otherwise
+    only the file length check. Runs no tools.
+    """
+    language = None if should_skip(filepath) else detect_language(filepath)
+    if not language:
+        return {"skipped": True, "reason": "excluded or unsupported file"}
+    key = cache.key(filepath, language) if cache else None
+    cached = cache.get(key) if key else None
+    if cache:
+        cache.flush()
+    if cached is not None:
+        return {**cached, "cache": {"hit": True}}
+    result: dict[str, Any] = {"findings": [], "formatted": False, "deferred": True}
+    check_file_length(filepath, result)
+    return result
+
+
+def check_files(filepaths: list[str], cache: Any = None) -> dict[str, dict[str, Any]]:
+    """Run all checks on many files. Returns {filepath: findings dict}.
+
+    Files are grouped by language so each tool runs once per language (and
+    project root) instead of once per file.
+    """
+    from .pipeline import run_batch
+
+    results: dict[str, dict[str, Any]] = {}
+    by_language: dict[str, list[str]] = {}
+    for filepath in filepaths:
+        if should_skip(filepath):
+            results[filepath] = {"skipped": True, "reason": "excluded file type/pattern"}
+            continue
+        language = detect_language(filepath)
+        if not language:
+            results[filepath] = {"skipped": True, "reason": "unsupported language"}
+            continue
+        by_language.setdefault(language, []).append(filepath)
+
+    for language, files in by_language.items():
+        checker = get_checker(language)
+        if not checker:
+            for filepath in files:
+                results[filepath] = {"skipped": True, "reason": f"no checker for {language}"}
+            continue
+        results.update(run_batch(checker.PIPELINE, files, cache))
+
+    return results
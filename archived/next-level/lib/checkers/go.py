@@ -1,103 +1,119 @@
 """Go checker.
 
 Format: gofmt -w <file>
-Lint: go vet ./... + golangci-lint run --fast <file>
+Lint: go vet <package> + golangci-lint run --fast <file> (concurrently)
 Graceful degradation: if tools not installed, skip.
+
+go vet runs on the edited file's package only, from the module root. Its
+findings for the whole package are cached (lib/project_cache.py) under a
+fingerprint of the package's file contents, the sources of the in-module
+packages it imports and go.mod/go.sum, resolved through the module's
+import-path index (lib/go_packages.py). Unchanged packages are never
+re-vetted; without that index (go list fails) vet still runs scoped, uncached.
+
+golangci-lint rejects named files from more than one directory, so batches
+run it once per package directory.
 """
 
+import hashlib
 import json
 import os
 import re
-import shutil
-import subprocess
 from typing import Any
 
-from . import check_file_length, find_project_root, run_comment_strip
+import go_packages
 
+from . import find_project_root
+from .pipeline import Pipeline, Stage, StageContext, run
 
-def check(filepath: str) -> dict[str, Any]:
-    """Run Go checks on a file."""
-    result: dict[str, Any] = {"findings": [], "formatted": False}
+# Pattern: [vet: ]filepath.go:line:col: message
+_VET_PATTERN = re.compile(r"^(?:vet: )?(.+?\.go):(\d+):(\d+): (.+)$", re.MULTILINE)
 
-    check_file_length(filepath, result)
 
-    # Format with gofmt
-    gofmt_path = shutil.which("gofmt")
-    if gofmt_path:
-        try:
-            proc = subprocess.run(
-                [gofmt_path, "-w", filepath],
-                capture_output=True,
-                timeout=15,
-            )
-            result["formatted"] = proc.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    # Strip unnecessary comments
-    run_comment_strip(filepath, "go", result)
-
-    # Find Go module root
-    module_root = find_project_root(filepath, "go.mod")
-
-    # Lint with go vet
-    go_path = shutil.which("go")
-    if module_root and go_path:
+def _index_go_vet(stdout: str, stderr: str, ctx: StageContext) -> dict[str, list[dict[str, Any]]]:
+    """Index one package's go vet findings (stderr, paths relative to the run's cwd) by real file path."""
+    index: dict[str, list[dict[str, Any]]] = {}
+    for match in _VET_PATTERN.finditer(stderr):
+        path = os.path.realpath(os.path.join(ctx.cwd or ctx.root or "", match.group(1)))
+        index.setdefault(path, []).append({
+            "line": int(match.group(2)),
+            "column": int(match.group(3)),
+            "message": match.group(4),
+            "rule": "go-vet",
+            "severity": "warning",
+        })
+    return index
+
+
+def _package_fingerprint(directory: str) -> str | None:
+    """Fingerprint what go vet's findings for a package depend on, or None if go cannot list it."""
+    module_root = find_project_root(os.path.join(directory, "go.mod"), "go.mod")
+    package = go_packages.package(module_root, directory) if module_root else None
+    if package is None:
+        return None
+    digest = hashlib.sha256(json.dumps([package.import_path, go_packages.module_stamp(module_root)]).encode())
+    for path in package.paths():
         try:
-            proc = subprocess.run(
-                [go_path, "vet", "./..."],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=module_root,
-            )
-            if proc.stderr:
-                rel_path = os.path.relpath(os.path.abspath(filepath), module_root)
-                _parse_go_vet_output(proc.stderr, rel_path, result)
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    # Lint with golangci-lint
-    golangci_path = shutil.which("golangci-lint")
-    if golangci_path:
+            with open(path, "rb") as f:
+                digest.update(f"{path}\0{hashlib.sha256(f.read()).hexdigest()}\n".encode())
+        except OSError:
+            return None
+    # Imported packages only matter through their API and vet facts; stat their sources
+    for dep in package.deps:
         try:
-            proc = subprocess.run(
-                [golangci_path, "run", "--out-format", "json", "--fast", filepath],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=module_root or os.path.dirname(filepath),
-            )
-            if proc.stdout:
-                try:
-                    lint_result = json.loads(proc.stdout)
-                    for issue in lint_result.get("Issues", []):
-                        result["findings"].append({
-                            "line": issue.get("Pos", {}).get("Line", 0),
-                            "column": issue.get("Pos", {}).get("Column", 0),
-                            "message": issue.get("Text", ""),
-                            "rule": issue.get("FromLinter", ""),
-                            "severity": issue.get("Severity", "warning"),
-                        })
-                except json.JSONDecodeError:
-                    pass
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    return result
-
-
-def _parse_go_vet_output(output: str, target_rel_path: str, result: dict[str, Any]) -> None:
-    """Parse go vet stderr output for findings related to target file."""
-    # Pattern: filepath.go:line:col: message
-    pattern = re.compile(r"(.+?\.go):(\d+):(\d+): (.+)")
-    for match in pattern.finditer(output):
-        file_path = match.group(1)
-        if file_path == target_rel_path or file_path.endswith("/" + target_rel_path):
-            result["findings"].append({
-                "line": int(match.group(2)),
-                "column": int(match.group(3)),
-                "message": match.group(4),
-                "rule": "go-vet",
-                "severity": "warning",
-            })
+            with os.scandir(dep) as it:
+                stats = sorted((entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                               for entry in it if entry.name.endswith(".go"))
+        except OSError:
+            stats = []
+        digest.update(f"{dep}\0{stats}\n".encode())
+    return digest.hexdigest()
+
+
+def _golangci_issues(stdout: str) -> list[dict[str, Any]]:
+    """Issues from `golangci-lint --out-format json`."""
+    try:
+        return json.loads(stdout).get("Issues", [])
+    except json.JSONDecodeError:
+        return []
+
+
+def _golangci_finding(issue: dict[str, Any]) -> dict[str, Any]:
+    """Normalize one golangci-lint issue."""
+    return {
+        "line": issue.get("Pos", {}).get("Line", 0),
+        "column": issue.get("Pos", {}).get("Column", 0),
+        "message": issue.get("Text", ""),
+        "rule": issue.get("FromLinter", ""),
+        "severity": issue.get("Severity", "warning"),
+    }
+
+
+def _parse_golangci(stdout: str, stderr: str, ctx: StageContext) -> list[dict[str, Any]]:
+    """Parse `golangci-lint --out-format json` issues."""
+    return [_golangci_finding(issue) for issue in _golangci_issues(stdout)]
+
+
+def _split_golangci(stdout: str, stderr: str, ctx: StageContext) -> dict[str, list[dict[str, Any]]]:
+    """Split multi-file golangci-lint issues by `Pos.Filename` (relative to the run's cwd)."""
+    per_file: dict[str, list[dict[str, Any]]] = {}
+    for issue in _golangci_issues(stdout):
+        target = ctx.match(issue.get("Pos", {}).get("Filename", ""))
+        if target:
+            per_file.setdefault(target, []).append(_golangci_finding(issue))
+    return per_file
+
+
+PIPELINE = Pipeline("go", (
+    Stage("format", "gofmt", ("{tool}", "-w", "{file}"), mutates=True, timeout=15, batch=True,
+          stdin_argv=("{tool}",)),
+    Stage("vet", "go", ("{tool}", "vet", "{dir}"), split=_index_go_vet, fingerprint=_package_fingerprint,
+          per_directory=True, timeout=30, root_marker="go.mod", require_root=True),
+    Stage("lint", "golangci-lint", ("{tool}", "run", "--out-format", "json", "--fast", "{file}"),
+          parse=_parse_golangci, split=_split_golangci, per_directory=True, timeout=30, root_marker="go.mod"),
+))
+
+
+def check(filepath: str, cache: Any = None, scope: Any = None) -> dict[str, Any]:
+    """Run Go checks on a file."""
+    return run(PIPELINE, filepath, cache, scope)
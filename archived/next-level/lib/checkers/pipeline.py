@@ -0,0 +1,748 @@
+"""Declarative checker pipeline engine.
+
+Each language module declares a Pipeline of Stages — tool, argv template,
+cwd strategy, output parser, and whether the stage mutates the file — and
+`run` executes it:
+
+1. Read the file once
+2. File length check
+3. Mutating stages (formatters), serially, piping the buffer through each
+   tool's stdin/stdout mode where it has one
+4. Comment stripping, in memory
+5. One atomic write (temp file + rename) if the content changed
+6. Read-only stages (linters, type checkers), concurrently, with findings
+   merged in declaration order
+
+The executor owns tool resolution, timeouts, parallelism and result caching,
+so cross-cutting changes land here once instead of in every checker.
+
+`run_batch` checks many files of one language with one invocation per
+batchable stage and project root, splitting diagnostics back out per file.
+
+Stages that analyze a whole project whatever file they are given (clippy),
+or a whole package (go vet), declare a fingerprint of its sources; their
+output is indexed by file and shared through project_cache, so every file of
+an unchanged project or package and every concurrent check of it costs one
+run.
+
+In the checker daemon, read-only stages that name a language server
+(templates/lsp.json) ask a warm lsp_client for the file's diagnostics
+instead of running their command, which stays the fallback. Stages that name
+a Node worker tool (prettier, eslint) likewise format and lint through a
+warm node_worker for the file's project root.
+
+With an edit_scope.EditScope, step 4 only strips comments on the lines the
+edit touched (followed through any formatter rewrite) and findings from step
+6 are filtered to those lines plus the scope's margin. The stages themselves
+still format and lint the whole file.
+
+Every result carries `timings`, measured with perf_counter_ns:
+
+    {"language": "typescript", "total_ms": 812.4, "stages": [
+        {"stage": "format", "tool": "prettier", "which_ms": 0.01, "run_ms": 301.2},
+        {"stage": "strip", "tool": "comment_stripper", "run_ms": 0.4},
+        {"stage": "lint", "tool": "eslint", "which_ms": 0.01, "run_ms": 498.7, "parse_ms": 0.3},
+    ]}
+
+which_ms is tool and project-root resolution; a stage whose tool is missing
+is listed with "skipped": true. Batch results also carry "files", the number
+of files the invocation covered. Cache hits report only the lookup; a
+whole-project stage answered from project_cache is marked "cached": true and
+its run_ms is the lookup; one answered by a language server is marked
+"lsp": true, and one answered by a Node worker "worker": true.
+"""
+
+import os
+import subprocess
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import lsp_client
+import node_worker
+import project_cache
+import tool_registry
+
+from . import (
+    check_file_length,
+    check_text_length,
+    find_project_root,
+    find_project_roots,
+    run_analyzers,
+    run_comment_strip,
+    strip_text,
+    write_atomic,
+)
+
+
+@dataclass(frozen=True)
+class StageContext:
+    """What a parser needs to know about the invocation it is parsing."""
+
+    filepath: str
+    root: str | None
+    files: tuple[str, ...] = ()
+    cwd: str | None = None
+
+    def match(self, reported: str) -> str | None:
+        """Map a path reported by a tool back to the batch file it refers to."""
+        path = os.path.realpath(os.path.join(self.cwd or os.getcwd(), reported))
+        return path if path in self.files else None
+
+
+Parser = Callable[[str, str, StageContext], list[dict[str, Any]]]
+Timing = dict[str, Any]
+Splitter = Callable[[str, str, StageContext], dict[str, list[dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One tool invocation in a language pipeline.
+
+    argv is a template: "{tool}" becomes the resolved binary path and
+    "{file}" the checked file. With root_marker set, the stage runs from the
+    nearest ancestor directory containing that marker; require_root skips
+    the stage when there is none, otherwise it falls back to the file's
+    directory. Without a marker the stage inherits the caller's cwd.
+
+    In batch mode "{file}" expands to every file in the group. Formatters
+    opt in with batch=True; analyzers opt in by providing split, which maps
+    the combined output back to {file: findings}.
+
+    A formatter with stdin_argv reads the content on stdin and writes the
+    formatted result to stdout; it runs from the file's directory so config
+    discovery matches an in-place run.
+
+    An analyzer that checks its whole project root whatever file it is
+    given sets fingerprint, a function of the root that changes whenever the
+    tool's output could. Its argv takes no "{file}", and its split must index
+    every file the output mentions by real path; the index is cached per
+    (root, fingerprint) in project_cache for single and batch runs alike.
+    With per_directory the unit is the file's directory (a Go package)
+    instead of the root: "{dir}" in argv expands to it, relative to the cwd
+    ("./sub/pkg"), and fingerprint is called with it. A batchable analyzer
+    without a fingerprint sets per_directory when its tool insists that the
+    files it is given share one directory (golangci-lint): batches are then
+    split per directory.
+
+    lsp names a server in templates/lsp.json whose diagnostics answer
+    single-file checks where lsp_client is enabled (the checker daemon);
+    the argv run remains the fallback and serves batches.
+
+    worker names a node_worker tool ("prettier", "eslint") whose warm Node
+    process formats or lints single files where node_worker is enabled (the
+    checker daemon); a formatter's worker replaces its stdin mode, an
+    analyzer's returns the output its parse expects. The argv and stdin runs
+    remain the fallback and serve batches.
+    """
+
+    name: str
+    tool: str
+    argv: tuple[str, ...]
+    parse: Parser | None = None
+    mutates: bool = False
+    timeout: int = 30
+    root_marker: str | None = None
+    require_root: bool = False
+    batch: bool = False
+    split: Splitter | None = None
+    stdin_argv: tuple[str, ...] | None = None
+    fingerprint: Callable[[str], str | None] | None = None
+    per_directory: bool = False
+    lsp: str | None = None
+    worker: str | None = None
+
+    @property
+    def batchable(self) -> bool:
+        """Whether one invocation can cover many files."""
+        return self.batch if self.mutates else self.split is not None
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """The ordered stages for one language."""
+
+    language: str
+    stages: tuple[Stage, ...]
+
+
+def _invoke(stage: Stage, tool_path: str, files: list[str], cwd: str | None,
+            directory: str = ".") -> subprocess.CompletedProcess[str] | None:
+    """Run a stage's tool on one or more files. Returns None if it timed out or vanished."""
+    argv: list[str] = []
+    for arg in stage.argv:
+        if arg == "{file}":
+            argv.extend(files)
+        else:
+            argv.append(arg.replace("{tool}", tool_path).replace("{dir}", directory))
+    try:
+        return subprocess.run(
+            argv,
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=stage.timeout,
+            cwd=cwd,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+
+
+def _ms(start_ns: int) -> float:
+    """Milliseconds elapsed since a perf_counter_ns reading."""
+    return round((time.perf_counter_ns() - start_ns) / 1e6, 3)
+
+
+def _timed_resolve(stage: Stage, filepath: str, timings: list[Timing],
+                   roots: dict[str, str | None] | None = None,
+                   ) -> tuple[tuple[str, str | None, str | None] | None, Timing]:
+    """_resolve, recording a timing entry for the stage (marked skipped if it will not run)."""
+    start = time.perf_counter_ns()
+    resolved = _resolve(stage, filepath, roots)
+    timing: Timing = {"stage": stage.name, "tool": stage.tool, "which_ms": _ms(start)}
+    if not resolved:
+        timing["skipped"] = True
+    timings.append(timing)
+    return resolved, timing
+
+
+def _resolve(stage: Stage, filepath: str,
+             roots: dict[str, str | None] | None = None) -> tuple[str, str | None, str | None] | None:
+    """Resolve a stage's tool path, cwd and project root. None means skip the stage.
+
+    `roots` holds project roots already resolved in bulk (find_project_roots).
+    """
+    tool_path = tool_registry.which(stage.tool)
+    if not tool_path:
+        return None
+    if not stage.root_marker:
+        return tool_path, None, None
+    root = roots[filepath] if roots and filepath in roots else find_project_root(filepath, stage.root_marker)
+    if not root and stage.require_root:
+        return None
+    return tool_path, root or os.path.dirname(filepath), root
+
+
+def _analyze(stage: Stage, filepath: str, timings: list[Timing]) -> Callable[[], list[dict[str, Any]]] | None:
+    """Bind a read-only stage into an analyzer for run_analyzers, or None to skip it."""
+    resolved, timing = _timed_resolve(stage, filepath, timings)
+    if not resolved:
+        return None
+    tool_path, cwd, root = resolved
+    if stage.fingerprint and root:
+        project = _project_job(stage, tool_path, filepath, cwd, root, timing)
+        target = os.path.realpath(filepath)
+        return lambda: project().get(target, [])
+    if not stage.parse:
+        return None
+    parse = stage.parse
+
+    def analyzer() -> list[dict[str, Any]]:
+        start = time.perf_counter_ns()
+        proc = _invoke(stage, tool_path, [filepath], cwd)
+        timing["run_ms"] = _ms(start)
+        if proc is None:
+            return []
+        start = time.perf_counter_ns()
+        findings = parse(proc.stdout or "", proc.stderr or "", StageContext(filepath, root))
+        timing["parse_ms"] = _ms(start)
+        return findings
+
+    if stage.lsp and lsp_client.enabled():
+        return _lsp_analyzer(stage, stage.lsp, filepath, root or os.getcwd(), timing, analyzer)
+    if stage.worker and node_worker.enabled():
+        return _worker_analyzer(stage, stage.worker, tool_path, filepath, root, timing, analyzer)
+    return analyzer
+
+
+def _lsp_analyzer(stage: Stage, server: str, filepath: str, root: str, timing: Timing,
+                  fallback: Callable[[], list[dict[str, Any]]]) -> Callable[[], list[dict[str, Any]]]:
+    """Ask the stage's warm language server, falling back to the command-line analyzer."""
+    deadline = min(stage.timeout, lsp_client.DIAGNOSTIC_DEADLINE)
+
+    def analyzer() -> list[dict[str, Any]]:
+        start = time.perf_counter_ns()
+        findings = lsp_client.diagnostics(server, root, filepath, deadline)
+        if findings is None:
+            return fallback()
+        timing.update(lsp=True, run_ms=_ms(start))
+        return findings
+
+    return analyzer
+
+
+def _worker_analyzer(stage: Stage, tool: str, tool_path: str, filepath: str, root: str | None, timing: Timing,
+                     fallback: Callable[[], list[dict[str, Any]]]) -> Callable[[], list[dict[str, Any]]]:
+    """Lint in the stage's warm Node worker, falling back to the command-line analyzer."""
+    parse = stage.parse
+
+    def analyzer() -> list[dict[str, Any]]:
+        start = time.perf_counter_ns()
+        stdout = node_worker.lint(tool, tool_path, filepath, stage.timeout)
+        if stdout is None or parse is None:
+            return fallback()
+        timing.update(worker=True, run_ms=_ms(start))
+        start = time.perf_counter_ns()
+        findings = parse(stdout, "", StageContext(filepath, root))
+        timing["parse_ms"] = _ms(start)
+        return findings
+
+    return analyzer
+
+
+def _format_buffer(stage: Stage, tool_path: str, filepath: str, source: str) -> tuple[bool, str] | None:
+    """Pipe content through a formatter's stdin mode. Returns (succeeded, content).
+
+    None means the reply cannot be used as the file's content (not UTF-8, or
+    empty for a non-empty buffer), and the stage should run its file command.
+    A tool that timed out or vanished is not retried that way.
+    """
+    argv = [arg.replace("{tool}", tool_path).replace("{file}", filepath) for arg in stage.stdin_argv or ()]
+    try:
+        # Bytes, not text mode: universal newlines would turn CRLF output into LF
+        proc = subprocess.run(
+            argv,
+            input=source.encode("utf-8"),
+            capture_output=True,
+            timeout=stage.timeout,
+            cwd=os.path.dirname(filepath),
+        )
+        stdout = proc.stdout.decode("utf-8")
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False, source
+    except UnicodeDecodeError:
+        return None
+    if proc.returncode != 0:
+        return False, source
+    if source and not stdout:
+        return None
+    return True, stdout
+
+
+def _execute(pipeline: Pipeline, filepath: str, scope: Any = None) -> dict[str, Any]:
+    """Run every stage of a pipeline against a file, reading and writing it once.
+
+    The file is read and written with newline="", so CRLF line endings survive.
+    """
+    try:
+        with open(filepath, encoding="utf-8", newline="") as f:
+            original = f.read()
+    except (OSError, UnicodeDecodeError):
+        return _execute_on_disk(pipeline, filepath)
+
+    started = time.perf_counter_ns()
+    timings: list[Timing] = []
+    result: dict[str, Any] = {"findings": [], "formatted": False}
+    check_text_length(original, result)
+    ranges = scope.locate(original) if scope else None
+
+    source = original
+    on_disk = True
+    for stage in pipeline.stages:
+        if not stage.mutates:
+            continue
+        resolved, timing = _timed_resolve(stage, filepath, timings)
+        if not resolved:
+            continue
+        tool_path, cwd, _ = resolved
+        start = time.perf_counter_ns()
+        formatted = None
+        if stage.worker and node_worker.enabled():
+            formatted = node_worker.format_text(stage.worker, tool_path, filepath, source, stage.timeout)
+            if formatted is not None:
+                timing["worker"] = True
+        if formatted is None and stage.stdin_argv:
+            formatted = _format_buffer(stage, tool_path, filepath, source)
+        if formatted is not None:
+            timing["run_ms"] = _ms(start)
+            result["formatted"], new_source = formatted
+            on_disk = on_disk and new_source == source
+            source = new_source
+            continue
+        # No stdin mode, or its reply was unusable: flush the buffer, format in place, read it back
+        if not on_disk:
+            write_atomic(filepath, source)
+            on_disk = True
+        proc = _invoke(stage, tool_path, [filepath], cwd)
+        timing["run_ms"] = _ms(start)
+        if proc is not None:
+            result["formatted"] = proc.returncode == 0
+        try:
+            with open(filepath, encoding="utf-8", newline="") as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            return _finish_on_disk(pipeline, filepath, result, timings, started)
+
+    if ranges:
+        ranges = scope.follow(ranges, original, source)
+
+    # Strip comments before analysis so findings match the final file
+    start = time.perf_counter_ns()
+    stripped = strip_text(source, pipeline.language, result, ranges)
+    timings.append({"stage": "strip", "tool": "comment_stripper", "run_ms": _ms(start)})
+    if stripped != source:
+        if ranges:
+            ranges = scope.follow(ranges, source, stripped)
+        on_disk = False
+        source = stripped
+
+    if not on_disk:
+        try:
+            write_atomic(filepath, source)
+        except OSError as exc:
+            result["write_error"] = str(exc)
+
+    analyzers = [_analyze(stage, filepath, timings) for stage in pipeline.stages if not stage.mutates]
+    run_analyzers(result, *(a for a in analyzers if a))
+
+    if ranges:
+        result["findings"] = scope.filter(result["findings"], ranges)
+        result["scope"] = ranges
+
+    result["timings"] = _timings(pipeline, timings, started)
+    return result
+
+
+def _timings(pipeline: Pipeline, stages: list[Timing], started: int) -> dict[str, Any]:
+    """The `timings` entry of a result."""
+    return {"language": pipeline.language, "total_ms": _ms(started), "stages": stages}
+
+
+def _execute_on_disk(pipeline: Pipeline, filepath: str) -> dict[str, Any]:
+    """File-based fallback for content that cannot be held as UTF-8 text."""
+    started = time.perf_counter_ns()
+    timings: list[Timing] = []
+    result: dict[str, Any] = {"findings": [], "formatted": False}
+
+    check_file_length(filepath, result)
+
+    for stage in pipeline.stages:
+        if not stage.mutates:
+            continue
+        resolved, timing = _timed_resolve(stage, filepath, timings)
+        if not resolved:
+            continue
+        tool_path, cwd, _ = resolved
+        start = time.perf_counter_ns()
+        proc = _invoke(stage, tool_path, [filepath], cwd)
+        timing["run_ms"] = _ms(start)
+        if proc is not None:
+            result["formatted"] = proc.returncode == 0
+
+    return _finish_on_disk(pipeline, filepath, result, timings, started)
+
+
+def _finish_on_disk(pipeline: Pipeline, filepath: str, result: dict[str, Any],
+                    timings: list[Timing], started: int) -> dict[str, Any]:
+    """Strip comments in place and run the analyzers."""
+    # Strip comments before analysis so findings match the final file
+    start = time.perf_counter_ns()
+    run_comment_strip(filepath, pipeline.language, result)
+    timings.append({"stage": "strip", "tool": "comment_stripper", "run_ms": _ms(start)})
+
+    analyzers = [_analyze(stage, filepath, timings) for stage in pipeline.stages if not stage.mutates]
+    run_analyzers(result, *(a for a in analyzers if a))
+
+    result["timings"] = _timings(pipeline, timings, started)
+    return result
+
+
+def run(pipeline: Pipeline, filepath: str, cache: Any = None, scope: Any = None) -> dict[str, Any]:
+    """Run a pipeline, answering from a result_cache.ResultCache when possible.
+
+    Scoped runs read whole-file results from the cache (filtered to the
+    scope) but never store their own partial ones.
+    """
+    if cache is None:
+        return _execute(pipeline, filepath, scope)
+
+    started = time.perf_counter_ns()
+    key = cache.key(filepath, pipeline.language)
+    cached = cache.get(key) if key else None
+    if cached is not None:
+        cached = {**cached, "cache": {"hit": True, **cache.stats()}, "timings": _timings(pipeline, [], started)}
+        return _scope_cached(cached, filepath, scope) if scope else cached
+
+    if scope:
+        return {**_execute(pipeline, filepath, scope), "cache": {"hit": False, **cache.stats()}}
+
+    result = _execute(pipeline, filepath)
+
+    # Key on the checked (formatted, stripped) content; re-checking it strips nothing
+    final_key = cache.key(filepath, pipeline.language)
+    if final_key:
+        cache.put(final_key, _cacheable(result))
+    return {**result, "cache": {"hit": False, **cache.stats()}}
+
+
+def _cacheable(result: dict[str, Any]) -> dict[str, Any]:
+    """What to store for a checked file: re-checking it strips nothing and costs no stage time."""
+    return {**{k: v for k, v in result.items() if k != "timings"}, "comments_stripped": 0}
+
+
+def _scope_cached(result: dict[str, Any], filepath: str, scope: Any) -> dict[str, Any]:
+    """Filter a cached whole-file result down to an edit's lines."""
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            ranges = scope.locate(f.read())
+    except (OSError, UnicodeDecodeError):
+        return result
+    if not ranges:
+        return result
+    return {**result, "findings": scope.filter(result.get("findings", []), ranges), "scope": ranges}
+
+
+def _groups(stage: Stage, files: list[str]) -> dict[tuple[str, str | None, str | None], list[str]]:
+    """Group files by (tool path, cwd, root) — the unit one invocation can cover."""
+    groups: dict[tuple[str, str | None, str | None], list[str]] = {}
+    roots = find_project_roots(files, stage.root_marker) if stage.root_marker else None
+    for filepath in files:
+        resolved = _resolve(stage, filepath, roots)
+        if resolved:
+            groups.setdefault(resolved, []).append(filepath)
+    return groups
+
+
+def _execute_batch(pipeline: Pipeline, files: list[str]) -> dict[str, dict[str, Any]]:
+    """Run a pipeline over many files with one invocation per batchable stage and group.
+
+    Formatters run on the files in place rather than through their stdin
+    mode: stdin carries one file, and one `ruff format a.py b.py ...` costs
+    less than a process per file. Each file is then read once, stripped in
+    memory and written once, as in a single-file run.
+    """
+    started = time.perf_counter_ns()
+    results: dict[str, dict[str, Any]] = {}
+    timings: dict[str, list[Timing]] = {}
+    for filepath in files:
+        results[filepath] = {"findings": [], "formatted": False}
+        timings[filepath] = []
+        check_file_length(filepath, results[filepath])
+
+    for stage in pipeline.stages:
+        if not stage.mutates:
+            continue
+        for (tool_path, cwd, _), group in _timed_groups(stage, files, timings).items():
+            chunks = [group] if stage.batch else [[f] for f in group]
+            for chunk in chunks:
+                start = time.perf_counter_ns()
+                proc = _invoke(stage, tool_path, chunk, cwd)
+                timing = {"stage": stage.name, "tool": stage.tool, "run_ms": _ms(start), "files": len(chunk)}
+                for filepath in chunk:
+                    timings[filepath].append(timing)
+                    if proc is not None:
+                        results[filepath]["formatted"] = proc.returncode == 0
+
+    for filepath in files:
+        start = time.perf_counter_ns()
+        _strip_file(filepath, pipeline.language, results[filepath])
+        timings[filepath].append({"stage": "strip", "tool": "comment_stripper", "run_ms": _ms(start)})
+
+    # One analyzer per (stage, group) for batchable stages, per file otherwise
+    jobs: list[tuple[int, Callable[[], dict[str, list[dict[str, Any]]]]]] = []
+    for index, stage in enumerate(pipeline.stages):
+        if stage.mutates:
+            continue
+        for (tool_path, cwd, root), group in _timed_groups(stage, files, timings).items():
+            if stage.fingerprint and root:
+                units: dict[str, list[str]] = {}
+                for filepath in group:
+                    units.setdefault(_unit(stage, filepath, root), []).append(filepath)
+                for unit_group in units.values():
+                    timing = {"stage": stage.name, "tool": stage.tool, "files": len(unit_group)}
+                    for filepath in unit_group:
+                        timings[filepath].append(timing)
+                    jobs.append((index, _project_group_job(stage, tool_path, unit_group, cwd, root, timing)))
+            elif stage.batchable:
+                for unit_group in _directory_groups(stage, group):
+                    timing = {"stage": stage.name, "tool": stage.tool, "files": len(unit_group)}
+                    for filepath in unit_group:
+                        timings[filepath].append(timing)
+                    jobs.append((index, _batch_job(stage, tool_path, unit_group, cwd, root, timing)))
+            else:
+                for filepath in group:
+                    timing = {"stage": stage.name, "tool": stage.tool, "files": 1}
+                    timings[filepath].append(timing)
+                    jobs.append((index, _single_job(stage, tool_path, filepath, cwd, root, timing)))
+
+    outputs: list[tuple[int, dict[str, list[dict[str, Any]]]]] = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 4)) as pool:
+            futures = [(index, pool.submit(job)) for index, job in jobs]
+            outputs = [(index, future.result()) for index, future in futures]
+
+    # Merge in stage declaration order, matching single-file runs
+    for _, per_file in sorted(outputs, key=lambda item: item[0]):
+        for filepath, findings in per_file.items():
+            results[filepath]["findings"].extend(findings)
+
+    for filepath in files:
+        results[filepath]["timings"] = _timings(pipeline, timings[filepath], started)
+    return results
+
+
+def _strip_file(filepath: str, language: str, result: dict[str, Any]) -> None:
+    """Strip comments from a file formatted on disk: one read, one atomic write if anything changed."""
+    try:
+        with open(filepath, encoding="utf-8", newline="") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError):
+        run_comment_strip(filepath, language, result)
+        return
+    stripped = strip_text(source, language, result)
+    if stripped != source:
+        try:
+            write_atomic(filepath, stripped)
+        except OSError as exc:
+            result["write_error"] = str(exc)
+
+
+def _timed_groups(stage: Stage, files: list[str],
+                  timings: dict[str, list[Timing]]) -> dict[tuple[str, str | None, str | None], list[str]]:
+    """_groups, recording the resolution time (spread over the files) and skipped files."""
+    start = time.perf_counter_ns()
+    groups = _groups(stage, files)
+    which_ms = round(_ms(start) / max(len(files), 1), 3)
+    grouped = {filepath for group in groups.values() for filepath in group}
+    for filepath in files:
+        if filepath not in grouped:
+            timings[filepath].append({"stage": stage.name, "tool": stage.tool, "which_ms": which_ms, "skipped": True})
+    return groups
+
+
+def _batch_job(stage: Stage, tool_path: str, group: list[str], cwd: str | None,
+               root: str | None, timing: Timing) -> Callable[[], dict[str, list[dict[str, Any]]]]:
+    """Bind one invocation of a batchable analyzer over a group of files."""
+    split = stage.split
+
+    def job() -> dict[str, list[dict[str, Any]]]:
+        start = time.perf_counter_ns()
+        proc = _invoke(stage, tool_path, group, cwd)
+        timing["run_ms"] = _ms(start)
+        if proc is None or split is None:
+            return {}
+        ctx = StageContext(group[0], root, tuple(group), cwd)
+        start = time.perf_counter_ns()
+        per_file = split(proc.stdout or "", proc.stderr or "", ctx)
+        timing["parse_ms"] = _ms(start)
+        return per_file
+
+    return job
+
+
+def _directory_groups(stage: Stage, group: list[str]) -> list[list[str]]:
+    """A batch group as one invocation's files, or with per_directory one per directory."""
+    if not stage.per_directory:
+        return [group]
+    by_directory: dict[str, list[str]] = {}
+    for filepath in group:
+        by_directory.setdefault(os.path.dirname(os.path.abspath(filepath)), []).append(filepath)
+    return list(by_directory.values())
+
+
+def _unit(stage: Stage, filepath: str, root: str) -> str:
+    """The directory a fingerprinted stage analyzes for a file: the root, or with per_directory its own."""
+    return os.path.dirname(os.path.abspath(filepath)) if stage.per_directory else root
+
+
+def _project_job(stage: Stage, tool_path: str, filepath: str, cwd: str | None,
+                 root: str, timing: Timing) -> Callable[[], dict[str, list[dict[str, Any]]]]:
+    """Bind a whole-project analyzer: its {real path: findings} index, from project_cache when current."""
+    split = stage.split
+    fingerprint = stage.fingerprint
+    unit = _unit(stage, filepath, root)
+    rel = os.path.relpath(unit, cwd or unit)
+    directory = "." if rel == "." else f"./{rel}"
+
+    def compute() -> dict[str, list[dict[str, Any]]] | None:
+        start = time.perf_counter_ns()
+        proc = _invoke(stage, tool_path, [], cwd, directory)
+        timing["run_ms"] = _ms(start)
+        if proc is None or split is None:
+            return None
+        start = time.perf_counter_ns()
+        index = split(proc.stdout or "", proc.stderr or "", StageContext(filepath, root, cwd=cwd))
+        timing["parse_ms"] = _ms(start)
+        return index
+
+    def job() -> dict[str, list[dict[str, Any]]]:
+        start = time.perf_counter_ns()
+        index, reused = project_cache.project_findings(
+            f"{stage.name}:{tool_path}", unit, lambda: fingerprint(unit) if fingerprint else None, compute)
+        if reused:
+            timing.update(cached=True, run_ms=_ms(start))
+        return index
+
+    return job
+
+
+def _project_group_job(stage: Stage, tool_path: str, group: list[str], cwd: str | None,
+                       root: str, timing: Timing) -> Callable[[], dict[str, list[dict[str, Any]]]]:
+    """Bind a whole-project analyzer over a batch group, picking the group's files out of the index."""
+    project = _project_job(stage, tool_path, group[0], cwd, root, timing)
+
+    def job() -> dict[str, list[dict[str, Any]]]:
+        index = project()
+        return {filepath: index.get(os.path.realpath(filepath), []) for filepath in group}
+
+    return job
+
+
+def _single_job(stage: Stage, tool_path: str, filepath: str, cwd: str | None,
+                root: str | None, timing: Timing) -> Callable[[], dict[str, list[dict[str, Any]]]]:
+    """Bind a per-file invocation of a non-batchable analyzer."""
+    parse = stage.parse
+
+    def job() -> dict[str, list[dict[str, Any]]]:
+        start = time.perf_counter_ns()
+        proc = _invoke(stage, tool_path, [filepath], cwd)
+        timing["run_ms"] = _ms(start)
+        if proc is None or parse is None:
+            return {}
+        start = time.perf_counter_ns()
+        findings = parse(proc.stdout or "", proc.stderr or "", StageContext(filepath, root))
+        timing["parse_ms"] = _ms(start)
+        return {filepath: findings}
+
+    return job
+
+
+def run_batch(pipeline: Pipeline, files: list[str], cache: Any = None) -> dict[str, dict[str, Any]]:
+    """Run a pipeline over many files of its language, answering cached files first.
+
+    Files may be relative or reached through symlinks: tools report (and
+    StageContext.match compares) resolved paths, so the batch runs on the
+    realpaths and each result is returned under the path the caller passed.
+    """
+    keys: dict[str, list[str]] = {}
+    for filepath in files:
+        keys.setdefault(os.path.realpath(filepath), []).append(filepath)
+    resolved = _run_resolved_batch(pipeline, list(keys), cache)
+    return {key: result for real, result in resolved.items() for key in keys[real]}
+
+
+def _run_resolved_batch(pipeline: Pipeline, files: list[str], cache: Any) -> dict[str, dict[str, Any]]:
+    """run_batch over realpaths."""
+    if cache is None:
+        return _execute_batch(pipeline, files)
+
+    results: dict[str, dict[str, Any]] = {}
+    pending: list[str] = []
+    for filepath in files:
+        started = time.perf_counter_ns()
+        key = cache.key(filepath, pipeline.language)
+        cached = cache.get(key) if key else None
+        if cached is not None:
+            results[filepath] = {**cached, "cache": {"hit": True}, "timings": _timings(pipeline, [], started)}
+        else:
+            pending.append(filepath)
+
+    for filepath, result in _execute_batch(pipeline, pending).items():
+        final_key = cache.key(filepath, pipeline.language)
+        if final_key:
+            cache.put(final_key, _cacheable(result))
+        results[filepath] = {**result, "cache": {"hit": False}}
+    cache.flush()
+    return results
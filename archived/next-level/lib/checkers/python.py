@@ -2,90 +2,94 @@
 
 Format: ruff format <file>
 Lint: ruff check <file>
-Type check: basedpyright <file> (if available)
+Type check: basedpyright <file> (if available); in the checker daemon with the
+lsp_diagnostics feature, a warm basedpyright-langserver instead
+Lint and type check run concurrently once the file has settled.
 Graceful degradation: if tools not installed, skip.
 """
 
 import json
-import shutil
-import subprocess
 from typing import Any
 
-from . import check_file_length, run_comment_strip
+from .pipeline import Pipeline, Stage, StageContext, run
 
 
-def check(filepath: str) -> dict[str, Any]:
+def _ruff_finding(diag: dict[str, Any]) -> dict[str, Any]:
+    """Normalize one ruff diagnostic."""
+    return {
+        "line": diag.get("location", {}).get("row", 0),
+        "column": diag.get("location", {}).get("column", 0),
+        "message": diag.get("message", ""),
+        "rule": diag.get("code", ""),
+        "severity": "error" if diag.get("code", "").startswith(("E", "F")) else "warning",
+    }
+
+
+def _parse_ruff(stdout: str, stderr: str, ctx: StageContext) -> list[dict[str, Any]]:
+    """Parse `ruff check --output-format json` diagnostics."""
+    try:
+        return [_ruff_finding(diag) for diag in json.loads(stdout)]
+    except json.JSONDecodeError:
+        return []
+
+
+def _split_ruff(stdout: str, stderr: str, ctx: StageContext) -> dict[str, list[dict[str, Any]]]:
+    """Split multi-file ruff diagnostics by their `filename`."""
+    per_file: dict[str, list[dict[str, Any]]] = {}
+    try:
+        for diag in json.loads(stdout):
+            target = ctx.match(diag.get("filename", ""))
+            if target:
+                per_file.setdefault(target, []).append(_ruff_finding(diag))
+    except json.JSONDecodeError:
+        pass
+    return per_file
+
+
+def _pyright_diagnostics(stdout: str) -> list[dict[str, Any]]:
+    """Errors and warnings from `basedpyright --outputjson`."""
+    try:
+        diags = json.loads(stdout).get("generalDiagnostics", [])
+    except json.JSONDecodeError:
+        return []
+    return [d for d in diags if d.get("severity", "information") in ("error", "warning")]
+
+
+def _pyright_finding(diag: dict[str, Any]) -> dict[str, Any]:
+    """Normalize one basedpyright diagnostic."""
+    return {
+        "line": diag.get("range", {}).get("start", {}).get("line", 0) + 1,
+        "message": diag.get("message", ""),
+        "rule": diag.get("rule", ""),
+        "severity": diag.get("severity"),
+    }
+
+
+def _parse_basedpyright(stdout: str, stderr: str, ctx: StageContext) -> list[dict[str, Any]]:
+    """Parse `basedpyright --outputjson` diagnostics (errors and warnings only)."""
+    return [_pyright_finding(diag) for diag in _pyright_diagnostics(stdout)]
+
+
+def _split_basedpyright(stdout: str, stderr: str, ctx: StageContext) -> dict[str, list[dict[str, Any]]]:
+    """Split multi-file basedpyright diagnostics by their `file`."""
+    per_file: dict[str, list[dict[str, Any]]] = {}
+    for diag in _pyright_diagnostics(stdout):
+        target = ctx.match(diag.get("file", ""))
+        if target:
+            per_file.setdefault(target, []).append(_pyright_finding(diag))
+    return per_file
+
+
+PIPELINE = Pipeline("python", (
+    Stage("format", "ruff", ("{tool}", "format", "{file}"), mutates=True, timeout=15, batch=True,
+          stdin_argv=("{tool}", "format", "--stdin-filename", "{file}", "-")),
+    Stage("lint", "ruff", ("{tool}", "check", "--output-format", "json", "{file}"),
+          parse=_parse_ruff, split=_split_ruff, timeout=15),
+    Stage("typecheck", "basedpyright", ("{tool}", "--outputjson", "{file}"),
+          parse=_parse_basedpyright, split=_split_basedpyright, timeout=30, lsp="basedpyright"),
+))
+
+
+def check(filepath: str, cache: Any = None, scope: Any = None) -> dict[str, Any]:
     """Run Python checks on a file."""
-    result: dict[str, Any] = {"findings": [], "formatted": False}
-
-    check_file_length(filepath, result)
-
-    # Format with ruff
-    ruff_path = shutil.which("ruff")
-    if ruff_path:
-        try:
-            proc = subprocess.run(
-                [ruff_path, "format", filepath],
-                capture_output=True,
-                timeout=15,
-            )
-            result["formatted"] = proc.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    # Strip unnecessary comments (before linting so line numbers match final file)
-    run_comment_strip(filepath, "python", result)
-
-    # Lint with ruff (after comment stripping so findings match final content)
-    if ruff_path:
-        try:
-            proc = subprocess.run(
-                [ruff_path, "check", "--output-format", "json", filepath],
-                capture_output=True,
-                text=True,
-                timeout=15,
-            )
-            if proc.stdout:
-                try:
-                    ruff_results = json.loads(proc.stdout)
-                    for diag in ruff_results:
-                        result["findings"].append({
-                            "line": diag.get("location", {}).get("row", 0),
-                            "column": diag.get("location", {}).get("column", 0),
-                            "message": diag.get("message", ""),
-                            "rule": diag.get("code", ""),
-                            "severity": "error" if diag.get("code", "").startswith(("E", "F")) else "warning",
-                        })
-                except json.JSONDecodeError:
-                    pass
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    # Type check with basedpyright
-    basedpyright_path = shutil.which("basedpyright")
-    if basedpyright_path:
-        try:
-            proc = subprocess.run(
-                [basedpyright_path, "--outputjson", filepath],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if proc.stdout:
-                try:
-                    pyright_results = json.loads(proc.stdout)
-                    for diag in pyright_results.get("generalDiagnostics", []):
-                        severity = diag.get("severity", "information")
-                        if severity in ("error", "warning"):
-                            result["findings"].append({
-                                "line": diag.get("range", {}).get("start", {}).get("line", 0) + 1,
-                                "message": diag.get("message", ""),
-                                "rule": diag.get("rule", ""),
-                                "severity": severity,
-                            })
-                except json.JSONDecodeError:
-                    pass
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    return result
+    return run(PIPELINE, filepath, cache, scope)
@@ -3,72 +3,79 @@
 Format: rustfmt <file>
 Lint: cargo clippy (project-level, not per-file)
 Graceful degradation: if tools not installed, skip.
+
+Clippy always checks the whole crate, so its diagnostics are indexed by file
+and cached (lib/project_cache.py) until a source or manifest anywhere in the
+enclosing Cargo workspace changes; checking another file of an unchanged
+crate, or a batch of edits, costs one clippy run.
 """
 
 import json
 import os
-import shutil
-import subprocess
+from collections.abc import Iterator
 from typing import Any
 
-from . import check_file_length, find_project_root, run_comment_strip
+from project_cache import tree_fingerprint
 
+from . import find_project_root
+from .pipeline import Pipeline, Stage, StageContext, run
 
-def check(filepath: str) -> dict[str, Any]:
-    """Run Rust checks on a file."""
-    result: dict[str, Any] = {"findings": [], "formatted": False}
+# Files besides *.rs whose changes can change clippy's output
+CRATE_FILES = ("Cargo.toml", "Cargo.lock", "clippy.toml", ".clippy.toml", "rust-toolchain", "rust-toolchain.toml")
+# Build output; any other directory may hold modules (src/build/, tests/fixtures/)
+_SKIP_DIRS = frozenset({"target", "node_modules"})
 
-    check_file_length(filepath, result)
 
-    # Format with rustfmt
-    rustfmt_path = shutil.which("rustfmt")
-    if rustfmt_path:
+def _clippy_spans(stdout: str, root: str | None) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield (normalized span path, finding) for every compiler-message span."""
+    for line in stdout.splitlines():
         try:
-            proc = subprocess.run(
-                [rustfmt_path, filepath],
-                capture_output=True,
-                timeout=15,
-            )
-            result["formatted"] = proc.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    # Strip unnecessary comments
-    run_comment_strip(filepath, "rust", result)
-
-    # Lint with cargo clippy (project-level)
-    project_root = find_project_root(filepath, "Cargo.toml")
-    cargo_path = shutil.which("cargo")
-    if project_root and cargo_path:
-        try:
-            proc = subprocess.run(
-                [cargo_path, "clippy", "--message-format=json", "--", "-W", "clippy::all"],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                cwd=project_root,
-            )
-            # Parse JSON messages (one per line)
-            abs_filepath = os.path.normpath(os.path.abspath(filepath))
-            for line in proc.stdout.splitlines():
-                try:
-                    msg = json.loads(line)
-                    if msg.get("reason") == "compiler-message":
-                        message = msg.get("message", {})
-                        # Only include findings for the specific file
-                        for span in message.get("spans", []):
-                            span_path = os.path.normpath(os.path.join(project_root, span.get("file_name", "")))
-                            if span_path == abs_filepath:
-                                result["findings"].append({
-                                    "line": span.get("line_start", 0),
-                                    "column": span.get("column_start", 0),
-                                    "message": message.get("message", ""),
-                                    "rule": message.get("code", {}).get("code", "") if message.get("code") else "",
-                                    "severity": message.get("level", "warning"),
-                                })
-                except json.JSONDecodeError:
-                    continue
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-    return result
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if msg.get("reason") != "compiler-message":
+            continue
+        message = msg.get("message", {})
+        for span in message.get("spans", []):
+            span_path = os.path.normpath(os.path.join(root or "", span.get("file_name", "")))
+            yield span_path, {
+                "line": span.get("line_start", 0),
+                "column": span.get("column_start", 0),
+                "message": message.get("message", ""),
+                "rule": message.get("code", {}).get("code", "") if message.get("code") else "",
+                "severity": message.get("level", "warning"),
+            }
+
+
+def _index_clippy(stdout: str, stderr: str, ctx: StageContext) -> dict[str, list[dict[str, Any]]]:
+    """Index `cargo clippy --message-format=json` messages (one per line) by real file path."""
+    index: dict[str, list[dict[str, Any]]] = {}
+    for span_path, finding in _clippy_spans(stdout, ctx.root):
+        index.setdefault(os.path.realpath(span_path), []).append(finding)
+    return index
+
+
+def _crate_fingerprint(root: str) -> str | None:
+    """Fingerprint the sources of the outermost Cargo project around a crate.
+
+    Covers the whole workspace, so edits to a sibling path dependency
+    invalidate the crate's cached diagnostics too.
+    """
+    top = root
+    while (parent := find_project_root(top, "Cargo.toml")) and parent != top:
+        top = parent
+    return tree_fingerprint(top, (".rs",), CRATE_FILES, _SKIP_DIRS)
+
+
+PIPELINE = Pipeline("rust", (
+    Stage("format", "rustfmt", ("{tool}", "{file}"), mutates=True, timeout=15, batch=True,
+          stdin_argv=("{tool}", "--emit", "stdout")),
+    Stage("lint", "cargo", ("{tool}", "clippy", "--message-format=json", "--", "-W", "clippy::all"),
+          split=_index_clippy, fingerprint=_crate_fingerprint, timeout=60, root_marker="Cargo.toml",
+          require_root=True),
+))
+
+
+def check(filepath: str, cache: Any = None, scope: Any = None) -> dict[str, Any]:
+    """Run Rust checks on a file."""
+    return run(PIPELINE, filepath, cache, scope)
@@ -2,63 +2,58 @@
 
 Format: prettier --write <file>
 Lint: eslint --format json <file>
+In the checker daemon with the node_workers feature, both run in warm Node
+workers (lib/node_worker.py) instead
 File length warnings: >300 lines warn, >500 lines critical
 Graceful degradation: if tools not installed, skip.
 """
 
 import json
-import shutil
-import subprocess
 from typing import Any
 
-from . import check_file_length, run_comment_strip
+from .pipeline import Pipeline, Stage, StageContext, run
 
 
-def check(filepath: str) -> dict[str, Any]:
-    """Run TypeScript/JavaScript checks on a file."""
-    result: dict[str, Any] = {"findings": [], "formatted": False}
+def _eslint_findings(file_result: dict[str, Any]) -> list[dict[str, Any]]:
+    """Normalize the messages of one eslint file result."""
+    return [{
+        "line": msg.get("line", 0),
+        "column": msg.get("column", 0),
+        "message": msg.get("message", ""),
+        "rule": msg.get("ruleId", ""),
+        "severity": "error" if msg.get("severity") == 2 else "warning",
+    } for msg in file_result.get("messages", [])]
+
+
+def _parse_eslint(stdout: str, stderr: str, ctx: StageContext) -> list[dict[str, Any]]:
+    """Parse `eslint --format json` results."""
+    try:
+        return [finding for file_result in json.loads(stdout) for finding in _eslint_findings(file_result)]
+    except json.JSONDecodeError:
+        return []
 
-    check_file_length(filepath, result)
 
-    # Format with prettier
-    if shutil.which("prettier"):
-        try:
-            proc = subprocess.run(
-                ["prettier", "--write", filepath],
-                capture_output=True,
-                timeout=15,
-            )
-            result["formatted"] = proc.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+def _split_eslint(stdout: str, stderr: str, ctx: StageContext) -> dict[str, list[dict[str, Any]]]:
+    """Split multi-file eslint results by their `filePath`."""
+    per_file: dict[str, list[dict[str, Any]]] = {}
+    try:
+        for file_result in json.loads(stdout):
+            target = ctx.match(file_result.get("filePath", ""))
+            if target:
+                per_file.setdefault(target, []).extend(_eslint_findings(file_result))
+    except json.JSONDecodeError:
+        pass
+    return per_file
 
-    # Strip unnecessary comments
-    run_comment_strip(filepath, "typescript", result)
 
-    # Lint with eslint
-    if shutil.which("eslint"):
-        try:
-            proc = subprocess.run(
-                ["eslint", "--format", "json", filepath],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if proc.stdout:
-                try:
-                    eslint_results = json.loads(proc.stdout)
-                    for file_result in eslint_results:
-                        for msg in file_result.get("messages", []):
-                            result["findings"].append({
-                                "line": msg.get("line", 0),
-                                "column": msg.get("column", 0),
-                                "message": msg.get("message", ""),
-                                "rule": msg.get("ruleId", ""),
-                                "severity": "error" if msg.get("severity") == 2 else "warning",
-                            })
-                except json.JSONDecodeError:
-                    pass
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+PIPELINE = Pipeline("typescript", (
+    Stage("format", "prettier", ("{tool}", "--write", "{file}"), mutates=True, timeout=15, batch=True,
+          stdin_argv=("{tool}", "--stdin-filepath", "{file}"), worker="prettier"),
+    Stage("lint", "eslint", ("{tool}", "--format", "json", "{file}"),
+          parse=_parse_eslint, split=_split_eslint, timeout=30, worker="eslint"),
+))
 
-    return result
+
+def check(filepath: str, cache: Any = None, scope: Any = None) -> dict[str, Any]:
+    """Run TypeScript/JavaScript checks on a file."""
+    return run(PIPELINE, filepath, cache, scope)
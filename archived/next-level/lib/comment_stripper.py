@@ -9,12 +9,13 @@ Strips unnecessary comments while preserving:
 - License headers (first comment block if contains "license", "copyright", "MIT", etc.)
 
 Python: uses tokenize module for accurate parsing.
-TypeScript/Swift/Rust/Go: regex-based with language-specific patterns.
+TypeScript/Swift/Rust/Go: one-pass lexer per dialect (strings, raw strings,
+template literals, nested block comments) plus language-specific rules.
 """
 
-import io
 import re
 import tokenize
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
@@ -36,282 +37,474 @@ def strip_comments(filepath: str, language: str) -> dict[str, Any]:
         modified: bool — whether the file was changed
     """
     try:
-        with open(filepath, encoding="utf-8") as f:
+        with open(filepath, encoding="utf-8", newline="") as f:
             original = f.read()
     except OSError:
         return {"stripped": 0, "modified": False}
 
-    if language == "python":
-        result = _strip_python(filepath, original)
-    elif language in ("typescript", "javascript"):
-        result = _strip_c_style(original, doc_prefix="/**")
-    elif language == "swift":
-        result = _strip_c_style(original, doc_prefix="///")
-    elif language == "rust":
-        result = _strip_c_style(original, doc_prefix="///")
-    elif language == "go":
-        result = _strip_c_style(original, doc_prefix="//", preserve_godoc=True)
-    else:
-        return {"stripped": 0, "modified": False}
+    result = strip_source(original, language)
 
     if result["modified"]:
-        with open(filepath, "w", encoding="utf-8") as f:
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
             f.write(result["content"])
 
     return {"stripped": result["stripped"], "modified": result["modified"]}
 
 
-def _strip_python(filepath: str, source: str) -> dict[str, Any]:
-    """Strip Python comments using tokenize for accuracy."""
-    try:
-        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
-    except tokenize.TokenError:
-        return {"stripped": 0, "modified": False, "content": source}
+def strip_source(source: str, language: str, lines: list[tuple[int, int]] | None = None) -> dict[str, Any]:
+    """Strip unnecessary comments from in-memory source.
 
-    stripped = 0
-    # Track which lines to remove comments from
-    lines = source.splitlines(keepends=True)
-    remove_lines: set[int] = set()  # 0-indexed line numbers
-
-    for tok in tokens:
-        if tok.type != tokenize.COMMENT:
-            continue
-
-        comment = tok.string
-        line_no = tok.start[0] - 1  # 0-indexed
-
-        # Preserve shebangs
-        if comment.startswith("#!") and line_no == 0:
-            continue
-
-        # Preserve type annotations
-        if "type:" in comment or "type: ignore" in comment:
-            continue
-
-        # Preserve noqa, pylint directives
-        if any(d in comment for d in ("noqa", "pylint:", "type: ignore", "pragma:")):
-            continue
-
-        # Preserve TODOs and similar markers
-        if PRESERVED_MARKERS.search(comment):
-            continue
-
-        # Preserve license headers (first comment block)
-        if line_no < 10 and LICENSE_MARKERS.search(comment):
-            continue
-
-        # This comment should be stripped
-        stripped += 1
-
-        # Check if the comment is the entire line (after stripping whitespace)
-        if line_no >= len(lines):
-            continue
-        line = lines[line_no]
-        stripped_line = line.lstrip()
-        if stripped_line.startswith("#"):
-            # Whole-line comment — mark for removal
-            remove_lines.add(line_no)
-        else:
-            # Inline comment — remove just the comment part
-            col = tok.start[1]
-            # Remove trailing whitespace before the comment too
-            before = lines[line_no][:col].rstrip()
-            newline = "\n" if line.endswith("\n") else ""
-            lines[line_no] = before + newline
+    With `lines` (1-indexed inclusive ranges), only comments starting on
+    those lines are stripped and scanning stops after the last range. It
+    still starts at the top: whether a line before the first range is code,
+    string or comment depends on everything above it.
 
-    # Remove whole-line comments (iterate in reverse to preserve indices)
-    new_lines = [line for i, line in enumerate(lines) if i not in remove_lines]
-    content = "".join(new_lines)
+    Returns dict with:
+        stripped: int — number of comments removed
+        modified: bool — whether the content changed
+        content: str — the resulting source
+    """
+    if language == "python":
+        return _strip_python(source, lines)
+    if language in ("typescript", "javascript"):
+        return _strip_c_style(source, "typescript", lines=lines)
+    if language in ("swift", "rust"):
+        return _strip_c_style(source, language, lines=lines)
+    if language == "go":
+        return _strip_c_style(source, "go", preserve_godoc=True, lines=lines)
+    return {"stripped": 0, "modified": False, "content": source}
 
-    return {
-        "stripped": stripped,
-        "modified": stripped > 0,
-        "content": content,
-    }
 
+# Lines kept editable behind tokenize's read position in _strip_python
+_PY_WINDOW = 256
+
+
+def _strip_python(source: str, lines: list[tuple[int, int]] | None = None) -> dict[str, Any]:
+    """Strip Python comments using tokenize for accuracy.
+
+    Tokens are consumed lazily and lines are emitted once tokenize has moved
+    well past them, so only the output and a small window of lines are held
+    instead of the full token and line lists.
+    """
+    # Fast path: no `#` anywhere but a shebang/encoding first line means no comments
+    first_nl = source.find("\n")
+    if first_nl < 0 or source.find("#", first_nl) < 0:
+        first_line = source if first_nl < 0 else source[:first_nl]
+        if "#" not in first_line or first_line.startswith("#!"):
+            return {"stripped": 0, "modified": False, "content": source}
 
-def _strip_c_style(
-    source: str,
-    doc_prefix: str = "/**",
-    preserve_godoc: bool = False,
-) -> dict[str, Any]:
-    """Strip C-style comments (//, /* */) with language-specific preservation."""
-    lines = source.splitlines(keepends=True)
     stripped = 0
-    new_lines: list[str] = []
-    in_block_comment = False
-    block_is_preserved = False
-
-    for i, line in enumerate(lines):
-        stripped_line = line.lstrip()
-
-        # Handle block comments
-        if in_block_comment:
-            if "*/" in line:
-                in_block_comment = False
-                if not block_is_preserved:
-                    stripped += 1
-                    continue
-            if not block_is_preserved:
-                continue
-            new_lines.append(line)
-            continue
-
-        # Start of block comment (skip if inside a string)
-        if "/*" in stripped_line and not stripped_line.startswith("//") and not _in_string(line, line.index("/*")):
-            # Check if it's a doc comment
-            if stripped_line.startswith("/**") or stripped_line.startswith("/*!"):
-                block_is_preserved = True
-            elif LICENSE_MARKERS.search(line):
-                block_is_preserved = True
-            elif PRESERVED_MARKERS.search(line):
-                block_is_preserved = True
-            elif preserve_godoc and _block_precedes_decl(lines, i):
-                block_is_preserved = True
-            else:
-                block_is_preserved = False
-
-            if "*/" not in line.split("/*", 1)[1]:
-                in_block_comment = True
-                if block_is_preserved:
-                    new_lines.append(line)
-                else:
-                    # Preserve code before /* on the same line
-                    before = line.split("/*")[0].rstrip()
-                    if before:
-                        new_lines.append(before + "\n")
-                    stripped += 1
+    out: list[str] = []
+    window: list[str] = []  # recently read lines, still open to edits
+    window_start = 0  # 0-indexed line number of window[0]
+    consumed = 0  # characters handed to tokenize so far
+    stop = lines[-1][1] if lines else None
+    source_lines = _iter_lines(source)
+
+    def readline() -> str:
+        nonlocal window_start, consumed
+        line = next(source_lines, "")
+        if line:
+            consumed += len(line)
+            window.append(line)
+            if len(window) >= 2 * _PY_WINDOW:
+                out.extend(window[:_PY_WINDOW])
+                del window[:_PY_WINDOW]
+                window_start += _PY_WINDOW
+        return line
+
+    try:
+        for tok in tokenize.generate_tokens(readline):
+            if stop is not None and tok.start[0] > stop:
+                break
+            if tok.type != tokenize.COMMENT:
                 continue
-            else:
-                # Single-line block comment
-                if not block_is_preserved:
-                    stripped += 1
-                    # Preserve code before /* and after */
-                    before = line.split("/*")[0]
-                    after = line.split("*/", 1)[1] if "*/" in line else ""
-                    combined = before.rstrip() + " " + after.lstrip() if before.strip() and after.strip() else before.rstrip() + after.lstrip()
-                    combined = combined.rstrip()
-                    if combined:
-                        new_lines.append(combined + "\n")
-                    continue
-                new_lines.append(line)
+
+            line_no = tok.start[0] - 1  # 0-indexed
+            if line_no < window_start:
+                continue  # already emitted; tokenize never reads this far ahead
+            if lines and not any(start <= line_no + 1 <= end for start, end in lines):
                 continue
 
-        # Single-line comments
-        if stripped_line.startswith("//"):
-            # Preserve doc comments
-            if stripped_line.startswith("///") or stripped_line.startswith("//!"):
-                new_lines.append(line)
+            comment = tok.string
+
+            # Preserve shebangs
+            if comment.startswith("#!") and line_no == 0:
                 continue
 
-            # Preserve shebangs (shouldn't be // but just in case)
-            if stripped_line.startswith("#!") and i == 0:
-                new_lines.append(line)
+            # Preserve type annotations
+            if "type:" in comment or "type: ignore" in comment:
                 continue
 
-            # Preserve compiler directives and linter directives
-            directive_patterns = [
-                "eslint-disable", "eslint-enable", "@ts-",
-                "swiftlint:", "nolint", "nosec",
-                "SAFETY:", "INVARIANT:",
-                "go:build", "go:generate", "go:embed", "go:linkname",
-                "+build",
-            ]
-            if any(p in stripped_line for p in directive_patterns):
-                new_lines.append(line)
+            # Preserve noqa, pylint directives
+            if any(d in comment for d in ("noqa", "pylint:", "type: ignore", "pragma:")):
                 continue
 
-            # Preserve TODOs and markers
-            if PRESERVED_MARKERS.search(stripped_line):
-                new_lines.append(line)
+            # Preserve TODOs and similar markers
+            if PRESERVED_MARKERS.search(comment):
                 continue
 
-            # Preserve license headers
-            if i < 10 and LICENSE_MARKERS.search(stripped_line):
-                new_lines.append(line)
+            # Preserve license headers (first comment block)
+            if line_no < 10 and LICENSE_MARKERS.search(comment):
                 continue
 
-            # Preserve godoc comments (Go: comment directly above a declaration)
-            if preserve_godoc and i + 1 < len(lines):
-                next_line = lines[i + 1].lstrip()
-                if next_line and (
-                    next_line.startswith("func ") or
-                    next_line.startswith("type ") or
-                    next_line.startswith("var ") or
-                    next_line.startswith("const ") or
-                    next_line.startswith("package ")
-                ):
-                    new_lines.append(line)
-                    continue
-
-            # Strip this comment
+            # This comment should be stripped
             stripped += 1
-            continue
-
-        # Handle inline comments (code // comment)
-        if "//" in line and not line.lstrip().startswith("//"):
-            # Check if // is inside a string
-            if not _in_string(line, line.index("//")):
-                comment_part = line[line.index("//"):]
-                # Check preservation rules on the comment part
-                if (PRESERVED_MARKERS.search(comment_part) or
-                        any(p in comment_part for p in ("eslint-disable", "@ts-", "nolint"))):
-                    new_lines.append(line)
-                    continue
-                # Strip inline comment
-                before = line[:line.index("//")].rstrip()
-                stripped += 1
-                new_lines.append(before + "\n")
-                continue
 
-        new_lines.append(line)
+            line = window[line_no - window_start]
+            if line.lstrip().startswith("#"):
+                # Whole-line comment — drop it
+                window[line_no - window_start] = ""
+            else:
+                # Inline comment — remove just the comment part
+                # and any trailing whitespace before it
+                before = line[:tok.start[1]].rstrip()
+                newline = line[len(line.rstrip("\r\n")):]
+                window[line_no - window_start] = before + newline
+    except (tokenize.TokenError, SyntaxError):
+        return {"stripped": 0, "modified": False, "content": source}
 
-    content = "".join(new_lines)
+    if not stripped:
+        return {"stripped": 0, "modified": False, "content": source}
+    out.extend(window)
+    out.append(source[consumed:])
     return {
         "stripped": stripped,
-        "modified": stripped > 0,
-        "content": content,
+        "modified": True,
+        "content": "".join(out),
     }
 
 
+def _iter_lines(source: str) -> Iterator[str]:
+    """Yield lines (with their newline) the way StringIO.readline splits them."""
+    start = 0
+    while start < len(source):
+        end = source.find("\n", start) + 1 or len(source)
+        yield source[start:end]
+        start = end
+
+
+# Whole-line // comments carrying one of these are compiler or linter directives
+_LINE_DIRECTIVES = re.compile("|".join(map(re.escape, (
+    "eslint-disable", "eslint-enable", "@ts-",
+    "swiftlint:", "nolint", "nosec",
+    "SAFETY:", "INVARIANT:",
+    "go:build", "go:generate", "go:embed", "go:linkname",
+    "+build",
+))))
+_INLINE_DIRECTIVES = re.compile(r"eslint-disable|@ts-|nolint")
+
 _GO_DECL_KEYWORDS = ("func ", "type ", "var ", "const ", "package ")
 
+# One token pattern per dialect. Plain string and char literals are matched
+# whole; anything needing state (template literals, raw strings, Swift
+# interpolation, regex literals) stops at its opener and is scanned in Python.
+# Every alternative starts with a literal character so `re` can use its fast
+# prefix scan.
+_DQ_STRING = r'"(?:[^"\\\n]|\\(?s:.))*"?'
+_SQ_STRING = r"'(?:[^'\\\n]|\\(?s:.))*'?"
+_CODE_TOKENS = {
+    "typescript": rf"//[^\n]*|/\*|{_DQ_STRING}|{_SQ_STRING}|`|/",
+    "go": rf"//[^\n]*|/\*|{_DQ_STRING}|{_SQ_STRING}|`[^`]*`?",
+    # Rust strings may span lines; `'` not closed one char later is a lifetime
+    "rust": r"//[^\n]*|/\*|\"(?:[^\"\\]|\\(?s:.))*\"?|'(?:[^\\'\n]'|\\.[^'\n]*')?|r#*\"|br#*\"",
+    "swift": r'//[^\n]*|/\*|"|#(?:#*)"',
+}
+# Inside `${...}` / `\(...)` the scanner also has to balance the closer
+_NESTED_CLOSERS = {"typescript": r"|\{|\}", "swift": r"|\(|\)"}
+_NESTED_BLOCKS = frozenset({"rust", "swift"})
+_BLOCK_DELIMS = re.compile(r"/\*|\*/")
+_TEMPLATE_TOKENS = re.compile(r"\\|`|\$\{")
+
+# A `/` after one of these (or a keyword below) starts a regex literal, not a division
+_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = frozenset({
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+})
+
+
+class _CScanner:
+    """Single forward scan over C-family source that records comment spans.
+
+    String, char, raw-string, template-literal and block-comment state is
+    carried across the whole file, so a `//` inside a literal (or a quote
+    inside a comment) never confuses what follows.
+    """
+
+    def __init__(self, source: str, dialect: str, stop: int | None = None) -> None:
+        self.src = source
+        self.n = len(source)
+        self.stop = self.n if stop is None else stop  # no comment starting past here is needed
+        self.dialect = dialect
+        self.tokens = re.compile(_CODE_TOKENS[dialect])
+        self.nested_tokens = re.compile(_CODE_TOKENS[dialect] + _NESTED_CLOSERS.get(dialect, ""))
+        self.comments: list[tuple[int, int, bool]] = []  # (start, end, is_block)
+        self._swift_strings: dict[tuple[str, bool], re.Pattern[str]] = {}
+
+    def scan(self) -> list[tuple[int, int, bool]]:
+        self._code(0, None)
+        return self.comments
+
+    def _code(self, i: int, closer: str | None) -> int:
+        """Scan code from i; return the offset just past `closer` (or EOF)."""
+        src, dialect = self.src, self.dialect
+        tokens = self.nested_tokens if closer else self.tokens
+        opener = {"}": "{", ")": "("}.get(closer or "")
+        depth = 0
+        while True:
+            m = tokens.search(src, i)
+            if m is None or m.start() > self.stop:
+                return self.n
+            tok = m.group()
+            i = m.end()
+            first = tok[0]
+            if first == "/":
+                if tok == "/*":
+                    i = self._block_end(m.start())
+                    self.comments.append((m.start(), i, True))
+                elif tok != "/":
+                    self.comments.append((m.start(), i - 1 if tok.endswith("\r") else i, False))
+                elif dialect == "typescript" and self._regex_allowed(m.start()):
+                    i = self._regex(i)
+            elif tok == closer:
+                if depth == 0:
+                    return i
+                depth -= 1
+            elif tok == opener:
+                depth += 1
+            elif first == "`" and dialect == "typescript":
+                i = self._template(i)
+            elif dialect == "swift":
+                i = self._swift_string(i, tok[:-1])
+            elif dialect == "rust" and first in "br":
+                end = src.find('"' + "#" * tok.count("#"), i)
+                i = self.n if end < 0 else end + 1 + tok.count("#")
+
+    def _template(self, i: int) -> int:
+        """Skip a template literal, scanning `${...}` substitutions as code."""
+        while True:
+            m = _TEMPLATE_TOKENS.search(self.src, i)
+            if m is None:
+                return self.n
+            tok = m.group()
+            if tok == "\\":
+                i = m.end() + 1
+            elif tok == "`":
+                return m.end()
+            else:
+                i = self._code(m.end(), "}")
+
+    def _swift_string(self, i: int, hashes: str) -> int:
+        """Skip a Swift string ("...", \"\"\"...\"\"\", #"..."#), scanning \\(...) as code."""
+        multiline = self.src.startswith('""', i)
+        if multiline:
+            i += 2
+        pattern = self._swift_strings.get((hashes, multiline))
+        if pattern is None:
+            terminator = ('"""' if multiline else '"') + hashes
+            escape = re.escape("\\" + hashes)
+            pattern = re.compile(re.escape(terminator) + "|" + escape + r"\(|" + escape + ("" if multiline else r"|\n"))
+            self._swift_strings[(hashes, multiline)] = pattern
+        while True:
+            m = pattern.search(self.src, i)
+            if m is None:
+                return self.n
+            tok = m.group()
+            if tok.endswith("("):
+                i = self._code(m.end(), ")")
+            elif tok.startswith("\\"):
+                i = m.end() + 1
+            elif tok == "\n":
+                return m.start()  # unterminated: resume code on the next line
+            else:
+                return m.end()
+
+    def _block_end(self, j: int) -> int:
+        """Offset just past the block comment opening at j (nesting in Rust/Swift)."""
+        if self.dialect not in _NESTED_BLOCKS:
+            end = self.src.find("*/", j + 2)
+            return self.n if end < 0 else end + 2
+        depth = 1
+        for m in _BLOCK_DELIMS.finditer(self.src, j + 2):
+            depth += 1 if m.group() == "/*" else -1
+            if depth == 0:
+                return m.end()
+        return self.n
+
+    def _regex_allowed(self, j: int) -> bool:
+        """Whether a `/` at j begins a regex literal rather than a division."""
+        k = j - 1
+        while k >= 0 and self.src[k] in " \t\r\n":
+            k -= 1
+        if k < 0 or self.src[k] in _REGEX_PRECEDERS:
+            return True
+        end = k + 1
+        while k >= 0 and (self.src[k].isalnum() or self.src[k] in "_$"):
+            k -= 1
+        return self.src[k + 1:end] in _REGEX_KEYWORDS
+
+    def _regex(self, i: int) -> int:
+        """Skip a regex literal body and flags; a line break means it was a division."""
+        src, in_class, start = self.src, False, i
+        while i < self.n:
+            c = src[i]
+            if c == "\\":
+                i += 2
+                continue
+            if c == "\n":
+                return start
+            if c == "[":
+                in_class = True
+            elif c == "]":
+                in_class = False
+            elif c == "/" and not in_class:
+                i += 1
+                while i < self.n and src[i].isalpha():
+                    i += 1
+                return i
+            i += 1
+        return start
+
+
+def _strip_c_style(
+    source: str,
+    dialect: str,
+    preserve_godoc: bool = False,
+    lines: list[tuple[int, int]] | None = None,
+) -> dict[str, Any]:
+    """Strip C-style comments (//, /* */) with language-specific preservation."""
+    spans = _line_spans(source, lines) if lines else None
+    # Comments starting before this offset are in the first 10 lines
+    header_end = 0
+    for _ in range(10):
+        nl = source.find("\n", header_end)
+        if nl < 0:
+            header_end = len(source)
+            break
+        header_end = nl + 1
+
+    comments = _CScanner(source, dialect, spans[-1][1] if spans else None).scan()
+    if spans:
+        comments = [c for c in comments if any(lo <= c[0] < hi for lo, hi in spans)]
+    removed = [
+        (start, end) for start, end, is_block in comments
+        if not _keep_c_comment(source, start, end, is_block, start < header_end, preserve_godoc)
+    ]
+    if not removed:
+        return {"stripped": 0, "modified": False, "content": source}
+
+    out: list[str] = []
+    pos = 0
+    idx = 0
+    while idx < len(removed):
+        # Comments sharing a line are rewritten together
+        region_start = source.rfind("\n", 0, removed[idx][0]) + 1
+        group = [removed[idx]]
+        region_end = _line_end(source, removed[idx][1])
+        while idx + 1 < len(removed) and removed[idx + 1][0] < region_end:
+            idx += 1
+            group.append(removed[idx])
+            region_end = _line_end(source, removed[idx][1])
+        idx += 1
+
+        text = source[region_start:group[0][0]]
+        for (_, end), (next_start, _) in zip(group, group[1:] + [(region_end, region_end)]):
+            text = _join_code(text, source[end:next_start])
+        out.append(source[pos:region_start])
+        if text:
+            out.append(text + ("\r" if source[region_end - 1:region_end] == "\r" else ""))
+            pos = region_end
+        else:
+            # Nothing but the comment on these lines: drop them entirely
+            pos = min(region_end + 1, len(source))
+    out.append(source[pos:])
 
-def _block_precedes_decl(lines: list[str], start: int) -> bool:
-    """Check if a block comment starting at `start` immediately precedes a Go declaration."""
-    # Find the end of the block comment
-    for j in range(start, len(lines)):
-        if "*/" in lines[j]:
-            # Check the first non-empty line after the block
-            for k in range(j + 1, len(lines)):
-                next_line = lines[k].lstrip()
-                if next_line:
-                    return next_line.startswith(_GO_DECL_KEYWORDS)
-            return False
+    return {
+        "stripped": len(removed),
+        "modified": True,
+        "content": "".join(out),
+    }
+
+
+def _keep_c_comment(
+    source: str,
+    start: int,
+    end: int,
+    is_block: bool,
+    in_header: bool,
+    preserve_godoc: bool,
+) -> bool:
+    """Apply the preservation rules to one comment span."""
+    text = source[start:end]
+    line_start = source.rfind("\n", 0, start) + 1
+    if is_block:
+        # Doc comments, license headers and markers on the opening line
+        if text.startswith(("/**", "/*!")):
+            return True
+        first_line = source[line_start:_line_end(source, start)]
+        if LICENSE_MARKERS.search(first_line) or PRESERVED_MARKERS.search(first_line):
+            return True
+        return preserve_godoc and _precedes_decl(source, end)
+
+    if source[line_start:start].strip():
+        # Inline comment after code
+        return bool(PRESERVED_MARKERS.search(text) or _INLINE_DIRECTIVES.search(text))
+
+    if text.startswith(("///", "//!")):
+        return True
+    if _LINE_DIRECTIVES.search(text):
+        return True
+    if PRESERVED_MARKERS.search(text):
+        return True
+    if in_header and LICENSE_MARKERS.search(text):
+        return True
+    # Godoc: comment directly above a declaration
+    if preserve_godoc:
+        nl = source.find("\n", end)
+        if nl >= 0:
+            return source[nl + 1:_line_end(source, nl + 1)].lstrip().startswith(_GO_DECL_KEYWORDS)
     return False
 
 
-def _in_string(line: str, pos: int) -> bool:
-    """Check if position in line is inside a string literal (simple heuristic)."""
-    in_single = False
-    in_double = False
-    in_backtick = False
-    escaped = False
+def _line_spans(source: str, lines: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Character offsets [start, end) covered by sorted 1-indexed inclusive line ranges."""
+    spans = []
+    line_no, offset = 1, 0
+    for first, last in lines:
+        while line_no < first and offset < len(source):
+            offset = _line_end(source, offset) + 1
+            line_no += 1
+        start = offset
+        while line_no <= last and offset < len(source):
+            offset = _line_end(source, offset) + 1
+            line_no += 1
+        spans.append((start, min(offset, len(source))))
+    return spans
+
+
+def _line_end(source: str, pos: int) -> int:
+    """Offset of the newline ending the line that contains pos (or EOF)."""
+    nl = source.find("\n", pos)
+    return len(source) if nl < 0 else nl
+
+
+def _precedes_decl(source: str, end: int) -> bool:
+    """Check if the first non-blank line after a block comment is a Go declaration."""
+    nl = source.find("\n", end)
+    while nl >= 0:
+        line_end = _line_end(source, nl + 1)
+        next_line = source[nl + 1:line_end].lstrip()
+        if next_line:
+            return next_line.startswith(_GO_DECL_KEYWORDS)
+        nl = source.find("\n", line_end) if line_end < len(source) else -1
+    return False
 
-    for i, ch in enumerate(line):
-        if i >= pos:
-            break
-        if escaped:
-            escaped = False
-            continue
-        if ch == "\\":
-            escaped = True
-            continue
-        if ch == "'" and not in_double and not in_backtick:
-            in_single = not in_single
-        elif ch == '"' and not in_single and not in_backtick:
-            in_double = not in_double
-        elif ch == "`" and not in_single and not in_double:
-            in_backtick = not in_backtick
-
-    return in_single or in_double or in_backtick
+
+def _join_code(before: str, after: str) -> str:
+    """Rejoin the code left either side of a removed comment."""
+    if not after.strip():
+        return before.rstrip()
+    if not before.strip():
+        return before + after.lstrip()
+    return before.rstrip() + " " + after.lstrip()
@@ -2,6 +2,30 @@
 
 Reads and writes ~/.next-level/config.json.
 
+Reads are cached in-process, keyed on the file's (st_mtime_ns, st_size), so
+an accessor costs one stat and a dict lookup instead of an open and a JSON
+parse. snapshot() returns a typed, immutable view of the config so a caller
+can take several values from one consistent read.
+
+Writes go to a temp file that replaces config.json atomically, so readers
+(hooks, diagnostic-report) never see a truncated file. update(fn) is a
+read-modify-write transaction under an exclusive advisory lock, so parallel
+sessions merge their changes instead of overwriting each other's.
+
+Every write also refreshes config.json.env, a flattened key=value snapshot
+that hooks/scripts/config.sh sources once instead of spawning jq per lookup.
+
+Layering: accessors resolve, in order of precedence,
+- environment overrides: NEXT_LEVEL_TRUST_LEVEL, NEXT_LEVEL_CHECKPOINT_DEPTH,
+  NEXT_LEVEL_EDIT_DEBOUNCE_MS, NEXT_LEVEL_DIFF_SCOPE_MARGIN and
+  NEXT_LEVEL_FEATURE_<NAME>=1|0, read once per process
+- the nearest .next-level.json above the project (the cwd unless given);
+  objects such as features_enabled and linters merge key by key
+- the global config.json
+The merged view is memoized per project and rebuilt only when a layer's
+mtime or size (or the environment) changes. read(), write() and update()
+work on the global file alone; config.sh only sees the global file.
+
 Schema:
 {
   "setup_complete": bool,
@@ -12,6 +36,12 @@ Schema:
     "file_checker": true,
     "comment_stripping": true,
     "tdd_enforcement": true,
+    "checker_daemon": true,
+    "edit_coalescing": false,
+    "diff_scoped_checks": false,
+    "timing_log": false,
+    "lsp_diagnostics": false,
+    "node_workers": false,
     ...
   },
   "plugins_available": {
@@ -26,16 +56,30 @@ Schema:
   },
   "trust_level": "balanced",       // "cautious" | "balanced" | "autonomous"
   "checkpoint_depth": "medium",    // "full" | "medium" | "light"
+  "edit_debounce_ms": 2000,        // quiet period before coalesced edits are checked
+  "diff_scope_margin": 5,          // context lines kept around an edit by diff_scoped_checks
 }
 """
 
 import copy
+import fcntl
 import json
 import os
+import re
+import shlex
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
+import root_index
+
 CONFIG_PATH = Path(os.environ.get("NEXT_LEVEL_CONFIG", Path.home() / ".next-level" / "config.json"))
 
 DEFAULT_CONFIG: dict[str, Any] = {
@@ -47,6 +91,12 @@ DEFAULT_CONFIG: dict[str, Any] = {
         "file_checker": True,
         "comment_stripping": True,
         "tdd_enforcement": True,
+        "checker_daemon": True,
+        "edit_coalescing": False,
+        "diff_scoped_checks": False,
+        "timing_log": False,
+        "lsp_diagnostics": False,
+        "node_workers": False,
     },
     "plugins_available": {
         "omega_memory": False,
@@ -55,7 +105,31 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "linters": {},
     "trust_level": "balanced",
     "checkpoint_depth": "medium",
+    "edit_debounce_ms": 2000,
+    "diff_scope_margin": 5,
+}
+
+PROJECT_CONFIG_NAME = ".next-level.json"
+
+# Top-level settings overridable from the environment, and how to parse them
+_ENV_SETTINGS: dict[str, Callable[[str], Any]] = {
+    "trust_level": str,
+    "checkpoint_depth": str,
+    "edit_debounce_ms": int,
+    "diff_scope_margin": int,
 }
+_ENV_TRUE = ("1", "true", "yes", "on")
+_ENV_FALSE = ("0", "false", "no", "off")
+MAX_PROJECTS = 64
+# (variable, key, parser) for every override; "section.name" keys set one entry of an object
+_ENV_NAMES: tuple[tuple[str, str, Callable[[str], Any]], ...] = tuple(
+    [(f"NEXT_LEVEL_{key.upper()}", key, parse) for key, parse in _ENV_SETTINGS.items()]
+    + [(f"NEXT_LEVEL_FEATURE_{name.upper()}", f"features_enabled.{name}", bool)
+       for name in DEFAULT_CONFIG["features_enabled"]]
+)
+
+# Keys that can be shell variable names make it into the shell snapshot
+_SHELL_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
 
 TRUST_LEVELS = ("cautious", "balanced", "autonomous")
 CHECKPOINT_DEPTHS = ("full", "medium", "light")
@@ -66,68 +140,385 @@ def config_path() -> Path:
     return CONFIG_PATH
 
 
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One consistent, read-only view of the config file."""
+
+    data: Mapping[str, Any]
+    setup_complete: bool
+    project_root: str
+    languages: tuple[str, ...]
+    trust_level: str
+    checkpoint_depth: str
+    edit_debounce_ms: int
+    diff_scope_margin: int
+
+    @classmethod
+    def from_dict(cls, config: dict[str, Any]) -> "ConfigSnapshot":
+        """Build a snapshot from a parsed config, applying the accessor defaults.
+
+        Hand-edited values of the wrong type fall back to DEFAULT_CONFIG
+        instead of failing every accessor (and with them the hooks).
+        """
+        languages = config.get("languages_detected")
+        return cls(
+            data=MappingProxyType(config),
+            setup_complete=_typed(config, "setup_complete", bool),
+            project_root=_typed(config, "project_root", str),
+            languages=tuple(lang for lang in languages if isinstance(lang, str))
+            if isinstance(languages, list) else (),
+            trust_level=_typed(config, "trust_level", str),
+            checkpoint_depth=_typed(config, "checkpoint_depth", str),
+            edit_debounce_ms=_integer(config, "edit_debounce_ms"),
+            diff_scope_margin=_integer(config, "diff_scope_margin"),
+        )
+
+    def _section(self, name: str) -> Mapping[str, Any]:
+        section = self.data.get(name)
+        return section if isinstance(section, dict) else {}
+
+    def feature_enabled(self, name: str) -> bool:
+        """Check if a feature is enabled by name, falling back to the default setting."""
+        default = DEFAULT_CONFIG["features_enabled"].get(name, False)
+        value = self._section("features_enabled").get(name, default)
+        return value if isinstance(value, bool) else default
+
+    def plugin_available(self, name: str) -> bool:
+        """Check if a Claude Code plugin is available by name."""
+        return self._section("plugins_available").get(name, False) is True
+
+    def linters_for(self, language: str) -> dict[str, str]:
+        """Get linter/formatter configuration for a specific language."""
+        linters = self._section("linters").get(language, {})
+        return dict(linters) if isinstance(linters, dict) else {}
+
+
+def _typed(config: Mapping[str, Any], key: str, kind: type) -> Any:
+    """A top-level value if it has the default's type, else the default."""
+    value = config.get(key)
+    return value if isinstance(value, kind) else DEFAULT_CONFIG[key]
+
+
+def _integer(config: Mapping[str, Any], key: str) -> int:
+    """A top-level integer setting (numeric strings accepted), else the default."""
+    value = config.get(key)
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            return int(value)
+        except (ValueError, OverflowError):
+            pass
+    return DEFAULT_CONFIG[key]
+
+
+# (path, st_mtime_ns, st_size) of the cached file version, and its snapshot
+_cache: dict[str, Any] = {"key": None, "snapshot": None}
+# project dir -> (global snapshot, dir stat key, layer path, layer stat key,
+#                raw override values, when the layer was located, merged snapshot),
+# least recently used first
+_merged: "OrderedDict[str, tuple[Any, ...]]" = OrderedDict()
+
+
+def shell_snapshot_path() -> Path:
+    """Get the path to the shell-sourceable config snapshot (next to config.json)."""
+    path = config_path()
+    return path.with_name(f"{path.name}.env")
+
+
 def exists() -> bool:
     """Check if the config file exists."""
     return config_path().is_file()
 
 
-def read() -> dict[str, Any]:
-    """Read and return the config, falling back to defaults on error."""
-    if not exists():
-        return copy.deepcopy(DEFAULT_CONFIG)
+def _load(path: Path) -> dict[str, Any]:
+    """Parse the config file, falling back to defaults on error."""
     try:
-        with open(config_path(), encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
     except (json.JSONDecodeError, OSError):
         return copy.deepcopy(DEFAULT_CONFIG)
+    return config if isinstance(config, dict) else copy.deepcopy(DEFAULT_CONFIG)
 
 
-def write(config: dict[str, Any]) -> None:
-    """Write config to disk with a timestamp update."""
+def _stat_key(path: str | Path) -> tuple[str, int | None, int | None]:
+    try:
+        st = os.stat(path)
+        return str(path), st.st_mtime_ns, st.st_size
+    except OSError:
+        return str(path), None, None
+
+
+def _global_snapshot() -> ConfigSnapshot:
+    """The global config file, re-parsed only when its mtime or size changed."""
+    path = config_path()
+    key = _stat_key(path)
+    if _cache["key"] != key or _cache["snapshot"] is None:
+        config = _load(path) if key[1] is not None else copy.deepcopy(DEFAULT_CONFIG)
+        _cache.update(key=key, snapshot=ConfigSnapshot.from_dict(config))
+    return _cache["snapshot"]
+
+
+def _project_layer(project: str) -> str | None:
+    """Path of the nearest .next-level.json at or above the project, if any."""
+    root = root_index.find_root(os.path.join(project, PROJECT_CONFIG_NAME), PROJECT_CONFIG_NAME)
+    return os.path.join(root, PROJECT_CONFIG_NAME) if root else None
+
+
+def _raw_env() -> tuple[str | None, ...]:
+    """The override variables, read once per process (hooks and the daemon never change them)."""
+    if _cache.get("env") is None:
+        _cache["env"] = tuple(os.environ.get(name) for name, _, _ in _ENV_NAMES)
+    return _cache["env"]
+
+
+def _env_overrides(raw: tuple[str | None, ...]) -> list[tuple[str, Any]]:
+    """Parse the _ENV_NAMES values into (key, value) pairs; unparseable values are ignored."""
+    overrides = []
+    for (_, key, parse), value in zip(_ENV_NAMES, raw):
+        if not value:
+            continue
+        if parse is bool:
+            value = value.lower()
+            if value in _ENV_TRUE or value in _ENV_FALSE:
+                overrides.append((key, value in _ENV_TRUE))
+            continue
+        try:
+            overrides.append((key, parse(value)))
+        except ValueError:
+            pass
+    return overrides
+
+
+def _merge(base: dict[str, Any], layer: dict[str, Any]) -> dict[str, Any]:
+    """Overlay one config layer on another, merging nested objects key by key."""
+    merged = dict(base)
+    for key, value in layer.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def snapshot(project: str | Path | None = None) -> ConfigSnapshot:
+    """The layered config for a project (default: the cwd), memoized per project.
+
+    When nothing changed this costs three stats: the global file, the
+    project dir and the project layer. A .next-level.json created above the
+    project dir is found once the lookup is ROOT_TTL old.
+    """
+    project = os.fspath(project) if project else os.getcwd()
+    base = _global_snapshot()
+    raw_env = _raw_env()
+    dir_key = _stat_key(project)
+    now = time.monotonic()
+    cached = _merged.get(project)
+    if cached:
+        cached_base, cached_dir, layer, layer_key, cached_env, located_at, merged = cached
+        if cached_base is base and cached_env == raw_env and cached_dir == dir_key \
+                and now - located_at < root_index.ROOT_TTL \
+                and (layer is None or _stat_key(layer) == layer_key):
+            _merged.move_to_end(project)
+            return merged
+        if cached_dir != dir_key or now - located_at >= root_index.ROOT_TTL:
+            layer, located_at = _project_layer(project), now
+    else:
+        layer, located_at = _project_layer(project), now
+
+    config = _copy(base.data)
+    layer_key = _stat_key(layer) if layer else None
+    if layer:
+        try:
+            with open(layer, encoding="utf-8") as f:
+                project_config = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            project_config = None
+        if isinstance(project_config, dict):
+            config = _merge(config, project_config)
+    for key, value in _env_overrides(raw_env):
+        section, _, name = key.partition(".")
+        if name:
+            current = config.get(section)
+            config[section] = {**(current if isinstance(current, dict) else {}), name: value}
+        else:
+            config[key] = value
+
+    merged = ConfigSnapshot.from_dict(config)
+    _merged[project] = (base, dir_key, layer, layer_key, raw_env, located_at, merged)
+    _merged.move_to_end(project)
+    if len(_merged) > MAX_PROJECTS:
+        _merged.popitem(last=False)
+    return merged
+
+
+def _copy(value: Any) -> Any:
+    """Deep-copy parsed JSON; much cheaper than copy.deepcopy for plain dicts and lists."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+def read() -> dict[str, Any]:
+    """Read and return the config, falling back to defaults on error.
+
+    Returns a private copy of the global file (no project or environment
+    layers) that the caller may modify and pass to write().
+    """
+    return _copy(_global_snapshot().data)
+
+
+def _jq_raw(value: Any) -> str:
+    """Render a value the way `jq -r '.field // empty'` prints it."""
+    if value is None or value is False:
+        return ""
+    if value is True:
+        return "true"
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return json.dumps(value)
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+
+def shell_snapshot(config: dict[str, Any]) -> str:
+    """Flatten a config into shell assignments for config.sh.
+
+    NL_CFG_<key>        top-level value, as config_get prints it
+    NL_FEATURE_<name>   "true" or "false", as config_feature_enabled tests it
+    NL_PLUGIN_<name>    "true" or "false", as config_plugin_available tests it
+    NL_LANGUAGES        languages_detected, one per line
+    """
+    lines = ["# Generated by lib/config.py on every config write; sourced by hooks/scripts/config.sh",
+             "NL_CONFIG_SNAPSHOT=1"]
+    for key, value in config.items():
+        if _SHELL_NAME.fullmatch(key):
+            lines.append(f"NL_CFG_{key}={shlex.quote(_jq_raw(value))}")
+    for section, prefix in (("features_enabled", "NL_FEATURE_"), ("plugins_available", "NL_PLUGIN_")):
+        values = config.get(section)
+        for name, value in (values.items() if isinstance(values, dict) else ()):
+            if _SHELL_NAME.fullmatch(name):
+                lines.append(f"{prefix}{name}={'true' if value is True else 'false'}")
+    languages = config.get("languages_detected")
+    languages = [lang for lang in languages if isinstance(lang, str)] if isinstance(languages, list) else []
+    lines.append(f"NL_LANGUAGES={shlex.quote(chr(10).join(languages))}")
+    return "\n".join(lines) + "\n"
+
+
+def _replace_file(path: Path, text: str) -> None:
+    """Atomically replace a file with owner-only permissions (temp file + fsync + rename)."""
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.stem}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_unlocked(config: dict[str, Any]) -> None:
+    """Stamp and atomically replace the config file, then its shell snapshot."""
     config["last_updated"] = datetime.now(timezone.utc).isoformat()
     path = config_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2)
-        f.write("\n")
+    try:
+        _replace_file(path, json.dumps(config, indent=2) + "\n")
+        # Written after config.json, so config.sh sees it as at least as new
+        _replace_file(shell_snapshot_path(), shell_snapshot(config))
+    finally:
+        _cache.update(key=None, snapshot=None)
+
+
+@contextmanager
+def _locked() -> Iterator[None]:
+    """Hold the exclusive advisory lock on config.json.lock."""
+    path = config_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f"{path.name}.lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
 
 
-def setup_complete() -> bool:
+def write(config: dict[str, Any]) -> None:
+    """Write config to disk with a timestamp update."""
+    with _locked():
+        _write_unlocked(config)
+
+
+def update(fn: Callable[[dict[str, Any]], dict[str, Any] | None]) -> dict[str, Any]:
+    """Apply `fn` to the current config and write the result, as one transaction.
+
+    `fn` receives a fresh copy of the on-disk config (defaults if there is
+    none) and either modifies it in place or returns a replacement. Other
+    update() and write() calls wait on the lock, so no change is lost.
+    Returns the config as written.
+    """
+    with _locked():
+        path = config_path()
+        config = _load(path) if path.is_file() else copy.deepcopy(DEFAULT_CONFIG)
+        result = fn(config)
+        if result is not None:
+            config = result
+        _write_unlocked(config)
+        return config
+
+
+def setup_complete(project: str | Path | None = None) -> bool:
     """Check if initial setup has been completed."""
-    return read().get("setup_complete", False)
+    return snapshot(project).setup_complete
 
 
-def languages() -> list[str]:
+def languages(project: str | Path | None = None) -> list[str]:
     """Get the list of detected languages for the project."""
-    return read().get("languages_detected", [])
+    return list(snapshot(project).languages)
 
 
-def feature_enabled(name: str) -> bool:
-    """Check if a feature is enabled by name."""
-    return read().get("features_enabled", {}).get(name, False)
+def feature_enabled(name: str, project: str | Path | None = None) -> bool:
+    """Check if a feature is enabled by name, falling back to the default setting."""
+    return snapshot(project).feature_enabled(name)
 
 
-def plugin_available(name: str) -> bool:
+def plugin_available(name: str, project: str | Path | None = None) -> bool:
     """Check if a Claude Code plugin is available by name."""
-    return read().get("plugins_available", {}).get(name, False)
+    return snapshot(project).plugin_available(name)
 
 
-def linters_for(language: str) -> dict[str, str]:
+def linters_for(language: str, project: str | Path | None = None) -> dict[str, str]:
     """Get linter/formatter configuration for a specific language."""
-    return read().get("linters", {}).get(language, {})
+    return snapshot(project).linters_for(language)
 
 
-def trust_level() -> str:
+def trust_level(project: str | Path | None = None) -> str:
     """Get the current trust level (cautious, balanced, or autonomous)."""
-    return read().get("trust_level", "balanced")
+    return snapshot(project).trust_level
 
 
-def checkpoint_depth() -> str:
+def checkpoint_depth(project: str | Path | None = None) -> str:
     """Get the checkpoint depth setting (full, medium, or light)."""
-    return read().get("checkpoint_depth", "medium")
+    return snapshot(project).checkpoint_depth
+
+
+def edit_debounce_ms(project: str | Path | None = None) -> int:
+    """Get how long a file must be quiet before coalesced edits are checked."""
+    return snapshot(project).edit_debounce_ms
+
+
+def diff_scope_margin(project: str | Path | None = None) -> int:
+    """Get how many lines around an edit keep their findings under diff_scoped_checks."""
+    return snapshot(project).diff_scope_margin
 
 
-def checkpoint_depth_for_task(task_index: int, total_tasks: int) -> str:
+def checkpoint_depth_for_task(task_index: int, total_tasks: int, project: str | Path | None = None) -> str:
     """Determine checkpoint depth based on task position and trust level.
 
     Trust auto-escalates within an epic as tasks succeed:
@@ -140,7 +531,7 @@ def checkpoint_depth_for_task(task_index: int, total_tasks: int) -> str:
     - balanced: auto-escalate as described
     - autonomous: always light (unless FLAG_FOR_HUMAN)
     """
-    level = trust_level()
+    level = trust_level(project)
     if level == "cautious":
         return "full"
     if level == "autonomous":
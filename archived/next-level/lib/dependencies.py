@@ -4,13 +4,14 @@ Detects project languages, checks for linter/formatter/LSP binaries,
 and scans for required plugins.
 """
 
-import os
-import shutil
-import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
-from checkers import EXTENSION_LANGUAGE as EXTENSION_MAP
+import plugin_index
+import tool_registry
+from language_scan import LanguageScan, scan_languages
 
 # Language detection: config file -> language
 LANGUAGE_INDICATORS: dict[str, str] = {
@@ -108,7 +109,11 @@ LANGUAGE_TOOLS: dict[str, dict[str, dict[str, str]]] = {
     },
 }
 
-# Plugin detection: name -> directory marker file
+# Concurrent `--version` probes, and the budget for all of them together
+PROBE_WORKERS = 8
+PROBE_DEADLINE = 10.0
+
+# Plugin detection: name -> substring of a plugin manifest name or directory name
 PLUGIN_MARKERS: dict[str, str] = {
     "omega_memory": "omega-memory",
     "coderabbit": "coderabbit",
@@ -116,37 +121,22 @@ PLUGIN_MARKERS: dict[str, str] = {
 
 
 def detect_languages(project_root: str | Path) -> list[str]:
-    """Detect programming languages used in a project."""
-    root = Path(project_root)
-    found: set[str] = set()
-
-    # Check config files first (most reliable)
-    for config_file, lang in LANGUAGE_INDICATORS.items():
-        if (root / config_file).exists():
-            found.add(lang)
-
-    # Fallback: scan top-level and src/ for file extensions
-    scan_dirs = [root]
-    src_dir = root / "src"
-    if src_dir.is_dir():
-        scan_dirs.append(src_dir)
-
-    for scan_dir in scan_dirs:
-        try:
-            for entry in scan_dir.iterdir():
-                if entry.is_file():
-                    ext = entry.suffix
-                    if ext in EXTENSION_MAP:
-                        found.add(EXTENSION_MAP[ext])
-        except PermissionError:
-            continue
-
-    return sorted(found)
+    """Detect programming languages used in a project.
+
+    Scans the whole tree (see language_scan), stopping as soon as every
+    known language has been seen.
+    """
+    return scan_project(project_root, stop_early=True).languages()
+
+
+def scan_project(project_root: str | Path, stop_early: bool = False) -> LanguageScan:
+    """Per-language file counts and root-marker directories for a project."""
+    return scan_languages(project_root, LANGUAGE_INDICATORS, stop_early=stop_early)
 
 
 def check_binary(name: str) -> bool:
-    """Check if a binary is available on PATH."""
-    return shutil.which(name) is not None
+    """Check if a binary is available on PATH (memoized in the tool registry)."""
+    return tool_registry.which(name) is not None
 
 
 # Allowlist of binaries we will execute for version checks
@@ -157,29 +147,46 @@ _KNOWN_BINARIES: frozenset[str] = frozenset(
 )
 
 
-def check_binary_version(name: str) -> str | None:
+def check_binary_version(name: str, timeout: float = 5) -> str | None:
     """Get version string of a binary, or None if not available.
 
     Only executes binaries in the known allowlist (from LANGUAGE_TOOLS).
+    Versions are memoized in the tool registry until the binary changes.
     """
     if name not in _KNOWN_BINARIES:
         return None
-    if not check_binary(name):
-        return None
-    try:
-        result = subprocess.run(
-            [name, "--version"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode != 0:
-            return "installed"
-        output = result.stdout.strip() or result.stderr.strip()
-        # Return first line only
-        return output.split("\n")[0] if output else "installed"
-    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-        return "installed"
+    return tool_registry.version(name, timeout)
+
+
+def _probe_tools(languages: list[str], deadline: float) -> tuple[
+        dict[str, dict[str, dict[str, Any]]], dict[str, dict[str, float]]]:
+    """Probe every tool of the given languages concurrently, within one deadline.
+
+    Returns ({language: {tool_name: status}}, {language: {tool_name: ms}}).
+    A probe still running at the deadline reports its version as "installed".
+    """
+    def probe(binary: str) -> tuple[bool, str | None, float]:
+        start = time.perf_counter()
+        available = check_binary(binary)
+        version = None
+        if available:
+            version = check_binary_version(binary, timeout=max(0.1, deadline - time.monotonic()))
+        return available, version, (time.perf_counter() - start) * 1000
+
+    jobs = [(lang, tool_name, tool_info) for lang in languages
+            for tool_name, tool_info in LANGUAGE_TOOLS.get(lang, {}).items()]
+    status: dict[str, dict[str, dict[str, Any]]] = {lang: {} for lang in languages}
+    timings: dict[str, dict[str, float]] = {lang: {} for lang in languages}
+    if not jobs:
+        return status, timings
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), PROBE_WORKERS)) as pool:
+        futures = [pool.submit(probe, tool_info["binary"]) for _, _, tool_info in jobs]
+        for (lang, tool_name, tool_info), future in zip(jobs, futures):
+            available, version, elapsed_ms = future.result()
+            status[lang][tool_name] = {**tool_info, "available": available, "version": version}
+            timings[lang][tool_name] = round(elapsed_ms, 1)
+    return status, timings
 
 
 def check_language_tools(language: str) -> dict[str, dict[str, Any]]:
@@ -187,76 +194,38 @@ def check_language_tools(language: str) -> dict[str, dict[str, Any]]:
 
     Returns dict of {tool_name: {available: bool, version: str|None, ...tool_info}}.
     """
-    tools = LANGUAGE_TOOLS.get(language, {})
-    results: dict[str, dict[str, Any]] = {}
-
-    for tool_name, tool_info in tools.items():
-        binary = tool_info["binary"]
-        available = check_binary(binary)
-        results[tool_name] = {
-            **tool_info,
-            "available": available,
-            "version": check_binary_version(binary) if available else None,
-        }
-
-    return results
+    status, _ = _probe_tools([language], time.monotonic() + PROBE_DEADLINE)
+    return status[language]
 
 
 def detect_plugins() -> dict[str, bool]:
-    """Scan for installed Claude Code plugins."""
-    results: dict[str, bool] = {}
-
-    # Check common plugin locations
-    plugin_dirs = [
-        Path.home() / ".claude" / "plugins",
-        Path.home() / ".claude" / "plugins" / "marketplaces",
-    ]
-
-    for plugin_name, marker in PLUGIN_MARKERS.items():
-        found = False
-        for plugin_dir in plugin_dirs:
-            if not plugin_dir.is_dir():
-                continue
-            # Recursively search for plugin directory or plugin.json mentioning it
-            for entry in plugin_dir.rglob("plugin.json"):
-                try:
-                    import json
-                    with open(entry, encoding="utf-8") as f:
-                        manifest = json.load(f)
-                    if marker in manifest.get("name", ""):
-                        found = True
-                        break
-                except (json.JSONDecodeError, OSError):
-                    continue
-            if found:
-                break
-            # Also check directory names
-            try:
-                for entry in plugin_dir.iterdir():
-                    if entry.is_dir() and marker in entry.name:
-                        found = True
-                        break
-            except PermissionError:
-                continue
-            if found:
-                break
-
-        results[plugin_name] = found
-
-    return results
+    """Scan for installed Claude Code plugins.
+
+    Every marker is answered from one plugin index (see plugin_index), which
+    matches manifest names anywhere under ~/.claude/plugins and the directory
+    names directly under plugins/ and plugins/marketplaces/.
+    """
+    index = plugin_index.load_index()
+    return {plugin_name: index.has(marker) for plugin_name, marker in PLUGIN_MARKERS.items()}
 
 
 def full_dependency_check(project_root: str | Path) -> dict[str, Any]:
     """Run complete dependency check for a project.
 
     Returns a structured report of all detected languages, tools, and plugins.
+    "language_files" counts source files per language and "project_roots"
+    lists, per language, the directories holding its root markers.
+    Tool probes run concurrently under one PROBE_DEADLINE; "timings" breaks
+    the wall time down per tool (ms) so slow toolchains are visible.
     """
-    languages = detect_languages(project_root)
-    plugins = detect_plugins()
+    start = time.perf_counter()
+    scan = scan_project(project_root)
+    languages = scan.languages()
 
-    tool_status: dict[str, dict[str, dict[str, Any]]] = {}
-    for lang in languages:
-        tool_status[lang] = check_language_tools(lang)
+    with ThreadPoolExecutor(max_workers=1) as plugin_pool:
+        plugins_future = plugin_pool.submit(detect_plugins)
+        tool_status, tool_timings = _probe_tools(languages, time.monotonic() + PROBE_DEADLINE)
+        plugins = plugins_future.result()
 
     missing_tools: list[dict[str, str]] = []
     for lang, tools in tool_status.items():
@@ -271,8 +240,14 @@ def full_dependency_check(project_root: str | Path) -> dict[str, Any]:
 
     return {
         "languages": languages,
+        "language_files": scan.counts,
+        "project_roots": scan.markers,
         "tools": tool_status,
         "plugins": plugins,
         "missing_tools": missing_tools,
         "all_tools_available": len(missing_tools) == 0,
+        "timings": {
+            "tools": tool_timings,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        },
     }
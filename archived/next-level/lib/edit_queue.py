@@ -0,0 +1,84 @@
+"""Debounced, coalescing edit queue for the file checker.
+
+When the edit_coalescing feature is on, each Edit/Write records an event for
+its path in the session state dir instead of running the full checker. A path
+is checked once it has been quiet for edit_debounce_ms (noticed on the next
+hook event for any file) or when the Stop hook flushes the queue, so a burst
+of 5-10 edits to one file costs one formatter/linter run instead of ten.
+
+Layout: <session_dir>/edit-queue/<sha1(path)>.json = {"path": ..., "last_edit": epoch}
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from state import session_dir
+
+QUEUE_DIRNAME = "edit-queue"
+
+
+class EditQueue:
+    """Pending edit events for one session."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def for_session(cls, session_id: str) -> "EditQueue | None":
+        """Open the queue for a hook session, or None if the session ID is unusable."""
+        try:
+            sdir = session_dir(session_id)
+        except OSError:
+            return None
+        return cls(sdir / QUEUE_DIRNAME) if sdir else None
+
+    def _entry(self, filepath: str) -> Path:
+        return self.directory / (hashlib.sha1(filepath.encode()).hexdigest() + ".json")
+
+    def record(self, filepath: str) -> None:
+        """Record (or refresh) a pending edit event for a path."""
+        entry = self._entry(filepath)
+        tmp = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"path": filepath, "last_edit": time.time()}, f)
+            os.replace(tmp, entry)
+        except OSError:
+            pass
+
+    def _events(self) -> list[tuple[str, float]]:
+        """All pending (path, last_edit) events."""
+        events = []
+        for entry in self.directory.glob("*.json"):
+            try:
+                with open(entry, encoding="utf-8") as f:
+                    data = json.load(f)
+                events.append((data["path"], float(data["last_edit"])))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return events
+
+    def pending(self) -> list[str]:
+        """Every path with an unchecked edit."""
+        return sorted(path for path, _ in self._events())
+
+    def quiet(self, debounce_ms: int, exclude: str = "") -> list[str]:
+        """Pending paths whose last edit is at least debounce_ms old."""
+        cutoff = time.time() - debounce_ms / 1000
+        return sorted(path for path, last_edit in self._events() if last_edit <= cutoff and path != exclude)
+
+    def done(self, filepaths: list[str], checked_at: float) -> None:
+        """Drop paths checked at `checked_at`, keeping any edited again since."""
+        for filepath in filepaths:
+            entry = self._entry(filepath)
+            try:
+                with open(entry, encoding="utf-8") as f:
+                    if float(json.load(f)["last_edit"]) > checked_at:
+                        continue
+                entry.unlink()
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
@@ -0,0 +1,143 @@
+"""Diff-scoped checking for single edits.
+
+When the diff_scoped_checks feature is on, an Edit's new_string is located in
+the file to find the lines it touched. Comment stripping then only applies
+within those lines and linter findings are filtered to them plus
+diff_scope_margin lines of context, so a small edit to a multi-thousand-line
+file reports on (and rewrites) only what was just changed.
+
+Only stripping and reporting are scoped, not tool cost: formatters and
+linters still run on the whole file, and the stripper still lexes from the
+top of the file (a line before the edit may sit inside a string or block
+comment, which only a scan from the start can tell) but stops after the last
+touched line.
+
+Line ranges are 1-indexed and inclusive. A scope that cannot be located
+(Write, empty or ambiguous new_string) means "check the whole file".
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+LineRange = tuple[int, int]
+
+# More occurrences than this and the edit is not worth pinpointing
+MAX_OCCURRENCES = 20
+
+
+@dataclass(frozen=True)
+class EditScope:
+    """The text an edit inserted, and how much context to keep around it."""
+
+    snippets: tuple[str, ...]
+    margin: int = 5
+
+    @classmethod
+    def from_tool_input(cls, tool_name: str, tool_input: dict[str, Any], margin: int) -> "EditScope | None":
+        """Scope for an Edit hook payload, or None to check the whole file."""
+        if tool_name != "Edit":
+            return None
+        new_string = tool_input.get("new_string")
+        if not isinstance(new_string, str) or not new_string.strip():
+            return None
+        return cls((new_string,), margin)
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "EditScope | None":
+        """Rebuild a scope sent to the checker daemon."""
+        if not isinstance(payload, dict):
+            return None
+        snippets = payload.get("snippets")
+        if not isinstance(snippets, list) or not all(isinstance(s, str) and s for s in snippets):
+            return None
+        margin = payload.get("margin", 5)
+        if not isinstance(margin, int) or isinstance(margin, bool) or margin < 0:
+            return None
+        return cls(tuple(snippets), margin)
+
+    def to_payload(self) -> dict[str, Any]:
+        """JSON-serializable form for the checker daemon protocol."""
+        return {"snippets": list(self.snippets), "margin": self.margin}
+
+    def locate(self, source: str) -> list[LineRange] | None:
+        """Lines of `source` holding the edited text, or None if it cannot be pinpointed."""
+        ranges: list[LineRange] = []
+        for snippet in self.snippets:
+            pos = source.find(snippet)
+            if pos < 0:
+                return None
+            while pos >= 0:
+                if len(ranges) >= MAX_OCCURRENCES:
+                    return None
+                start = source.count("\n", 0, pos) + 1
+                ranges.append((start, start + snippet.rstrip("\n").count("\n")))
+                pos = source.find(snippet, pos + len(snippet))
+        return _merge(ranges)
+
+    def follow(self, ranges: list[LineRange], before: str, after: str) -> list[LineRange]:
+        """Map ranges through a rewrite (formatter, comment strip) of the file.
+
+        The rewrite is treated as one changed block between the common prefix
+        and suffix of the two texts; a range touching that block stretches to
+        cover its new extent.
+        """
+        if before == after:
+            return ranges
+        prefix = _common_prefix(before, after)
+        suffix = _common_suffix(before, after, prefix)
+        first = before.count("\n", 0, prefix) + 1  # first changed line (same in both)
+        old_last = before.count("\n", 0, len(before) - suffix) + 1
+        new_last = after.count("\n", 0, len(after) - suffix) + 1
+        shift = new_last - old_last
+
+        moved = []
+        for start, end in ranges:
+            new_start = start if start < first else (start + shift if start > old_last else first)
+            new_end = end if end < first else (end + shift if end > old_last else new_last)
+            moved.append((new_start, max(new_start, new_end)))
+        return _merge(moved)
+
+    def filter(self, findings: list[dict[str, Any]], ranges: list[LineRange]) -> list[dict[str, Any]]:
+        """Findings within `margin` lines of a range. File-level findings (no line) are kept."""
+        kept = []
+        for finding in findings:
+            line = finding.get("line")
+            if not isinstance(line, int) or line <= 0 or any(
+                    start - self.margin <= line <= end + self.margin for start, end in ranges):
+                kept.append(finding)
+        return kept
+
+
+def _merge(ranges: list[LineRange]) -> list[LineRange]:
+    """Sort and merge overlapping or adjacent ranges."""
+    merged: list[LineRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix, by binary search over C-level slice compares."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, prefix: int) -> int:
+    """Length of the common suffix not overlapping the common prefix."""
+    lo, hi = 0, min(len(a), len(b)) - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
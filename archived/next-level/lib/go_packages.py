@@ -0,0 +1,148 @@
+"""Import-path index of Go modules.
+
+Scoping `go vet` to one package, and knowing when its results are stale,
+needs the package's import path, source files and in-module dependencies.
+`go list -json` answers that, but costs a go invocation, so answers are kept
+per module in go-packages/<sha256(module root)[:16]>.json under the state
+dir, filled lazily one package directory at a time:
+
+    {"stamp": [go.mod and go.sum size/mtime], "packages": {
+        "/abs/dir": {"dir_mtime_ns": ..., "import_path": "example.com/app/sub",
+                     "files": ["a.go", "a_test.go"], "deps": ["/abs/dir/of/dep", ...]}}}
+
+A package entry is refreshed when its directory's mtime changes (files
+added, removed or renamed); the whole index is dropped when go.mod or go.sum
+changes. Directories `go list` cannot load (no Go files, build errors) are
+not recorded, so they are retried on the next lookup.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import tool_registry
+from state import state_root
+
+CACHE_DIRNAME = "go-packages"
+LIST_TIMEOUT = 30
+
+_lock = threading.Lock()
+_memo: dict[str, dict[str, Any]] = {}
+
+
+@dataclass(frozen=True)
+class GoPackage:
+    """One package of a Go module."""
+
+    dir: str
+    import_path: str
+    files: tuple[str, ...]
+    deps: tuple[str, ...]
+
+    def paths(self) -> list[str]:
+        """Absolute paths of the package's Go files, tests included."""
+        return [os.path.join(self.dir, name) for name in self.files]
+
+
+def _stat_key(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def module_stamp(module_root: str) -> list[Any]:
+    """Size and mtime of the module's go.mod and go.sum."""
+    return [_stat_key(os.path.join(module_root, "go.mod")), _stat_key(os.path.join(module_root, "go.sum"))]
+
+
+def _index_file(module_root: str) -> Path:
+    return state_root() / CACHE_DIRNAME / f"{hashlib.sha256(module_root.encode()).hexdigest()[:16]}.json"
+
+
+def _load(module_root: str) -> dict[str, Any]:
+    """The module's index, reset if go.mod or go.sum changed. Call under _lock."""
+    stamp = module_stamp(module_root)
+    index = _memo.get(module_root)
+    if index is None:
+        try:
+            with open(_index_file(module_root), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+    if not isinstance(index, dict) or index.get("stamp") != stamp or not isinstance(index.get("packages"), dict):
+        index = {"stamp": stamp, "packages": {}}
+    _memo[module_root] = index
+    return index
+
+
+def _save(module_root: str, index: dict[str, Any]) -> None:
+    path = _index_file(module_root)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _go_list(module_root: str, directory: str) -> dict[str, Any] | None:
+    """`go list -e -json` for the package in a directory, or None if go cannot load it."""
+    go = tool_registry.which("go")
+    if not go:
+        return None
+    rel = os.path.relpath(directory, module_root)
+    try:
+        proc = subprocess.run([go, "list", "-e", "-json", "." if rel == "." else f"./{rel}"],
+                              capture_output=True, text=True, timeout=LIST_TIMEOUT, cwd=module_root)
+        info = json.loads(proc.stdout)
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
+    if not isinstance(info, dict) or info.get("Error") or not info.get("ImportPath"):
+        return None
+    return info
+
+
+def _entry(module_root: str, directory: str, info: dict[str, Any], dir_mtime_ns: int | None) -> dict[str, Any]:
+    """Index entry for a `go list` package: its files and the directories of its in-module imports."""
+    module_path = (info.get("Module") or {}).get("Path") or ""
+    deps = []
+    for import_path in sorted(set(info.get("Deps") or []) | set(info.get("TestImports") or [])
+                              | set(info.get("XTestImports") or [])):
+        if module_path and (import_path == module_path or import_path.startswith(module_path + "/")):
+            dep_dir = os.path.join(module_root, import_path[len(module_path) + 1:])
+            if dep_dir.rstrip(os.sep) != directory:
+                deps.append(dep_dir.rstrip(os.sep))
+    files = []
+    for field in ("GoFiles", "CgoFiles", "TestGoFiles", "XTestGoFiles"):
+        files.extend(info.get(field) or [])
+    return {"dir_mtime_ns": dir_mtime_ns, "import_path": info["ImportPath"], "files": sorted(files), "deps": deps}
+
+
+def package(module_root: str, directory: str) -> GoPackage | None:
+    """The package in `directory` of the module rooted at `module_root`, or None if go cannot list it."""
+    directory = os.path.abspath(directory)
+    dir_mtime_ns = (_stat_key(directory) or [None, None])[1]
+    with _lock:
+        index = _load(module_root)
+        entry = index["packages"].get(directory)
+        if not entry or entry.get("dir_mtime_ns") != dir_mtime_ns:
+            info = _go_list(module_root, directory)
+            if info is None:
+                if index["packages"].pop(directory, None) is not None:
+                    _save(module_root, index)
+                return None
+            entry = index["packages"][directory] = _entry(module_root, directory, info, dir_mtime_ns)
+            _save(module_root, index)
+    return GoPackage(directory, entry["import_path"], tuple(entry["files"]), tuple(entry["deps"]))
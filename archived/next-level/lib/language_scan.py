@@ -0,0 +1,346 @@
+"""Deep language detection for monorepos.
+
+Walks a project with os.scandir down to MAX_DEPTH levels, skipping
+SKIP_PATTERNS directories and anything matched by the project's .gitignore
+files (nested ones included), and reports:
+- counts: source files per language (by EXTENSION_LANGUAGE)
+- markers: per language, the directories holding one of its root markers
+  (go.mod, Cargo.toml, package.json, ...), relative to the project, "." for the root
+
+Directories down to FANOUT_DEPTH are walked as separate tasks on a thread
+pool, so apps/*, services/* and packages/* are scanned concurrently. Tasks
+are scheduled round-robin across the directories that spawned them, so one
+huge packages/ does not starve a small ios/. With stop_early the walk ends as
+soon as every known language has been seen; the counts of such a scan are
+lower bounds and `complete` is False.
+
+`source_files` lists the source files themselves under the same skipping
+rules, for bulk checks (lib/bulk_check.py).
+
+Results are cached under the state dir, keyed on the git tree hash of HEAD
+and the stat of the git index (so commits and staged changes invalidate it;
+untracked files are not seen until added). Computing the key is one
+`git rev-parse`, independent of tree size. Projects outside git are scanned
+every time.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from checkers import EXTENSION_LANGUAGE, SKIP_PATTERNS
+from state import state_root
+
+MAX_DEPTH = 6
+FANOUT_DEPTH = 2
+SCAN_WORKERS = 8
+GIT_TIMEOUT = 5
+CACHE_DIRNAME = "language-scan"
+
+_SKIP_DIRS = frozenset(pattern.rstrip("/") for pattern in SKIP_PATTERNS)
+
+# (directory path, path relative to the project, depth, active .gitignore rules)
+_Task = tuple[str, str, int, tuple["_IgnoreRules", ...]]
+
+
+@dataclass
+class LanguageScan:
+    """Languages found in a project tree."""
+
+    counts: dict[str, int] = field(default_factory=dict)
+    markers: dict[str, list[str]] = field(default_factory=dict)
+    complete: bool = True
+
+    def languages(self) -> list[str]:
+        """Every language with source files or a root marker."""
+        return sorted(set(self.counts) | set(self.markers))
+
+    def to_payload(self) -> dict[str, Any]:
+        """JSON-serializable form for the on-disk cache."""
+        return {"counts": self.counts, "markers": self.markers, "complete": self.complete}
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "LanguageScan | None":
+        """Rebuild a cached scan, or None if the payload is malformed."""
+        if not isinstance(payload, dict) or not isinstance(payload.get("counts"), dict) \
+                or not isinstance(payload.get("markers"), dict):
+            return None
+        return cls(payload["counts"], payload["markers"], bool(payload.get("complete")))
+
+
+class _IgnoreRules:
+    """The patterns of one .gitignore, matched relative to the directory holding it."""
+
+    def __init__(self, base: str, text: str) -> None:
+        self.base = f"{base}/" if base else ""
+        self.rules: list[tuple[re.Pattern[str], bool, bool, bool]] = []
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                self.rules.append((re.compile(_glob_regex(line)), negate, dir_only, anchored))
+
+    def match(self, rel: str, is_dir: bool) -> bool | None:
+        """True if ignored, False if re-included by a `!` rule, None if no rule applies."""
+        if not rel.startswith(self.base):
+            return None
+        local = rel[len(self.base):]
+        name = local.rsplit("/", 1)[-1]
+        verdict = None
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if pattern.fullmatch(local if anchored else name):
+                verdict = not negate
+        return verdict
+
+
+def _glob_regex(pattern: str) -> str:
+    """Translate a gitignore glob into a regex over '/'-separated paths."""
+    out, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 2
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and pattern.find("]", i + 1) > i + 1:
+            end = pattern.find("]", i + 1)
+            members = pattern[i + 1:end]
+            out.append("[" + ("^" + members[1:] if members.startswith("!") else members) + "]")
+            i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def _ignored(rules: tuple[_IgnoreRules, ...], rel: str, is_dir: bool) -> bool:
+    """Whether the deepest applicable .gitignore rule ignores the path."""
+    verdict = None
+    for ruleset in rules:
+        matched = ruleset.match(rel, is_dir)
+        if matched is not None:
+            verdict = matched
+    return bool(verdict)
+
+
+class _Scanner:
+    """One scan of a project tree, shared by the pool's walkers."""
+
+    def __init__(self, markers: dict[str, str], max_depth: int, stop_early: bool) -> None:
+        self.markers = markers
+        self.max_depth = max_depth
+        self.stop_early = stop_early
+        self.wanted = set(EXTENSION_LANGUAGE.values()) | set(markers.values())
+        self.seen: set[str] = set()
+        self.counts: dict[str, int] = {}
+        self.found_markers: dict[str, set[str]] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def _saw(self, language: str) -> None:
+        with self.lock:
+            self.seen.add(language)
+            if self.stop_early and self.seen >= self.wanted:
+                self.stopped.set()
+
+    def walk(self, task: _Task) -> list[_Task]:
+        """Walk a subtree; directories down to FANOUT_DEPTH are returned as new tasks."""
+        counts: dict[str, int] = {}
+        markers: dict[str, set[str]] = {}
+        spawned: list[_Task] = []
+        stack = [task]
+        while stack and not self.stopped.is_set():
+            path, rel, depth, rules = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            if any(entry.name == ".gitignore" for entry in entries):
+                try:
+                    with open(os.path.join(path, ".gitignore"), encoding="utf-8", errors="replace") as f:
+                        rules = rules + (_IgnoreRules(rel, f.read()),)
+                except OSError:
+                    pass
+
+            for entry in entries:
+                name = entry.name
+                child = f"{rel}/{name}" if rel else name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if name in _SKIP_DIRS or depth >= self.max_depth or (rules and _ignored(rules, child, True)):
+                        continue
+                    (spawned if depth + 1 <= FANOUT_DEPTH else stack).append((entry.path, child, depth + 1, rules))
+                    continue
+                marker_language = self.markers.get(name)
+                language = EXTENSION_LANGUAGE.get(os.path.splitext(name)[1].lower())
+                if not (marker_language or language) or (rules and _ignored(rules, child, False)):
+                    continue
+                if marker_language:
+                    markers.setdefault(marker_language, set()).add(rel or ".")
+                    if marker_language not in self.seen:
+                        self._saw(marker_language)
+                if language:
+                    counts[language] = counts.get(language, 0) + 1
+                    if language not in self.seen:
+                        self._saw(language)
+
+        with self.lock:
+            for language, count in counts.items():
+                self.counts[language] = self.counts.get(language, 0) + count
+            for language, dirs in markers.items():
+                self.found_markers.setdefault(language, set()).update(dirs)
+        return spawned
+
+    def run(self, root: str, workers: int) -> LanguageScan:
+        backlog: deque[deque[_Task]] = deque([deque([(root, "", 0, ())])])
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending: set[Future[list[_Task]]] = set()
+            while backlog or pending:
+                while backlog and len(pending) < workers * 2 and not self.stopped.is_set():
+                    batch = backlog.popleft()
+                    pending.add(pool.submit(self.walk, batch.popleft()))
+                    if batch:
+                        backlog.append(batch)
+                if self.stopped.is_set():
+                    backlog.clear()
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spawned = future.result()
+                    if spawned:
+                        backlog.append(deque(spawned))
+        return LanguageScan(
+            counts=dict(sorted(self.counts.items())),
+            markers={language: sorted(dirs) for language, dirs in sorted(self.found_markers.items())},
+            complete=not self.stopped.is_set(),
+        )
+
+
+def source_files(project_root: str | Path) -> list[str]:
+    """Every source file under a project, by EXTENSION_LANGUAGE, in walk order.
+
+    Follows the same rules as a scan (SKIP_PATTERNS directories and .gitignore
+    files skipped), without a depth limit and without following symlinks.
+    """
+    root = os.path.abspath(project_root)
+    files: list[str] = []
+    stack: list[tuple[str, str, tuple[_IgnoreRules, ...]]] = [(root, "", ())]
+    while stack:
+        path, rel, rules = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        if any(entry.name == ".gitignore" for entry in entries):
+            try:
+                with open(os.path.join(path, ".gitignore"), encoding="utf-8", errors="replace") as f:
+                    rules = rules + (_IgnoreRules(rel, f.read()),)
+            except OSError:
+                pass
+        subdirs = []
+        for entry in entries:
+            child = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name not in _SKIP_DIRS and not (rules and _ignored(rules, child, True)):
+                    subdirs.append((entry.path, child, rules))
+            elif is_file and os.path.splitext(entry.name)[1].lower() in EXTENSION_LANGUAGE \
+                    and not (rules and _ignored(rules, child, False)):
+                files.append(entry.path)
+        stack.extend(reversed(subdirs))
+    return files
+
+
+def _cache_key(root: str, max_depth: int) -> str | None:
+    """Git tree hash of HEAD plus the git index's stat, or None outside git."""
+    try:
+        result = subprocess.run(["git", "-C", root, "rev-parse", "HEAD^{tree}", "--git-path", "index"],
+                                capture_output=True, text=True, timeout=GIT_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    lines = result.stdout.split("\n")
+    if result.returncode != 0 or len(lines) < 2:
+        return None
+    tree, index = lines[0], os.path.join(root, lines[1])
+    try:
+        st = os.stat(index)
+    except OSError:
+        return None
+    return f"{tree}:{st.st_mtime_ns}:{st.st_size}:{max_depth}"
+
+
+def _cache_file(root: str) -> Path:
+    return state_root() / CACHE_DIRNAME / f"{hashlib.sha256(root.encode()).hexdigest()[:16]}.json"
+
+
+def scan_languages(project_root: str | Path, markers: dict[str, str], max_depth: int = MAX_DEPTH,
+                   stop_early: bool = False, workers: int = SCAN_WORKERS,
+                   use_cache: bool = True) -> LanguageScan:
+    """Scan a project for languages.
+
+    `markers` maps root-marker file names to their language. A cached
+    complete scan also answers stop_early requests; an early-stopped scan is
+    only reused for stop_early requests.
+    """
+    root = os.path.abspath(project_root)
+    key = _cache_key(root, max_depth) if use_cache else None
+    cache_file = _cache_file(root)
+    if key:
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+        if isinstance(cached, dict) and cached.get("key") == key:
+            scan = LanguageScan.from_payload(cached.get("scan"))
+            if scan and (scan.complete or stop_early):
+                return scan
+
+    scan = _Scanner(markers, max_depth, stop_early).run(root, workers)
+    if key:
+        tmp = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "root": root, "scan": scan.to_payload()}, f)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+    return scan
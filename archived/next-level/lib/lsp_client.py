@@ -0,0 +1,353 @@
+"""Warm language-server clients for the checker daemon.
+
+A type checker run from the command line re-analyzes the project's whole
+import graph on every edit. A language server keeps that analysis in memory
+and only re-checks what an edit touched, so the checker daemon keeps one
+server per (server, workspace root) alive, started from templates/lsp.json,
+and pipeline stages that name a server (Stage.lsp) ask it instead:
+
+1. didOpen the file on first use (full text), didChange with the new full
+   text afterwards; at most MAX_OPEN_DOCUMENTS stay open, least recent closed.
+   Each open document remembers the (mtime, size) of the text it was given;
+   before every check, documents whose file changed on disk since (sed, git
+   checkout, a batch format) are closed, so the server goes back to reading
+   them from disk instead of analyzing imports against stale text
+2. wait for the textDocument/publishDiagnostics for that document version
+   (or, from servers that do not report versions, the next one for the file)
+3. return the errors and warnings as findings, or None when the server is
+   missing, still initializing, dead or misses the deadline, so the stage
+   falls back to its command-line run
+
+Servers start in the background on first use; until they have initialized,
+checks keep using the command line. A server that fails to start is retried
+after RETRY_AFTER seconds. Clients are only created once `enable()` has been
+called (the daemon does so with the lsp_diagnostics feature on); hook
+processes never start servers.
+
+The wire format is JSON-RPC 2.0 over stdio with Content-Length framing.
+Requests from the server (workspace/configuration, capability registration,
+progress) are answered with empty results so servers never stall on us.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import tool_registry
+
+LSP_TEMPLATE = Path(__file__).resolve().parent.parent / "templates" / "lsp.json"
+DIAGNOSTIC_DEADLINE = 10.0
+INITIALIZE_TIMEOUT = 60.0
+SHUTDOWN_TIMEOUT = 2.0
+RETRY_AFTER = 60.0
+MAX_OPEN_DOCUMENTS = 64
+
+LANGUAGE_IDS = {
+    ".py": "python", ".pyi": "python",
+    ".ts": "typescript", ".tsx": "typescriptreact", ".mts": "typescript", ".cts": "typescript",
+    ".js": "javascript", ".jsx": "javascriptreact", ".mjs": "javascript", ".cjs": "javascript",
+    ".go": "go", ".rs": "rust", ".swift": "swift",
+}
+_SEVERITIES = {1: "error", 2: "warning"}
+
+_enabled = threading.Event()
+_pool_lock = threading.Lock()
+_clients: dict[tuple[str, str], "LspClient"] = {}
+_failed: dict[tuple[str, str], float] = {}
+
+
+def server_command(server: str, template: Path = LSP_TEMPLATE) -> list[str] | None:
+    """argv for a server declared in templates/lsp.json, or None if it is unknown or not installed."""
+    try:
+        with open(template, encoding="utf-8") as f:
+            spec = json.load(f).get("lspServers", {}).get(server)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(spec, dict) or not spec.get("command"):
+        return None
+    command = tool_registry.which(spec["command"])
+    return [command, *spec.get("args", [])] if command else None
+
+
+def finding(diag: dict[str, Any]) -> dict[str, Any] | None:
+    """Normalize an LSP diagnostic like the type checkers' CLI findings; None below warning."""
+    severity = _SEVERITIES.get(diag.get("severity", 1))
+    if not severity:
+        return None
+    code = diag.get("code")
+    return {
+        "line": diag.get("range", {}).get("start", {}).get("line", 0) + 1,
+        "message": diag.get("message", ""),
+        "rule": str(code) if code is not None else "",
+        "severity": severity,
+    }
+
+
+class LspClient:
+    """One language server process and the documents opened in it."""
+
+    def __init__(self, argv: list[str], root: str) -> None:
+        self.root = root
+        self.uri_root = Path(root).as_uri()
+        self.proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, cwd=root, start_new_session=True)
+        self.ready = threading.Event()
+        self.failed = threading.Event()
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._responses: dict[int, dict[str, Any]] = {}
+        # uri -> (publish sequence number, reported version, diagnostics)
+        self._published: dict[str, tuple[int, int | None, list[dict[str, Any]]]] = {}
+        self._publishes = 0
+        # uri -> (path, (mtime_ns, size) of the text sent); versions keep rising across reopens
+        self._open: OrderedDict[str, tuple[str, tuple[int, int] | None]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._closed = False
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        threading.Thread(target=self._initialize, daemon=True).start()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the server process is still running and its output still open."""
+        return not self._closed and self.proc.poll() is None
+
+    def _send(self, message: dict[str, Any]) -> bool:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        stdin = self.proc.stdin
+        if stdin is None:
+            return False
+        try:
+            with self._write_lock:
+                stdin.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+                stdin.flush()
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def notify(self, method: str, params: Any) -> bool:
+        """Send a notification."""
+        return self._send({"method": method, "params": params})
+
+    def request(self, method: str, params: Any, timeout: float) -> dict[str, Any] | None:
+        """Send a request and wait for its response message, or None on timeout or exit."""
+        with self._cond:
+            self._next_id += 1
+            request_id = self._next_id
+        if not self._send({"id": request_id, "method": method, "params": params}):
+            return None
+        with self._cond:
+            self._cond.wait_for(lambda: request_id in self._responses or not self.alive, timeout)
+            return self._responses.pop(request_id, None)
+
+    def _initialize(self) -> None:
+        response = self.request("initialize", {
+            "processId": os.getpid(),
+            "rootUri": self.uri_root,
+            "rootPath": self.root,
+            "workspaceFolders": [{"uri": self.uri_root, "name": os.path.basename(self.root) or self.root}],
+            "capabilities": {
+                "textDocument": {
+                    "synchronization": {"didSave": True},
+                    "publishDiagnostics": {"versionSupport": True},
+                },
+                "workspace": {"configuration": True, "workspaceFolders": True},
+            },
+        }, INITIALIZE_TIMEOUT)
+        if response is None or "error" in response or not self.notify("initialized", {}):
+            self.failed.set()
+            self.close()
+            return
+        self.ready.set()
+
+    def _read_message(self, stream: BinaryIO) -> dict[str, Any] | None:
+        length = None
+        while True:
+            line = stream.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value.strip())
+        if length is None:
+            return {}
+        body = stream.read(length)
+        if len(body) < length:
+            return None
+        try:
+            message = json.loads(body)
+        except ValueError:
+            return {}
+        return message if isinstance(message, dict) else {}
+
+    def _read_loop(self) -> None:
+        stream = self.proc.stdout
+        try:
+            while stream and (message := self._read_message(stream)) is not None:
+                self._dispatch(message)
+        except (OSError, ValueError):
+            pass
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        if method and "id" in message:
+            # A request from the server: answer so it does not wait on us
+            items = (message.get("params") or {}).get("items", [])
+            result = [None] * len(items) if method == "workspace/configuration" else None
+            self._send({"id": message["id"], "result": result})
+        elif "id" in message:
+            with self._cond:
+                self._responses[message["id"]] = message
+                self._cond.notify_all()
+        elif method == "textDocument/publishDiagnostics":
+            params = message.get("params") or {}
+            with self._cond:
+                self._publishes += 1
+                self._published[params.get("uri", "")] = (
+                    self._publishes, params.get("version"), params.get("diagnostics") or [])
+                self._cond.notify_all()
+
+    def diagnostics(self, path: str, text: str, deadline: float = DIAGNOSTIC_DEADLINE,
+                    stamp: tuple[int, int] | None = None) -> list[dict[str, Any]] | None:
+        """Sync a document's full text and wait for its diagnostics; None if not ready or too late.
+
+        `stamp` is the file's (mtime_ns, size) from before `text` was read.
+        """
+        if not self.ready.is_set() or not self.alive:
+            return None
+        uri = Path(path).as_uri()
+        with self._cond:
+            reopen = self._open.pop(uri, None) is None
+            version = self._versions[uri] = self._versions.get(uri, 0) + 1
+            closing = [other for other, (other_path, other_stamp) in self._open.items()
+                       if _file_stamp(other_path) != other_stamp]
+            for other in closing:
+                del self._open[other]
+            self._open[uri] = (path, stamp)
+            while len(self._open) > MAX_OPEN_DOCUMENTS:
+                closing.append(self._open.popitem(last=False)[0])
+            since = self._publishes
+        for stale in closing:
+            self.notify("textDocument/didClose", {"textDocument": {"uri": stale}})
+        if reopen:
+            sent = self.notify("textDocument/didOpen", {"textDocument": {
+                "uri": uri, "languageId": LANGUAGE_IDS.get(os.path.splitext(path)[1].lower(), "plaintext"),
+                "version": version, "text": text}})
+        else:
+            sent = self.notify("textDocument/didChange", {
+                "textDocument": {"uri": uri, "version": version}, "contentChanges": [{"text": text}]})
+        if not sent:
+            return None
+
+        def fresh() -> bool:
+            published = self._published.get(uri)
+            if not published:
+                return False
+            seq, published_version, _ = published
+            return published_version == version if published_version is not None else seq > since
+
+        with self._cond:
+            if not self._cond.wait_for(lambda: fresh() or not self.alive, deadline) or not fresh():
+                return None
+            return list(self._published[uri][2])
+
+    def close(self) -> None:
+        """Shut the server down politely, killing it if it lingers."""
+        if self.alive and self.ready.is_set():
+            self.request("shutdown", None, SHUTDOWN_TIMEOUT)
+            self.notify("exit", None)
+        try:
+            self.proc.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                if stream:
+                    stream.close()
+            except OSError:
+                pass
+
+
+def _file_stamp(path: str) -> tuple[int, int] | None:
+    """(mtime_ns, size) of a file, or None if it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def enable() -> None:
+    """Allow this process to start language servers (the checker daemon)."""
+    _enabled.set()
+
+
+def enabled() -> bool:
+    """Whether this process may use language servers."""
+    return _enabled.is_set()
+
+
+def client_for(server: str, root: str) -> LspClient | None:
+    """The warm client for a server and workspace root, starting it if needed."""
+    if not _enabled.is_set():
+        return None
+    key = (server, root)
+    with _pool_lock:
+        client = _clients.get(key)
+        if client and client.alive and not client.failed.is_set():
+            return client
+        if client:
+            _clients.pop(key)
+            _failed[key] = time.monotonic()
+            threading.Thread(target=client.close, daemon=True).start()
+        if time.monotonic() - _failed.get(key, -RETRY_AFTER) < RETRY_AFTER:
+            return None
+        argv = server_command(server)
+        if not argv:
+            _failed[key] = time.monotonic()
+            return None
+        try:
+            client = _clients[key] = LspClient(argv, root)
+        except OSError:
+            _failed[key] = time.monotonic()
+            return None
+        return client
+
+
+def diagnostics(server: str, root: str, path: str,
+                deadline: float = DIAGNOSTIC_DEADLINE) -> list[dict[str, Any]] | None:
+    """Findings for a file from its warm language server, or None to use the command line instead."""
+    client = client_for(server, root)
+    if client is None:
+        return None
+    stamp = _file_stamp(path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    diags = client.diagnostics(os.path.abspath(path), text, deadline, stamp)
+    if diags is None:
+        return None
+    return [f for f in (finding(diag) for diag in diags) if f]
+
+
+def shutdown_all() -> None:
+    """Stop every server this process started."""
+    with _pool_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
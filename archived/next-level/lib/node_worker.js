@@ -0,0 +1,123 @@
+#!/usr/bin/env node
+// Warm prettier/eslint worker for lib/node_worker.py.
+//
+// Usage: node node_worker.js <prettier|eslint> <project root> [fallback module dir]
+//
+// Loads the tool once (the project's own copy first, else the fallback
+// module dir of the globally installed binary) and answers newline-delimited
+// JSON requests on stdin, one JSON response line each on stdout:
+//   -> {"id": 1, "op": "format", "file": "/abs/a.ts", "text": "..."}
+//   <- {"id": 1, "ok": true, "text": "..."}            (text unchanged if ignored)
+//   -> {"id": 2, "op": "lint", "file": "/abs/a.ts"}
+//   <- {"id": 2, "ok": true, "stdout": "[...]"}        (what `eslint --format json` prints)
+//   <- {"id": n, "ok": false, "error": "..."}
+// The first line written is {"ready": true, "module": <dir>, "version": <v>}
+// or {"ready": false, "error": "..."} before exiting.
+
+"use strict";
+
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+const { createRequire } = require("module");
+const { pathToFileURL } = require("url");
+
+const [tool, root, fallbackDir] = process.argv.slice(2);
+
+function resolveEntry() {
+  for (const base of [path.join(root, "package.json"), fallbackDir && path.join(fallbackDir, "..", "package.json")]) {
+    if (!base) continue;
+    try {
+      return createRequire(base).resolve(tool);
+    } catch (_) {
+      // Not installed there
+    }
+  }
+  return null;
+}
+
+function packageInfo(entry) {
+  let dir = path.dirname(entry);
+  while (dir !== path.dirname(dir)) {
+    const manifest = path.join(dir, "package.json");
+    try {
+      const pkg = JSON.parse(fs.readFileSync(manifest, "utf8"));
+      if (pkg.name === tool) return { module: dir, version: pkg.version || "" };
+    } catch (_) {
+      // Keep walking up
+    }
+    dir = path.dirname(dir);
+  }
+  return { module: path.dirname(entry), version: "" };
+}
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+async function load() {
+  const entry = resolveEntry();
+  if (!entry) throw new Error(`${tool} is not installed for ${root}`);
+  const mod = await import(pathToFileURL(entry).href);
+  if (tool === "prettier") {
+    const prettier = typeof mod.format === "function" ? mod : mod.default;
+    return { info: packageInfo(entry), handlers: { format: (req) => format(prettier, req) } };
+  }
+  const ESLint = mod.ESLint || (mod.default && mod.default.ESLint);
+  if (!ESLint) throw new Error("eslint does not export ESLint");
+  // One instance keeps the parsed config and loaded plugins warm
+  const eslint = new ESLint({ cwd: root });
+  return { info: packageInfo(entry), handlers: { lint: (req) => lint(eslint, req) } };
+}
+
+async function format(prettier, req) {
+  const options = (await prettier.resolveConfig(req.file, { editorconfig: true })) || {};
+  const info = await prettier.getFileInfo(req.file, {
+    ignorePath: [path.join(root, ".prettierignore"), path.join(root, ".gitignore")],
+    resolveConfig: true,
+    plugins: options.plugins,
+  });
+  if (info.ignored || !info.inferredParser) return { text: req.text };
+  return { text: await prettier.format(req.text, { ...options, filepath: req.file }) };
+}
+
+async function lint(eslint, req) {
+  if (await eslint.isPathIgnored(req.file)) return { stdout: "[]" };
+  const results = await eslint.lintFiles([req.file]);
+  return { stdout: JSON.stringify(results) };
+}
+
+async function main() {
+  let worker;
+  try {
+    worker = await load();
+  } catch (err) {
+    send({ ready: false, error: String((err && err.message) || err) });
+    process.exit(1);
+  }
+  send({ ready: true, ...worker.info });
+
+  // Requests are answered one at a time, in order
+  let queue = Promise.resolve();
+  const lines = readline.createInterface({ input: process.stdin });
+  lines.on("line", (line) => {
+    queue = queue.then(async () => {
+      let req;
+      try {
+        req = JSON.parse(line);
+      } catch (_) {
+        return;
+      }
+      const handler = worker.handlers[req.op];
+      try {
+        if (!handler) throw new Error(`${tool} worker cannot ${req.op}`);
+        send({ id: req.id, ok: true, ...(await handler(req)) });
+      } catch (err) {
+        send({ id: req.id, ok: false, error: String((err && err.message) || err) });
+      }
+    });
+  });
+  lines.on("close", () => queue.then(() => process.exit(0)));
+}
+
+main();
@@ -0,0 +1,283 @@
+"""Warm prettier and eslint workers for the checker daemon.
+
+Every `prettier` or `eslint` run from the command line starts Node, loads the
+tool and its plugins, and resolves the project's config before touching the
+file; for eslint with typed linting that is most of the cost of an edit. Like
+eslint_d and prettierd, the checker daemon instead keeps one long-lived Node
+process per (tool, project root), running lib/node_worker.js, and pipeline
+stages that name a worker tool (Stage.worker) ask it:
+
+- format: the buffer goes in, the formatted buffer comes back, as with
+  `prettier --stdin-filepath`
+- lint: the file on disk is linted and the reply is what
+  `eslint --format json` would print, so the stage's parser is unchanged
+
+The project root is the nearest directory holding a package.json. The worker
+loads the project's own copy of the tool, else the one behind the binary the
+stage resolved. Before each request the config files the tool would read
+(CONFIG_FILES) are stat'ed in every directory from the file up to the
+filesystem root; when one appeared, vanished or changed since the worker last
+served that directory, or the tool itself was upgraded, the worker is
+restarted so it never answers with a stale config.
+
+Workers start on first use, which costs about one command-line run. Requests
+return None — and the stage falls back to its command — when Node or the tool
+is missing, the worker died or it misses the deadline; a worker that failed
+to start is retried after RETRY_AFTER seconds. At most MAX_WORKERS stay
+alive, least recently used stopped first. Workers are only started once
+`enable()` has been called (the daemon does so with the node_workers
+feature on); hook processes never start them.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import root_index
+import tool_registry
+from tool_configs import NODE_SHARED_FILES
+from tool_configs import TOOL_CONFIG_FILES as CONFIG_FILES
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "node_worker.js"
+REQUEST_DEADLINE = 15.0
+START_TIMEOUT = 30.0
+SHUTDOWN_TIMEOUT = 2.0
+RETRY_AFTER = 60.0
+MAX_WORKERS = 16
+
+Stamp = tuple[tuple[str, int, int], ...]
+
+_enabled = threading.Event()
+_pool_lock = threading.Lock()
+_workers: "OrderedDict[tuple[str, str], NodeWorker]" = OrderedDict()
+_failed: dict[tuple[str, str], float] = {}
+
+
+def project_root(filepath: str) -> str:
+    """The directory a file's worker serves: the nearest with a package.json, else the file's own."""
+    return root_index.find_root(filepath, "package.json") or os.path.dirname(os.path.abspath(filepath))
+
+
+def config_stamp(tool: str, directory: str) -> Stamp:
+    """(path, mtime_ns, size) of every config file the tool could read for files in a directory."""
+    entries = []
+    current = os.path.abspath(directory)
+    while True:
+        for name in CONFIG_FILES.get(tool, NODE_SHARED_FILES):
+            path = os.path.join(current, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_mtime_ns, st.st_size))
+        parent = os.path.dirname(current)
+        if parent == current:
+            return tuple(entries)
+        current = parent
+
+
+class NodeWorker:
+    """One node_worker.js process serving one tool for one project root."""
+
+    def __init__(self, node: str, tool: str, root: str, tool_path: str) -> None:
+        self.tool = tool
+        self.root = root
+        self.proc = subprocess.Popen(
+            [node, str(WORKER_SCRIPT), tool, root, os.path.realpath(tool_path)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=root, start_new_session=True)
+        self.ready = threading.Event()
+        self.failed = threading.Event()
+        self.module: str | None = None
+        # directory -> config stamp when this worker last served a file there
+        self.stamps: dict[str, Stamp] = {}
+        self._module_stamp: tuple[int, int] | None = None
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._responses: dict[int, dict[str, Any]] = {}
+        self._closed = False
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running and its output still open."""
+        return not self._closed and self.proc.poll() is None
+
+    def _read_loop(self) -> None:
+        stream = self.proc.stdout
+        try:
+            for line in stream or ():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                if "ready" in message:
+                    self._started(message)
+                elif "id" in message:
+                    with self._cond:
+                        self._responses[message["id"]] = message
+                        self._cond.notify_all()
+        except (OSError, ValueError):
+            pass
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.failed.set()
+        self.ready.set()
+
+    def _started(self, message: dict[str, Any]) -> None:
+        if message.get("ready") is True and isinstance(message.get("module"), str):
+            self.module = message["module"]
+            self._module_stamp = self.module_stamp()
+        else:
+            self.failed.set()
+        self.ready.set()
+
+    def module_stamp(self) -> tuple[int, int] | None:
+        """(mtime_ns, size) of the loaded tool's package.json, which changes when it is upgraded."""
+        try:
+            st = os.stat(os.path.join(self.module or "", "package.json"))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def current(self, directory: str, stamp: Stamp) -> bool:
+        """Record a directory's config stamp; False if it or the tool changed since last recorded."""
+        if self.module_stamp() != self._module_stamp:
+            return False
+        return self.stamps.setdefault(directory, stamp) == stamp
+
+    def request(self, op: str, params: dict[str, Any], deadline: float) -> dict[str, Any] | None:
+        """Send one request and wait for its reply, or None if the worker is unusable or too late."""
+        start = time.monotonic()
+        if not self.ready.wait(deadline) or self.failed.is_set() or not self.alive:
+            return None
+        stdin = self.proc.stdin
+        if stdin is None:
+            return None
+        with self._cond:
+            self._next_id += 1
+            request_id = self._next_id
+        line = json.dumps({"id": request_id, "op": op, **params}).encode() + b"\n"
+        try:
+            with self._write_lock:
+                stdin.write(line)
+                stdin.flush()
+        except (OSError, ValueError):
+            return None
+        remaining = max(deadline - (time.monotonic() - start), 0)
+        with self._cond:
+            self._cond.wait_for(lambda: request_id in self._responses or not self.alive, remaining)
+            return self._responses.pop(request_id, None)
+
+    def close(self) -> None:
+        """Close the worker's input so it exits after its last reply, killing it if it lingers."""
+        try:
+            if self.proc.stdin:
+                self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        try:
+            if self.proc.stdout:
+                self.proc.stdout.close()
+        except OSError:
+            pass
+
+
+def enable() -> None:
+    """Allow this process to start Node workers (the checker daemon)."""
+    _enabled.set()
+
+
+def enabled() -> bool:
+    """Whether this process may use Node workers."""
+    return _enabled.is_set()
+
+
+def _retire(key: tuple[str, str], failed: bool) -> None:
+    """Drop a worker from the pool (holding _pool_lock) and stop it in the background."""
+    worker = _workers.pop(key)
+    if failed:
+        _failed[key] = time.monotonic()
+    threading.Thread(target=worker.close, daemon=True).start()
+
+
+def worker_for(tool: str, tool_path: str, filepath: str) -> NodeWorker | None:
+    """The warm worker for a tool and the file's project root, (re)starting it if needed."""
+    if not _enabled.is_set():
+        return None
+    root = project_root(filepath)
+    directory = os.path.dirname(os.path.abspath(filepath))
+    stamp = config_stamp(tool, directory)
+    key = (tool, root)
+    with _pool_lock:
+        worker = _workers.get(key)
+        if worker and (not worker.alive or worker.failed.is_set()):
+            _retire(key, failed=True)
+        elif worker and worker.ready.is_set() and not worker.current(directory, stamp):
+            _retire(key, failed=False)
+        elif worker:
+            _workers.move_to_end(key)
+            return worker
+        if time.monotonic() - _failed.get(key, -RETRY_AFTER) < RETRY_AFTER:
+            return None
+        node = tool_registry.which("node")
+        if not node or not WORKER_SCRIPT.is_file():
+            _failed[key] = time.monotonic()
+            return None
+        try:
+            worker = _workers[key] = NodeWorker(node, tool, root, tool_path)
+        except OSError:
+            _failed[key] = time.monotonic()
+            return None
+        worker.stamps[directory] = stamp
+        while len(_workers) > MAX_WORKERS:
+            _retire(next(iter(_workers)), failed=False)
+        return worker
+
+
+def format_text(tool: str, tool_path: str, filepath: str, text: str,
+                deadline: float = REQUEST_DEADLINE) -> tuple[bool, str] | None:
+    """Format a buffer in the warm worker: (succeeded, content), or None to use the command line instead."""
+    worker = worker_for(tool, tool_path, filepath)
+    if worker is None:
+        return None
+    reply = worker.request("format", {"file": os.path.abspath(filepath), "text": text}, deadline)
+    if reply is None:
+        return None
+    if not reply.get("ok") or not isinstance(reply.get("text"), str):
+        return False, text
+    return True, reply["text"]
+
+
+def lint(tool: str, tool_path: str, filepath: str, deadline: float = REQUEST_DEADLINE) -> str | None:
+    """Lint a file in the warm worker: the tool's JSON report, or None to use the command line instead."""
+    worker = worker_for(tool, tool_path, filepath)
+    if worker is None:
+        return None
+    reply = worker.request("lint", {"file": os.path.abspath(filepath)}, deadline)
+    if reply is None or not reply.get("ok") or not isinstance(reply.get("stdout"), str):
+        return None
+    return reply["stdout"]
+
+
+def shutdown_all() -> None:
+    """Stop every worker this process started."""
+    with _pool_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        worker.close()
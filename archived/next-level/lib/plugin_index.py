@@ -0,0 +1,160 @@
+"""Persistent index of installed Claude Code plugins.
+
+One scandir walk over ~/.claude/plugins (which also covers marketplaces/)
+records, per directory, its mtime, its subdirectories and the `name` from its
+plugin.json if it has one. The index is stored as plugins-index.json next to
+config.json.
+
+Later calls revalidate incrementally: a directory whose mtime is unchanged
+keeps its recorded subdirectories without being listed again, and a manifest
+whose mtime is unchanged is not re-parsed. Only stats are paid for an
+unchanged tree. Symlinked directories are walked into like real ones (plugins
+installed from a local checkout are often links), but each directory is
+visited once per walk, so a link cycle cannot hang detection. An index file
+that is unreadable or malformed is ignored and rebuilt by a full walk.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from config import config_path
+
+PLUGINS_ROOT = Path.home() / ".claude" / "plugins"
+MANIFEST = "plugin.json"
+# Directories whose immediate children count as installed plugins by name
+LISTING_DIRS = ("", "marketplaces")
+
+
+@dataclass(frozen=True)
+class PluginIndex:
+    """What a walk of the plugins root found."""
+
+    manifest_names: tuple[str, ...]
+    dir_names: tuple[str, ...]
+
+    def has(self, marker: str) -> bool:
+        """Whether any manifest name or plugin directory name contains the marker."""
+        return any(marker in name for name in self.manifest_names) or any(
+            marker in name for name in self.dir_names)
+
+
+def index_path() -> Path:
+    """Get the path to the persisted plugin index (next to config.json)."""
+    return config_path().with_name("plugins-index.json")
+
+
+def _valid_entry(entry: Any) -> bool:
+    """Whether a stored directory record has the shape _refresh writes."""
+    if not isinstance(entry, dict) or not isinstance(entry.get("mtime_ns"), int):
+        return False
+    for key in ("subdirs", "links"):
+        names = entry.get(key)
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            return False
+    manifest = entry.get("manifest")
+    return manifest is None or (
+        isinstance(manifest, dict) and isinstance(manifest.get("mtime_ns"), int)
+        and (manifest.get("name") is None or isinstance(manifest.get("name"), str)))
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _manifest_name(path: str) -> str | None:
+    """The `name` of a plugin.json, or None if unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    name = manifest.get("name") if isinstance(manifest, dict) else None
+    return name if isinstance(name, str) else None
+
+
+def _refresh(root: str, rel: str, old: dict[str, Any], new: dict[str, Any],
+             seen: set[tuple[int, int]]) -> None:
+    """Revalidate (or scan) one directory into `new`, then recurse into its subdirectories.
+
+    `seen` holds the (st_dev, st_ino) of every directory visited this walk.
+    """
+    path = os.path.join(root, rel) if rel else root
+    try:
+        st = os.stat(path)
+    except OSError:
+        return
+    if (st.st_dev, st.st_ino) in seen:
+        return
+    seen.add((st.st_dev, st.st_ino))
+    mtime_ns = st.st_mtime_ns
+    previous = old.get(rel)
+    if previous and previous.get("mtime_ns") == mtime_ns:
+        subdirs = previous.get("subdirs", [])
+        links = previous.get("links", [])
+        has_manifest = previous.get("manifest") is not None
+    else:
+        subdirs, links, has_manifest = [], [], False
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name == MANIFEST and entry.is_file():
+                        has_manifest = True
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_symlink() and entry.is_dir():
+                        links.append(entry.name)
+        except OSError:
+            return
+
+    manifest = None
+    if has_manifest:
+        manifest_path = os.path.join(path, MANIFEST)
+        manifest_mtime = _mtime_ns(manifest_path)
+        cached = (previous or {}).get("manifest")
+        if cached and cached.get("mtime_ns") == manifest_mtime:
+            manifest = cached
+        elif manifest_mtime is not None:
+            manifest = {"mtime_ns": manifest_mtime, "name": _manifest_name(manifest_path)}
+
+    new[rel] = {"mtime_ns": mtime_ns, "subdirs": sorted(subdirs), "links": sorted(links), "manifest": manifest}
+    for name in subdirs + links:
+        _refresh(root, os.path.join(rel, name) if rel else name, old, new, seen)
+
+
+def load_index(root: str | Path = PLUGINS_ROOT) -> PluginIndex:
+    """Build or revalidate the plugin index for a plugins root."""
+    root = str(root)
+    path = index_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = None
+    recorded = stored.get("dirs") if isinstance(stored, dict) and stored.get("root") == root else None
+    old = {rel: entry for rel, entry in recorded.items() if _valid_entry(entry)} \
+        if isinstance(recorded, dict) else {}
+
+    dirs: dict[str, Any] = {}
+    _refresh(root, "", old, dirs, set())
+
+    if dirs != old:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"root": root, "dirs": dirs}, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    names = tuple(sorted(
+        d["manifest"]["name"] for d in dirs.values() if d["manifest"] and d["manifest"]["name"]))
+    listed = tuple(sorted(
+        name for rel in LISTING_DIRS if rel in dirs for name in dirs[rel]["subdirs"] + dirs[rel]["links"]))
+    return PluginIndex(names, listed)
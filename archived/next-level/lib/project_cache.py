@@ -0,0 +1,181 @@
+"""Whole-project analyzer results cache.
+
+Some analyzers check a whole project whatever file they are pointed at —
+`cargo clippy` compiles and lints the entire crate in one go. Running one per
+edit and keeping only the edited file's diagnostics throws the rest away, so
+for such stages (Stage.fingerprint in checkers/pipeline.py) the full output is
+split into an index of {file: findings} and kept per (stage and tool,
+project root), tagged with a fingerprint of the project's sources. Stages
+that analyze one package at a time (go vet) are kept the same way per
+package directory:
+
+- a check of any file in the project whose sources are unchanged since the
+  last run is answered from the index, whichever file that run was for
+- a changed fingerprint reruns the tool (cargo keeps that incremental) and
+  replaces the index wholesale, since one edit can move diagnostics in any
+  other file
+- concurrent checks of one project (batch groups, daemon requests, hook
+  processes) take a per-project lock, so they share a single run
+
+Indexes live in memory and under the state dir, one JSON file per project:
+
+    <state>/project-cache/<sha256(stage:tool:root)[:16]>.json
+    {"tool": ..., "root": ..., "fingerprint": ..., "files": {"/abs/file": [finding, ...]}}
+
+Least recently used files beyond MAX_PROJECTS are evicted.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from state import state_root
+
+CACHE_DIRNAME = "project-cache"
+MAX_PROJECTS = 512
+
+Index = dict[str, list[dict[str, Any]]]
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+_memo: dict[str, tuple[str, Index]] = {}
+
+
+def tree_fingerprint(root: str, suffixes: tuple[str, ...], names: tuple[str, ...] = (),
+                     skip_dirs: frozenset[str] = frozenset()) -> str | None:
+    """Hash of the path, size and mtime of every matching file under root.
+
+    Files match by suffix or exact name; hidden directories and skip_dirs are
+    not descended into. None if the root cannot be read.
+    """
+    digest = hashlib.sha256()
+    stack = [root]
+    found = False
+    while stack:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            if path == root:
+                return None
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and entry.name not in skip_dirs:
+                        stack.append(entry.path)
+                    continue
+                if not (entry.name.endswith(suffixes) or entry.name in names):
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            found = True
+            digest.update(f"{entry.path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest() if found else None
+
+
+def _cache_file(key: str) -> Path:
+    return state_root() / CACHE_DIRNAME / f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.json"
+
+
+@contextmanager
+def _locked(key: str) -> Iterator[Path]:
+    """Hold the project's lock, in-process and across processes, yielding its cache file."""
+    with _locks_guard:
+        lock = _locks.setdefault(key, threading.Lock())
+    path = _cache_file(key)
+    with lock:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(path.with_suffix(".lock"), "a")
+        except OSError:
+            yield path
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield path
+
+
+def _load(key: str, path: Path, fingerprint: str) -> Index | None:
+    """The stored index if it was built for this fingerprint."""
+    memo = _memo.get(key)
+    if memo and memo[0] == fingerprint:
+        return memo[1]
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint or not isinstance(data.get("files"), dict):
+        return None
+    _memo[key] = (fingerprint, data["files"])
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data["files"]
+
+
+def _store(key: str, path: Path, tool: str, root: str, fingerprint: str, index: Index) -> None:
+    _memo[key] = (fingerprint, index)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tool": tool, "root": root, "fingerprint": fingerprint, "files": index}, f)
+        os.replace(tmp, path)
+        _evict(path.parent)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _evict(directory: Path) -> None:
+    """Drop the least recently used indexes beyond MAX_PROJECTS."""
+    entries = []
+    for entry in directory.glob("*.json"):
+        try:
+            entries.append((entry.stat().st_mtime, entry))
+        except OSError:
+            continue
+    if len(entries) <= MAX_PROJECTS:
+        return
+    for _, entry in sorted(entries)[:len(entries) - MAX_PROJECTS]:
+        for stale in (entry, entry.with_suffix(".lock")):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def project_findings(tool: str, root: str, fingerprint: Callable[[], str | None],
+                     compute: Callable[[], Index | None]) -> tuple[Index, bool]:
+    """The project's {file: findings} index, and whether it was reused.
+
+    `fingerprint` is taken under the project lock, so a check that waited on
+    another's run reuses it when nothing changed meanwhile. `compute` runs
+    the tool and returns the index, or None if it did not finish (nothing is
+    cached then).
+    """
+    key = f"{tool}:{root}"
+    with _locked(key) as path:
+        current = fingerprint()
+        if current is not None:
+            cached = _load(key, path, current)
+            if cached is not None:
+                return cached, True
+        index = compute()
+        if index is None:
+            return {}, False
+        if current is not None:
+            _store(key, path, tool, root, current, index)
+        return index, False
@@ -0,0 +1,209 @@
+"""Content-hash result cache for check_file.
+
+Entries live under the session state dir and are keyed on:
+- the file's content hash (sha256 of its bytes)
+- the language
+- the versions of that language's tools (dependencies.check_binary_version)
+- the relevant config (linters_for(language) and the comment_stripping flag)
+- the tools' own config files (CONFIG_FILES: path, mtime and size of each
+  one found in the file's directory or any ancestor), so editing
+  pyproject.toml, eslint.config.js or .golangci.yml re-checks files instead
+  of answering with results from the old rules
+
+Results are stored under the hash of the file *after* checking, so an Edit
+that leaves the file byte-identical to the last checked state (no-op or
+reverted edits) is answered without running any tools.
+
+Tool versions come from the tool registry (lib/tool_registry.py), memoized
+by the binary's resolved path and mtime, so a cache hit does not spawn
+`--version` probes.
+Eviction is LRU by entry mtime, bounded by MAX_ENTRIES.
+
+Hit/miss counters are kept in memory and added to stats.json by flush()
+(called from stats()) under stats.json.lock, so concurrent hooks, daemon
+requests and bulk-check processes never overwrite each other's counts.
+
+Bulk checks (lib/bulk_check.py) use one cache per project root instead,
+bounded by MAX_PROJECT_ENTRIES, so re-scanning a repository only re-checks
+changed files. Many processes write it at once, so they skip per-put
+eviction and the scan evicts once at the end.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from state import session_dir, state_root
+from tool_configs import LANGUAGE_CONFIG_FILES as CONFIG_FILES
+
+MAX_ENTRIES = 256
+MAX_PROJECT_ENTRIES = 100_000
+CACHE_DIRNAME = "check-cache"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Write JSON atomically (temp file + rename) so readers never see partial files."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON file, returning None if it is missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ResultCache:
+    """On-disk LRU cache of check_file results."""
+
+    def __init__(self, directory: str | Path, max_entries: int = MAX_ENTRIES, evict_on_put: bool = True) -> None:
+        self.directory = Path(directory)
+        self.entries_dir = self.directory / "entries"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.evict_on_put = evict_on_put
+        self._pending: Counter[str] = Counter()
+        self._config_stamps: dict[tuple[str, str], list[tuple[str, int, int]]] = {}
+
+    @classmethod
+    def for_session(cls, session_id: str) -> "ResultCache | None":
+        """Open the cache for a hook session, or None if the session ID is unusable."""
+        try:
+            sdir = session_dir(session_id)
+        except OSError:
+            return None
+        return cls(sdir / CACHE_DIRNAME) if sdir else None
+
+    @classmethod
+    def for_project(cls, root: str, evict_on_put: bool = True) -> "ResultCache":
+        """Open the bulk-check cache for a project root."""
+        digest = hashlib.sha256(os.path.abspath(root).encode()).hexdigest()[:16]
+        return cls(state_root() / CACHE_DIRNAME / digest, MAX_PROJECT_ENTRIES, evict_on_put)
+
+    def _tool_versions(self, language: str) -> dict[str, str | None]:
+        """Versions of the language's tools, memoized in the tool registry."""
+        from dependencies import LANGUAGE_TOOLS, check_binary_version
+
+        return {
+            tool_info["binary"]: check_binary_version(tool_info["binary"])
+            for tool_info in LANGUAGE_TOOLS.get(language, {}).values()
+            if tool_info["role"] != "lsp"
+        }
+
+    def _config_stamp(self, filepath: str, language: str) -> list[tuple[str, int, int]]:
+        """(path, mtime_ns, size) of the language's config files above a file, memoized per directory."""
+        directory = os.path.dirname(os.path.abspath(filepath))
+        memo = self._config_stamps.get((language, directory))
+        if memo is not None:
+            return memo
+        entries = []
+        current = directory
+        while True:
+            for name in CONFIG_FILES.get(language, ()):
+                path = os.path.join(current, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_mtime_ns, st.st_size))
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+        self._config_stamps[(language, directory)] = entries
+        return entries
+
+    def key(self, filepath: str, language: str) -> str | None:
+        """Compute the cache key for a file's current content, or None if unreadable."""
+        from config import feature_enabled, linters_for
+
+        try:
+            with open(filepath, "rb") as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        material = json.dumps({
+            "content": content_hash,
+            "language": language,
+            "tools": self._tool_versions(language),
+            "linters": linters_for(language),
+            "comment_stripping": feature_enabled("comment_stripping"),
+            "config_files": self._config_stamp(filepath, language),
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached result for a key (refreshing its LRU position), or None."""
+        entry = self.entries_dir / f"{key}.json"
+        result = _read_json(entry)
+        self._pending["hits" if result is not None else "misses"] += 1
+        if result is None:
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        """Store a result and evict least-recently-used entries beyond max_entries."""
+        try:
+            _write_json(self.entries_dir / f"{key}.json", result)
+            if self.evict_on_put:
+                self.evict()
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """Drop the oldest entries until the cache fits in max_entries."""
+        entries = list(self.entries_dir.glob("*.json"))
+        if len(entries) <= self.max_entries:
+            return
+        by_age = []
+        for entry in entries:
+            try:
+                by_age.append((entry.stat().st_mtime_ns, entry))
+            except OSError:
+                continue
+        by_age.sort()
+        for _, entry in by_age[:len(by_age) - self.max_entries]:
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+
+    def flush(self) -> None:
+        """Add the counters accumulated since the last flush to stats.json, under its lock."""
+        if not self._pending:
+            return
+        stats_path = self.directory / "stats.json"
+        try:
+            with open(self.directory / "stats.json.lock", "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                stats = _read_json(stats_path)
+                stats = stats if isinstance(stats, dict) else {}
+                for counter, count in self._pending.items():
+                    stats[counter] = stats.get(counter, 0) + count
+                _write_json(stats_path, stats)
+        except OSError:
+            return
+        self._pending.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters (flushing this instance's) and the current entry count."""
+        self.flush()
+        stats = _read_json(self.directory / "stats.json") or {}
+        return {
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "entries": sum(1 for _ in self.entries_dir.glob("*.json")),
+        }
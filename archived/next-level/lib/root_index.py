@@ -0,0 +1,113 @@
+"""Project-root index for next-level.
+
+find_project_root used to walk from a file up to / with an isfile() per
+level, on every Go and Rust edit. The index memoizes, per (directory, marker),
+the nearest ancestor holding the marker (go.mod, Cargo.toml, Package.swift,
+package.json, pyproject.toml, ...) for all checkers in the process. Every
+directory passed on the way up is recorded too, so sibling files and packages
+resolve without walking.
+
+The memo is in-process only: it pays off in the checker daemon and in bulk
+runs, which resolve many files. A cold hook process walks, which costs a
+fraction of a millisecond; loading and rewriting a shared on-disk index cost
+more than that.
+
+An entry is revalidated with two stats:
+- the directory's own mtime (a marker created or removed right there)
+- the marker file's mtime at the recorded root (removed or replaced)
+Markers appearing in an intermediate directory are picked up once the entry
+is older than ROOT_TTL seconds.
+"""
+
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+ROOT_TTL = 300
+MAX_ENTRIES = 4096
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _trim() -> None:
+    """Drop the least recently used entries beyond MAX_ENTRIES. Call under _lock."""
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+def _valid(entry: Any, directory: str, marker: str, now: float) -> bool:
+    if not isinstance(entry, dict) or now - entry.get("checked", 0) >= ROOT_TTL:
+        return False
+    if _mtime_ns(directory) != entry.get("dir_mtime_ns"):
+        return False
+    root = entry.get("root")
+    return root is None or _mtime_ns(os.path.join(root, marker)) == entry.get("marker_mtime_ns")
+
+
+def _walk(directory: str, marker: str, entries: "OrderedDict[str, dict[str, Any]]", now: float) -> str | None:
+    """Walk up from a directory to the marker, recording every directory passed. Call under _lock."""
+    visited = []
+    root, marker_mtime, checked = None, None, now
+    current = directory
+    while True:
+        visited.append(current)
+        try:
+            st = os.stat(os.path.join(current, marker))
+        except OSError:
+            st = None
+        if st is not None and stat.S_ISREG(st.st_mode):
+            root, marker_mtime = current, st.st_mtime_ns
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        cached = entries.get(f"{marker}:{parent}")
+        if _valid(cached, parent, marker, now):
+            # Inherit the ancestor's age so a stale answer is not extended
+            root, marker_mtime, checked = cached["root"], cached.get("marker_mtime_ns"), cached["checked"]
+            break
+        current = parent
+    for visited_dir in visited:
+        key = f"{marker}:{visited_dir}"
+        entries.pop(key, None)
+        entries[key] = {
+            "root": root,
+            "dir_mtime_ns": _mtime_ns(visited_dir),
+            "marker_mtime_ns": marker_mtime,
+            "checked": checked,
+        }
+    return root
+
+
+def find_roots(filepaths: list[str], marker: str) -> dict[str, str | None]:
+    """Nearest directory holding `marker` for each file, resolving each directory once."""
+    now = time.time()
+    directories = {filepath: os.path.dirname(os.path.abspath(filepath)) for filepath in filepaths}
+    resolved: dict[str, str | None] = {}
+    with _lock:
+        for directory in set(directories.values()):
+            key = f"{marker}:{directory}"
+            entry = _entries.get(key)
+            if _valid(entry, directory, marker, now):
+                _entries.move_to_end(key)
+                resolved[directory] = entry["root"]
+            else:
+                resolved[directory] = _walk(directory, marker, _entries, now)
+        _trim()
+    return {filepath: resolved[directory] for filepath, directory in directories.items()}
+
+
+def find_root(filepath: str, marker: str) -> str | None:
+    """Nearest directory holding `marker`, from the file's directory up to /."""
+    return find_roots([filepath], marker)[filepath]
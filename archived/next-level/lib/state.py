@@ -0,0 +1,39 @@
+"""State directory helpers for next-level.
+
+Mirrors the layout used by hooks/scripts/utils.sh:
+
+    ${NEXT_LEVEL_STATE:-~/.next-level}/
+        sessions/<session_id>/   per-session tracking files
+        daemon/                  checker daemon sockets and lock files
+"""
+
+import os
+from pathlib import Path
+
+STATE_ROOT = Path(os.environ.get("NEXT_LEVEL_STATE", Path.home() / ".next-level"))
+
+
+def state_root() -> Path:
+    """Get the root of the next-level state directory."""
+    return STATE_ROOT
+
+
+def valid_session_id(session_id: str) -> bool:
+    """Reject session IDs that could escape the sessions directory."""
+    return bool(session_id) and session_id not in (".", "..") and not any(c in session_id for c in "/\\")
+
+
+def session_dir(session_id: str) -> Path | None:
+    """Return (and create) the state directory for a session, or None if the ID is unsafe."""
+    if not valid_session_id(session_id):
+        return None
+    path = state_root() / "sessions" / session_id
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def daemon_dir() -> Path:
+    """Return (and create) the directory holding checker daemon sockets."""
+    path = state_root() / "daemon"
+    path.mkdir(parents=True, exist_ok=True, mode=0o700)
+    return path
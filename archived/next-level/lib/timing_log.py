@@ -0,0 +1,118 @@
+"""Per-session log of checker stage timings.
+
+When the timing_log feature is on, the file checker appends the `timings` of
+every checked file (see checkers/pipeline.py) to the session state dir, one
+JSON object per line, so slow PostToolUse hooks can be traced to the tool
+responsible:
+
+    <session_dir>/timings.jsonl
+    {"ts": epoch, "file": "/abs/path", "language": "python", "total_ms": 812.4, "stages": [...]}
+
+`report` aggregates one session or all of them into p50/p95/p99 of run_ms per
+(language, stage, tool), plus the end-to-end total per language. Run it as
+`diagnostic-report.sh timings [--session ID]`.
+"""
+
+import json
+import math
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from state import session_dir, state_root, valid_session_id
+
+LOG_NAME = "timings.jsonl"
+PERCENTILES = (50, 95, 99)
+
+
+def record(session_id: str, results: dict[str, dict]) -> None:
+    """Append the timings of each checked file's result to the session log."""
+    lines = []
+    now = round(time.time(), 3)
+    for filepath, result in results.items():
+        timings = result.get("timings")
+        if isinstance(timings, dict):
+            lines.append(json.dumps({"ts": now, "file": filepath, **timings}) + "\n")
+    if not lines:
+        return
+    try:
+        sdir = session_dir(session_id)
+        if sdir:
+            with open(sdir / LOG_NAME, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+    except OSError:
+        pass
+
+
+def _log_files(session_id: str | None) -> list[Path]:
+    sessions = state_root() / "sessions"
+    if session_id is not None:
+        return [sessions / session_id / LOG_NAME] if valid_session_id(session_id) else []
+    return sorted(sessions.glob(f"*/{LOG_NAME}"))
+
+
+def _entries(paths: list[Path]) -> Iterator[dict]:
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict):
+                        yield entry
+        except OSError:
+            continue
+
+
+def percentile(sorted_values: list[float], pct: int) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def aggregate(entries: Iterator[dict]) -> dict[tuple[str, str, str], list[float]]:
+    """run_ms samples per (language, stage, tool); the total per language is keyed ("total", "")."""
+    samples: dict[tuple[str, str, str], list[float]] = {}
+    for entry in entries:
+        language = entry.get("language") or "unknown"
+        if isinstance(entry.get("total_ms"), (int, float)):
+            samples.setdefault((language, "total", ""), []).append(entry["total_ms"])
+        for stage in entry.get("stages") or []:
+            if not isinstance(stage, dict) or not isinstance(stage.get("run_ms"), (int, float)):
+                continue
+            key = (language, str(stage.get("stage", "?")), str(stage.get("tool", "?")))
+            samples.setdefault(key, []).append(stage["run_ms"])
+    return samples
+
+
+def report(session_id: str | None = None) -> str:
+    """Percentile table of the logged timings."""
+    samples = aggregate(_entries(_log_files(session_id)))
+    if not samples:
+        scope = f"session {session_id}" if session_id else "any session"
+        return (f"No checker timings logged for {scope}.\n"
+                "Enable the timing_log feature (or set NEXT_LEVEL_FEATURE_TIMING_LOG=1) and edit some files.")
+    header = f"{'language':12s} {'stage':10s} {'tool':18s} {'n':>6s}" \
+        + "".join(f" {f'p{pct}':>10s}" for pct in PERCENTILES)
+    lines = ["=== Checker Timings (ms) ===", header]
+    for (language, stage, tool), values in sorted(samples.items()):
+        values.sort()
+        lines.append(f"{language:12s} {stage:10s} {tool:18s} {len(values):6d}"
+                     + "".join(f" {percentile(values, pct):10.1f}" for pct in PERCENTILES))
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] != "report":
+        print("Usage: timing_log.py report [--session ID]", file=sys.stderr)
+        return 1
+    session_id = argv[argv.index("--session") + 1] if "--session" in argv[:-1] else None
+    print(report(session_id))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
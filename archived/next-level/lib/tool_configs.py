@@ -0,0 +1,35 @@
+"""Config files that next-level's tools read, by tool and by language.
+
+A tool reads these from the checked file's directory or any ancestor. The
+result cache keys entries on them (result_cache.CONFIG_FILES) and the Node
+workers restart when one changes (node_worker.CONFIG_FILES). The tables live
+here, with no imports, so the result cache does not load the worker pool to
+read a list of file names.
+"""
+
+# Read by every Node tool: the project manifest and the installed dependency tree
+NODE_SHARED_FILES: tuple[str, ...] = ("package.json", "node_modules/.package-lock.json")
+
+TOOL_CONFIG_FILES: dict[str, tuple[str, ...]] = {
+    "prettier": NODE_SHARED_FILES + (
+        ".prettierrc", ".prettierrc.json", ".prettierrc.json5", ".prettierrc.yaml", ".prettierrc.yml",
+        ".prettierrc.toml", ".prettierrc.js", ".prettierrc.cjs", ".prettierrc.mjs", ".prettierrc.ts",
+        "prettier.config.js", "prettier.config.cjs", "prettier.config.mjs", "prettier.config.ts",
+        "package.yaml", ".prettierignore", ".editorconfig", ".gitignore",
+    ),
+    "eslint": NODE_SHARED_FILES + (
+        "eslint.config.js", "eslint.config.mjs", "eslint.config.cjs",
+        "eslint.config.ts", "eslint.config.mts", "eslint.config.cts",
+        ".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yaml", ".eslintrc.yml",
+        ".eslintignore", "tsconfig.json",
+    ),
+}
+
+LANGUAGE_CONFIG_FILES: dict[str, tuple[str, ...]] = {
+    "python": ("pyproject.toml", "ruff.toml", ".ruff.toml", "pyrightconfig.json"),
+    "typescript": tuple(dict.fromkeys(TOOL_CONFIG_FILES["prettier"] + TOOL_CONFIG_FILES["eslint"])),
+    "go": ("go.mod", "go.sum", "go.work", ".golangci.yml", ".golangci.yaml", ".golangci.toml", ".golangci.json"),
+    "rust": ("Cargo.toml", "Cargo.lock", "clippy.toml", ".clippy.toml", "rustfmt.toml", ".rustfmt.toml",
+             "rust-toolchain", "rust-toolchain.toml"),
+    "swift": (".swiftlint.yml", ".swiftformat", ".swift-version"),
+}
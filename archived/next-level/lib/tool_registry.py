@@ -0,0 +1,182 @@
+"""Persistent tool registry for next-level.
+
+Every checker stage resolves its tool with shutil.which, which walks the whole
+PATH, and version checks spawn `<tool> --version`. The registry records each
+tool's resolved absolute path, the binary's mtime and (once probed) its
+version in tools/<hash of PATH>.json next to config.json, shared by every
+hook process, the checker daemon and the dependency checker. A steady-state
+lookup costs one stat of the binary and no PATH scan.
+
+Each PATH gets its own file, so sessions running under different PATHs (a
+virtualenv, a per-project toolchain) keep their own entries instead of
+wiping each other's; at most MAX_PATHS files are kept, least recently
+written dropped first.
+
+Invalidation:
+- a binary's mtime changed (upgrade) or it vanished: that tool is re-resolved
+- "not found" entries are retried after NEGATIVE_TTL seconds
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from config import config_path
+
+NEGATIVE_TTL = 300
+VERSION_TIMEOUT = 5
+MAX_PATHS = 32
+
+_lock = threading.Lock()
+# PATH -> {"data": registry, "mtime_ns": of its file when read}
+_loaded: dict[str, dict[str, Any]] = {}
+
+
+def registry_path(path_env: str | None = None) -> Path:
+    """Get the path to the tool registry for a PATH (default: the current one), next to config.json."""
+    if path_env is None:
+        path_env = os.environ.get("PATH", "")
+    digest = hashlib.sha256(path_env.encode()).hexdigest()[:16]
+    return config_path().with_name("tools") / f"{digest}.json"
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load() -> dict[str, Any]:
+    """The registry for the current PATH, re-read only when another process rewrote it."""
+    path_env = os.environ.get("PATH", "")
+    path = registry_path(path_env)
+    mtime_ns = _mtime_ns(str(path))
+    loaded = _loaded.get(path_env)
+    if loaded is None or mtime_ns != loaded["mtime_ns"]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        loaded = _loaded[path_env] = {"data": data if isinstance(data, dict) else {}, "mtime_ns": mtime_ns}
+    data = loaded["data"]
+    if data.get("path_env") != path_env or not isinstance(data.get("tools"), dict):
+        data = loaded["data"] = {"path_env": path_env, "tools": {}}
+    return data
+
+
+def _save(data: dict[str, Any]) -> None:
+    """Write the registry atomically; losing a race only costs a re-probe later."""
+    path = registry_path(data["path_env"])
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        created = not path.exists()
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(tmp, path)
+        _loaded[data["path_env"]]["mtime_ns"] = _mtime_ns(str(path))
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return
+    if created:
+        _prune(path.parent)
+
+
+def _prune(directory: Path) -> None:
+    """Drop the least recently written registries beyond MAX_PATHS."""
+    by_age = []
+    for entry in directory.glob("*.json"):
+        try:
+            by_age.append((entry.stat().st_mtime_ns, entry))
+        except OSError:
+            continue
+    by_age.sort()
+    for _, entry in by_age[:max(0, len(by_age) - MAX_PATHS)]:
+        try:
+            entry.unlink()
+        except OSError:
+            continue
+
+
+def _valid(entry: dict[str, Any]) -> bool:
+    if not entry.get("path"):
+        return time.time() - entry.get("checked", 0) < NEGATIVE_TTL
+    return _mtime_ns(entry["path"]) == entry.get("mtime_ns")
+
+
+def _entry(name: str) -> dict[str, Any]:
+    """The registry entry for a tool, re-resolving it on PATH if stale. Call under _lock."""
+    data = _load()
+    entry = data["tools"].get(name)
+    if isinstance(entry, dict) and _valid(entry):
+        return entry
+    resolved = shutil.which(name)
+    entry = {"path": resolved, "mtime_ns": _mtime_ns(resolved) if resolved else None, "checked": time.time()}
+    data["tools"][name] = entry
+    _save(data)
+    return entry
+
+
+def which(name: str) -> str | None:
+    """Resolve a tool to an absolute path, like shutil.which but memoized."""
+    with _lock:
+        return _entry(name)["path"]
+
+
+def version(name: str, timeout: float = VERSION_TIMEOUT) -> str | None:
+    """The tool's `--version` first line ("installed" if it has none), or None if missing.
+
+    The probe runs once per binary (path + mtime); a probe that times out is
+    reported as "installed" and retried next time. Callers are responsible for
+    only asking about binaries they are willing to execute.
+    """
+    with _lock:
+        entry = dict(_entry(name))
+    if not entry["path"]:
+        return None
+    if "version" in entry:
+        return entry["version"]
+
+    probed = _probe_version(entry["path"], timeout)
+    if probed is None:
+        return "installed"
+    with _lock:
+        data = _load()
+        current = data["tools"].get(name)
+        if isinstance(current, dict) and current.get("path") == entry["path"] \
+                and current.get("mtime_ns") == entry["mtime_ns"]:
+            current["version"] = probed
+            _save(data)
+    return probed
+
+
+def _probe_version(path: str, timeout: float) -> str | None:
+    """Run `<path> --version` and return its first output line, or None on timeout."""
+    try:
+        result = subprocess.run(
+            [path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        if result.returncode != 0:
+            return "installed"
+        output = result.stdout.strip() or result.stderr.strip()
+        # Return first line only
+        return output.split("\n")[0] if output else "installed"
+    except subprocess.TimeoutExpired:
+        return None
+    except (FileNotFoundError, OSError):
+        return "installed"